@@ -4,17 +4,44 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flasgger import Swagger
-from .config import DevelopmentConfig
+from .autorizacion import Autorizacion
+from .config import obtener_config, opciones_motor
+from .consultas_lentas import RegistroConsultas
+from .contrasenas import VerificadorContrasenas
+from .cache import CacheRespuestas
+from .escrituras import ColaEscrituras
+from .idempotencia import Idempotencia
+from .metricas import Metricas
+from .proveedor_json import crear_proveedor
+from .replicas import Replicas, SesionEnrutada
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": SesionEnrutada})
 jwt = JWTManager()
+autorizacion = Autorizacion()
+cache = CacheRespuestas()
+metricas = Metricas()
+consultas_lentas = RegistroConsultas()
+contrasenas = VerificadorContrasenas()
+escrituras = ColaEscrituras()
+idempotencia = Idempotencia()
+replicas = Replicas()
 
-def create_app(config=DevelopmentConfig):
+def create_app(config=None):
     app = Flask(__name__)
-    app.config.from_object(config)
+    app.config.from_object(config or obtener_config())
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", opciones_motor(app.config))
+    app.json = crear_proveedor(app)
 
     db.init_app(app)
     jwt.init_app(app)
+    autorizacion.init_app(app)
+    cache.init_app(app)
+    metricas.init_app(app)
+    consultas_lentas.init_app(app)
+    contrasenas.init_app(app)
+    escrituras.init_app(app)
+    idempotencia.init_app(app)
+    replicas.init_app(app)
     CORS(app)
 
     # Swagger UI estará en http://localhost:5000/docs/
@@ -47,10 +74,19 @@ def create_app(config=DevelopmentConfig):
     from .routes.estudiantes import estudiantes_bp
     from .routes.calificaciones import cal_bp
     from .routes.auth import auth_bp
+    from .routes.exportar import exportar_bp
+    from .routes.analitica import analitica_bp
+    from .routes.admin import admin_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(estudiantes_bp)
     app.register_blueprint(cal_bp)
     app.register_blueprint(auth_bp)
+    app.register_blueprint(exportar_bp)
+    app.register_blueprint(analitica_bp)
+    app.register_blueprint(admin_bp)
+
+    from .commands import registrar_comandos
+    registrar_comandos(app)
 
     return app
@@ -0,0 +1,258 @@
+# app/asincrono.py
+"""
+Modo de servicio asíncrono (ASGI) para las lecturas más concurridas.
+
+Las rutas GET de estudiantes, materias y kardex se atienden con AsyncSession
+de SQLAlchemy, de modo que un solo proceso puede tener cientos de peticiones
+esperando a la base sin bloquear hilos. Se reutilizan los mismos modelos,
+los mismos SELECT y los mismos serializadores que las rutas de Flask, así que
+las respuestas tienen exactamente la misma forma. Todo lo demás (escrituras,
+autenticación, Swagger, /metrics...) se delega a la aplicación Flask.
+
+Requiere dependencias opcionales (requirements-opcional.txt): asgiref, y
+aiosqlite para SQLite o asyncpg para PostgreSQL. Se sirve con:  uvicorn asgi:app
+"""
+import re
+from urllib.parse import parse_qs
+
+from sqlalchemy import func
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # dependencia opcional
+    WsgiToAsgi = None
+
+from app import db
+from app.models.calificacion import Calificacion
+from app.models.estudiante import Estudiante
+from app.services.kardex import (
+    CAMPOS_CALIFICACION, armar_kardex, consulta_calificaciones, consulta_estadisticas,
+    consulta_resumenes, estadisticas_de_resumen, estadisticas_desde_agregado,
+)
+from app.services.ranking import consulta_ranking_estudiantes, ranking_desde_filas, soporta_ventanas
+from app.services.serializacion import (
+    CAMPOS_ESTUDIANTE, CAMPOS_MATERIA, CamposInvalidos, estudiantes_como_filas, leer_campos,
+    materias_como_filas, serializar_estudiantes, serializar_materias,
+)
+
+# Driver síncrono -> driver asíncrono equivalente
+DRIVERS_ASINCRONOS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def url_asincrona(config):
+    """ASYNC_DATABASE_URL si existe; si no, la URL síncrona con el driver asíncrono."""
+    if config.get("ASYNC_DATABASE_URL"):
+        return make_url(config["ASYNC_DATABASE_URL"])
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    backend = url.get_backend_name()
+    if backend not in DRIVERS_ASINCRONOS:
+        raise ValueError(f"No hay driver asíncrono configurado para '{backend}'")
+    return url.set(drivername=DRIVERS_ASINCRONOS[backend])
+
+
+def crear_motor(config):
+    """Motor asíncrono con los mismos límites de pool que el síncrono."""
+    url = url_asincrona(config)
+    try:
+        return _crear_motor(url, config)
+    except ModuleNotFoundError as e:
+        raise RuntimeError(f"El modo asíncrono con {url.drivername} requiere instalar el paquete {e.name} "
+                           "(ver requirements-opcional.txt)") from e
+
+
+def _crear_motor(url, config):
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # Una única conexión compartida; si no, cada una vería una base vacía distinta
+            return create_async_engine(url, poolclass=StaticPool,
+                                       connect_args={"check_same_thread": False})
+        return create_async_engine(url)
+    return create_async_engine(
+        url,
+        pool_size=config["DB_POOL_SIZE"],
+        max_overflow=config["DB_MAX_OVERFLOW"],
+        pool_timeout=config["DB_POOL_TIMEOUT"],
+        pool_recycle=config["DB_POOL_RECYCLE"],
+        pool_pre_ping=config["DB_POOL_PRE_PING"],
+    )
+
+
+class NoEncontrado(Exception):
+    """El recurso no existe; Flask arma la respuesta 404 de siempre."""
+
+
+# ─── Consultas: mismas que las rutas de Flask, ejecutadas con AsyncSession ──
+
+async def listar_estudiantes(sesion, args):
+    carrera = args.get("carrera")
+    pagina = _entero(args.get("pagina"), 1)
+    por_pagina = _entero(args.get("por_pagina"), 10)
+    campos = leer_campos(args.get("campos"), CAMPOS_ESTUDIANTE)
+
+    condiciones = [Estudiante.activo.is_(True)]
+    if carrera:
+        condiciones.append(Estudiante.carrera == carrera)
+
+    # Misma normalización que Pagination con error_out=False
+    desde = (max(pagina, 1) - 1) * (por_pagina if por_pagina > 0 else 20)
+    limite = por_pagina if por_pagina > 0 else 20
+    consulta = estudiantes_como_filas(*condiciones, campos=campos)
+    total = await sesion.scalar(db.select(func.count()).select_from(consulta.order_by(None).subquery()))
+    filas = (await sesion.execute(consulta.limit(limite).offset(desde))).all()
+
+    return {
+        "total": total,
+        "paginas": -(-total // limite) if total else 0,
+        "pagina_actual": pagina,
+        "por_pagina": por_pagina,
+        "estudiantes": serializar_estudiantes(filas, campos)
+    }
+
+
+async def obtener_estudiante(sesion, id, args):
+    campos = leer_campos(args.get("campos"), CAMPOS_ESTUDIANTE)
+    fila = (await sesion.execute(estudiantes_como_filas(Estudiante.id == id, campos=campos))).first()
+    if fila is None:
+        raise NoEncontrado
+    return serializar_estudiantes([fila], campos)[0]
+
+
+async def listar_materias(sesion, args):
+    campos = leer_campos(args.get("campos"), CAMPOS_MATERIA)
+    filas = (await sesion.execute(materias_como_filas(campos))).all()
+    return serializar_materias(filas, campos)
+
+
+async def obtener_kardex(sesion, id, args):
+    campos = leer_campos(args.get("campos"), CAMPOS_CALIFICACION)
+    estudiante = await sesion.get(Estudiante, id)
+    if estudiante is None:
+        raise NoEncontrado
+
+    filas = (await sesion.execute(
+        consulta_calificaciones(campos).where(Calificacion.estudiante_id == id)
+    )).all()
+    if not filas:
+        return armar_kardex(estudiante, filas, None)
+
+    estadisticas = await _estadisticas_por_estudiante(sesion, [id])
+    rankings = await _ranking_por_estudiante(sesion, [id])
+    return armar_kardex(estudiante, filas, estadisticas.get(id), rankings.get(id), campos)
+
+
+async def _estadisticas_por_estudiante(sesion, ids):
+    """Versión asíncrona de kardex.estadisticas_por_estudiante()."""
+    ids = set(ids)
+    resumenes = await sesion.scalars(consulta_resumenes(ids))
+    estadisticas = {r.estudiante_id: estadisticas_de_resumen(r) for r in resumenes}
+
+    faltantes = ids - estadisticas.keys()
+    if faltantes:
+        filas = await sesion.execute(consulta_estadisticas().where(Calificacion.estudiante_id.in_(faltantes)))
+        estadisticas_desde_agregado(filas, estadisticas)
+    return estadisticas
+
+
+async def _ranking_por_estudiante(sesion, ids):
+    """Versión asíncrona de ranking.ranking_por_estudiante()."""
+    ids = set(ids)
+    ventanas = soporta_ventanas(sesion.bind.dialect.name)
+    filas = (await sesion.execute(consulta_ranking_estudiantes(ids, ventanas))).all()
+    return ranking_desde_filas(filas, ids, ventanas)
+
+
+def _entero(valor, por_defecto):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return por_defecto
+
+
+# ─── Aplicación ASGI ────────────────────────────────────────────────────────
+
+# (patrón de la ruta, manejador). Los manejadores con 'id' lo reciben ya convertido.
+RUTAS = [
+    (re.compile(r"^/api/estudiantes/$"), listar_estudiantes),
+    (re.compile(r"^/api/estudiantes/(?P<id>\d+)$"), obtener_estudiante),
+    (re.compile(r"^/api/estudiantes/(?P<id>\d+)/kardex$"), obtener_kardex),
+    (re.compile(r"^/api/materias/$"), listar_materias),
+]
+
+# Parámetros que las rutas asíncronas no implementan: esas peticiones van a Flask
+DELEGAR_SI = {"cursor", "limite"}
+
+
+class AppAsincrona:
+    """
+    Enruta las lecturas de RUTAS a AsyncSession y el resto a la app de Flask.
+    La caché de respuestas y /metrics solo aplican a las peticiones que
+    atiende Flask.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.motor = crear_motor(flask_app.config)
+        self.sesiones = async_sessionmaker(self.motor, expire_on_commit=False)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+
+        ruta = self._resolver(scope) if scope["type"] == "http" else None
+        if ruta is None:
+            return await self.wsgi(scope, receive, send)
+
+        manejador, parametros, args = ruta
+        try:
+            async with self.sesiones() as sesion:
+                cuerpo, estado = await manejador(sesion, *parametros, args), 200
+        except CamposInvalidos as e:
+            cuerpo, estado = {"error": str(e), "disponibles": e.disponibles}, 400
+        except NoEncontrado:
+            return await self.wsgi(scope, receive, send)
+        await self._responder(send, cuerpo, estado)
+
+    def _resolver(self, scope):
+        if scope["method"] != "GET":
+            return None
+        for patron, manejador in RUTAS:
+            coincidencia = patron.match(scope["path"])
+            if coincidencia:
+                args = {k: v[-1] for k, v in
+                        parse_qs(scope["query_string"].decode(), keep_blank_values=True).items()}
+                if DELEGAR_SI & args.keys():
+                    return None
+                return manejador, [int(v) for v in coincidencia.groupdict().values()], args
+        return None
+
+    async def _responder(self, send, cuerpo, estado):
+        datos = self.flask_app.json.dumps(cuerpo).encode()
+        await send({"type": "http.response.start", "status": estado, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(datos)).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": datos})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif mensaje["type"] == "lifespan.shutdown":
+                await self.motor.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def crear_app_asincrona(config=None):
+    if WsgiToAsgi is None:
+        raise RuntimeError("El modo asíncrono requiere instalar asgiref (ver requirements-opcional.txt)")
+    from app import create_app
+    return AppAsincrona(create_app(config))
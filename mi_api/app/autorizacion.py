@@ -0,0 +1,186 @@
+# app/autorizacion.py
+import heapq
+import threading
+import time
+from datetime import timedelta
+from functools import wraps
+from flask import current_app, jsonify
+from flask_jwt_extended import create_access_token, get_jwt, verify_jwt_in_request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from .cache import CacheLRU, _crear_backend
+from .replicas import SesionEnrutada
+
+DURACION_TOKEN = timedelta(hours=24)
+
+
+class ListaRevocados:
+    """
+    Claves revocadas hasta su expiración, en memoria del proceso. A diferencia
+    de una LRU nunca descarta una entrada vigente: solo se purgan las vencidas.
+    """
+
+    def __init__(self):
+        self._datos = {}
+        self._vencimientos = []
+        self._candado = threading.Lock()
+
+    def get(self, clave):
+        entrada = self._datos.get(clave)
+        if entrada is None or entrada[1] < time.time():
+            return None
+        return entrada[0]
+
+    def set(self, clave, valor, ttl):
+        expira = time.time() + ttl
+        with self._candado:
+            self._datos[clave] = (valor, expira)
+            heapq.heappush(self._vencimientos, (expira, clave))
+            while self._vencimientos and self._vencimientos[0][0] < time.time():
+                vencida, antigua = heapq.heappop(self._vencimientos)
+                if self._datos.get(antigua, (None, None))[1] == vencida:
+                    del self._datos[antigua]
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class Autorizacion:
+    """
+    Autorización por claims del JWT: el token lleva el id (sub) y el rol del
+    usuario firmados, así que requiere_rol() decide sin consultar la base.
+
+    Los datos del usuario (perfil) se guardan en una caché con TTL
+    (AUTH_USUARIOS_TTL) que se invalida al confirmar cambios en Usuario. Un
+    token deja de valer si se revocó su jti (logout) o si al usuario le
+    cambiaron el rol o lo desactivaron después de emitirlo. Las revocaciones
+    viven en memoria del proceso, o en redis si CACHE_BACKEND es "redis".
+    """
+
+    def __init__(self, app=None):
+        self.usuarios = None
+        self.revocados = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if app.config.get("CACHE_BACKEND") == "redis":
+            self.usuarios = _crear_backend(app, prefijo="apiescolar:usuarios:")
+            self.revocados = _crear_backend(app, prefijo="apiescolar:revocados:")
+        else:
+            self.usuarios = CacheLRU(app.config.get("AUTH_USUARIOS_MAX", 10000))
+            self.revocados = ListaRevocados()
+        # Registrado por JWTManager.init_app, que debe ir antes
+        app.extensions["flask-jwt-extended"].token_in_blocklist_loader(self._token_revocado)
+        app.extensions["autorizacion"] = self
+        _escuchar_cambios_de_usuario()
+
+    @property
+    def requerida(self):
+        return current_app.config.get("AUTH_REQUERIDA", False)
+
+    # ─── Tokens ─────────────────────────────────────────────────────────────
+    @staticmethod
+    def crear_token(usuario):
+        return create_access_token(
+            identity=str(usuario.id),
+            additional_claims={"rol": usuario.rol, "username": usuario.username},
+            expires_delta=DURACION_TOKEN,
+        )
+
+    def revocar(self, claims):
+        """Invalida un token concreto (logout) hasta que habría expirado."""
+        restante = claims["exp"] - time.time()
+        if restante > 0:
+            self.revocados.set("jti:" + claims["jti"], True, int(restante) + 1)
+
+    def revocar_usuario(self, id):
+        """Invalida todos los tokens del usuario emitidos hasta ahora."""
+        segundos = int(DURACION_TOKEN.total_seconds())
+        self.revocados.set(f"usuario:{id}", int(time.time()), segundos)
+
+    def _token_revocado(self, encabezado, claims):
+        if self.revocados.get("jti:" + claims["jti"]) is not None:
+            return True
+        desde = self.revocados.get(f"usuario:{claims['sub']}")
+        # iat tiene resolución de segundos: un token del mismo segundo que el cambio también cae
+        return desde is not None and claims["iat"] <= desde
+
+    # ─── Usuarios ───────────────────────────────────────────────────────────
+    def usuario_actual(self):
+        """Datos del usuario del token vigente, desde la caché o (si falta) la base."""
+        id = get_jwt()["sub"]
+        datos = self.usuarios.get(id)
+        if datos is None:
+            from app import db
+            from app.models.usuario import Usuario
+            usuario = db.session.get(Usuario, int(id))
+            if usuario is None:
+                return None
+            datos = {"id": usuario.id, "username": usuario.username, "email": usuario.email,
+                     "rol": usuario.rol, "activo": usuario.activo}
+            ttl = current_app.config.get("AUTH_USUARIOS_TTL", 300)
+            if ttl > 0:
+                self.usuarios.set(id, datos, ttl)
+        return datos
+
+    def invalidar_usuario(self, id):
+        self.usuarios.delete(str(id))
+
+    # ─── Decoradores ────────────────────────────────────────────────────────
+    def requiere_rol(self, *roles):
+        """
+        Exige un token válido con alguno de 'roles' (o cualquiera si no se pasan).
+        Con AUTH_REQUERIDA apagado la vista queda abierta, como antes.
+        """
+        def decorador(vista):
+            @wraps(vista)
+            def envoltura(*args, **kwargs):
+                if not self.requerida:
+                    return vista(*args, **kwargs)
+                verify_jwt_in_request()
+                if roles and get_jwt().get("rol") not in roles:
+                    return jsonify({"error": "No tienes permiso para esta operación"}), 403
+                return vista(*args, **kwargs)
+            return envoltura
+        return decorador
+
+    @staticmethod
+    def tiene_rol(*roles):
+        """True si la petición trae un token válido con alguno de 'roles'."""
+        return verify_jwt_in_request(optional=True) is not None and get_jwt().get("rol") in roles
+
+
+def _usuario_modificado(mapper, conexion, usuario):
+    estado = inspect(usuario)
+    # Rol o baja: los tokens ya emitidos llevan claims viejos y hay que revocarlos
+    revocar = estado.deleted or any(estado.attrs[c].history.has_changes() for c in ("rol", "activo"))
+    cambios = object_session(usuario).info.setdefault("usuarios_modificados", {})
+    cambios[usuario.id] = cambios.get(usuario.id, False) or revocar
+
+
+def _al_confirmar(sesion):
+    cambios = sesion.info.pop("usuarios_modificados", None)
+    if not cambios:
+        return
+    autorizacion = current_app.extensions.get("autorizacion")
+    if autorizacion is None:
+        return
+    for id, revocar in cambios.items():
+        autorizacion.invalidar_usuario(id)
+        if revocar:
+            autorizacion.revocar_usuario(id)
+
+
+def _al_deshacer(sesion):
+    sesion.info.pop("usuarios_modificados", None)
+
+
+def _escuchar_cambios_de_usuario():
+    from app.models.usuario import Usuario
+    if event.contains(Usuario, "after_update", _usuario_modificado):
+        return
+    event.listen(Usuario, "after_update", _usuario_modificado)
+    event.listen(Usuario, "after_delete", _usuario_modificado)
+    event.listen(SesionEnrutada, "after_commit", _al_confirmar)
+    event.listen(SesionEnrutada, "after_rollback", _al_deshacer)
@@ -0,0 +1,250 @@
+# app/cache.py
+import fnmatch
+import hashlib
+import math
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, make_response, request
+
+
+def clave_cliente():
+    """Identifica al cliente de la petición (token o IP) sin guardar el token en claro."""
+    identidad = request.headers.get("Authorization") or request.remote_addr or ""
+    return hashlib.sha1(identidad.encode()).hexdigest()[:16]
+
+
+class CacheLRU:
+    """Backend en proceso: LRU acotado por número de entradas, con TTL por entrada."""
+
+    def __init__(self, max_entradas=1024, ttl=60):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._candado = threading.Lock()
+
+    def get(self, clave):
+        with self._candado:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            valor, expira = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor, ttl=None):
+        expira = time.monotonic() + (ttl or self.ttl)
+        with self._candado:
+            self._datos[clave] = (valor, expira)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def add(self, clave, valor, ttl=None):
+        """Guarda solo si la clave no existe (o expiró); devuelve si la guardó."""
+        expira = time.monotonic() + (ttl or self.ttl)
+        with self._candado:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[1] >= time.monotonic():
+                return False
+            self._datos[clave] = (valor, expira)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+            return True
+
+    def delete(self, *claves):
+        with self._candado:
+            for clave in claves:
+                self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._candado:
+            self._datos.clear()
+
+
+class CacheCompartido:
+    """
+    Backend sobre un almacén compartido entre procesos. 'cliente' debe ofrecer
+    get(nombre), set(nombre, valor, px=milisegundos), delete(*nombres) y
+    scan_iter(match=patrón), como redis-py. El TTL va en milisegundos para que
+    uno menor a un segundo no se vuelva 0 (redis rechaza 'ex=0').
+    """
+
+    def __init__(self, cliente, prefijo="apiescolar:", ttl=60):
+        self.cliente = cliente
+        self.prefijo = prefijo
+        self.ttl = ttl
+
+    def get(self, clave):
+        crudo = self.cliente.get(self.prefijo + clave)
+        return pickle.loads(crudo) if crudo is not None else None
+
+    def _milisegundos(self, ttl):
+        return max(1, math.ceil((ttl or self.ttl) * 1000))
+
+    def set(self, clave, valor, ttl=None):
+        self.cliente.set(self.prefijo + clave, pickle.dumps(valor), px=self._milisegundos(ttl))
+
+    def add(self, clave, valor, ttl=None):
+        """SET NX: atómico entre procesos."""
+        return bool(self.cliente.set(self.prefijo + clave, pickle.dumps(valor),
+                                     px=self._milisegundos(ttl), nx=True))
+
+    def delete(self, *claves):
+        if claves:
+            self.cliente.delete(*(self.prefijo + c for c in claves))
+
+    def clear(self, lote=500):
+        """Borra solo las claves de este prefijo (SCAN + DELETE por lotes, sin FLUSHDB)."""
+        claves = []
+        for nombre in self.cliente.scan_iter(match=self.prefijo + "*", count=lote):
+            claves.append(nombre)
+            if len(claves) >= lote:
+                self.cliente.delete(*claves)
+                claves = []
+        if claves:
+            self.cliente.delete(*claves)
+
+
+class ClienteMemoria:
+    """Sustituto local de un cliente tipo redis (mismo subconjunto de métodos) para pruebas."""
+
+    def __init__(self):
+        self._datos = {}
+        self._candado = threading.Lock()
+
+    def get(self, nombre):
+        with self._candado:
+            entrada = self._datos.get(nombre)
+            if entrada is None:
+                return None
+            valor, expira = entrada
+            if expira is not None and expira < time.monotonic():
+                del self._datos[nombre]
+                return None
+            return valor
+
+    def set(self, nombre, valor, ex=None, px=None, nx=False):
+        segundos = px / 1000 if px else ex
+        with self._candado:
+            if nx and nombre in self._datos:
+                expira = self._datos[nombre][1]
+                if expira is None or expira >= time.monotonic():
+                    return None
+            self._datos[nombre] = (valor, time.monotonic() + segundos if segundos else None)
+        return True
+
+    def delete(self, *nombres):
+        with self._candado:
+            return sum(self._datos.pop(n, None) is not None for n in nombres)
+
+    def scan_iter(self, match=None, count=None):
+        with self._candado:
+            nombres = list(self._datos)
+        return (n for n in nombres if match is None or fnmatch.fnmatchcase(n, match))
+
+
+def _crear_backend(app, max_entradas=None, prefijo="apiescolar:"):
+    tipo = app.config.get("CACHE_BACKEND", "memoria")
+    ttl = app.config.get("CACHE_TTL", 60)
+    if tipo == "memoria":
+        return CacheLRU(max_entradas or app.config.get("CACHE_MAX_ENTRADAS", 1024), ttl)
+    if tipo == "local":
+        return CacheCompartido(ClienteMemoria(), prefijo, ttl=ttl)
+    if tipo == "redis":
+        try:
+            import redis  # dependencia opcional, solo si se elige este backend
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND='redis' requiere instalar el paquete redis "
+                               "(ver requirements-opcional.txt)")
+        return CacheCompartido(redis.Redis.from_url(app.config["CACHE_URL"]), prefijo, ttl=ttl)
+    raise ValueError(f"CACHE_BACKEND desconocido: {tipo}")
+
+
+class CacheRespuestas:
+    """Caché de respuestas GET con ETag / If-None-Match, invalidada por las rutas de escritura."""
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.backend = _crear_backend(app)
+        app.extensions["cache_respuestas"] = self
+
+    @property
+    def habilitada(self):
+        return current_app.config.get("CACHE_HABILITADO", True)
+
+    def obtener(self, clave):
+        return self.backend.get(clave) if self.habilitada else None
+
+    def guardar(self, clave, valor, ttl=None):
+        if self.habilitada:
+            self.backend.set(clave, valor, ttl)
+
+    def invalidar(self, *claves):
+        if self.backend is not None:
+            self.backend.delete(*claves)
+
+    def generacion(self, espacio):
+        """
+        Token vigente de un espacio de claves. Las claves que lo incluyen quedan
+        invalidadas de golpe con nueva_generacion(), sin tener que enumerarlas.
+        """
+        clave = "generacion:" + espacio
+        token = self.backend.get(clave)
+        if token is None:
+            token = uuid.uuid4().hex[:12]
+            self.backend.set(clave, token, 7 * 24 * 3600)
+        return token
+
+    def nueva_generacion(self, *espacios):
+        if self.backend is not None:
+            self.backend.delete(*("generacion:" + e for e in espacios))
+
+    def respuesta(self, clave_fn):
+        """
+        Decorador para vistas GET. 'clave_fn' recibe los mismos argumentos que la
+        vista y devuelve la clave de caché, o None para no cachear esa petición.
+        Un ETag vigente responde 304 sin tocar la base de datos.
+        """
+        def decorador(vista):
+            @wraps(vista)
+            def envoltura(*args, **kwargs):
+                clave = clave_fn(*args, **kwargs) if self.habilitada else None
+                if clave is None:
+                    return vista(*args, **kwargs)
+
+                clave = "respuesta:" + clave
+                entrada = self.backend.get(clave)
+                if entrada is None:
+                    respuesta = make_response(vista(*args, **kwargs))
+                    if respuesta.status_code != 200 or respuesta.is_streamed:
+                        return respuesta
+                    cuerpo = respuesta.get_data()
+                    etag = hashlib.sha1(cuerpo).hexdigest()
+                    entrada = (etag, cuerpo, respuesta.mimetype)
+                    replicas = current_app.extensions.get("replicas")
+                    if replicas is None or replicas.lectura_cacheable():
+                        self.backend.set(clave, entrada)
+
+                etag, cuerpo, mimetype = entrada
+                if etag in request.if_none_match:
+                    respuesta = current_app.response_class(status=304)
+                else:
+                    respuesta = current_app.response_class(cuerpo, mimetype=mimetype)
+                respuesta.set_etag(etag)
+                return respuesta
+            return envoltura
+        return decorador
+
+    def invalidar_respuestas(self, *claves):
+        self.invalidar(*("respuesta:" + c for c in claves))
@@ -0,0 +1,78 @@
+# app/commands.py
+# Comandos de mantenimiento: se ejecutan con `flask --app run <grupo> <comando>`
+import click
+from flask.cli import AppGroup
+
+resumen_cli = AppGroup("resumen", help="Resumen académico por estudiante.")
+
+
+@resumen_cli.command("reconstruir")
+def reconstruir_resumen():
+    """Recalcula el resumen académico a partir de todas las calificaciones."""
+    from app.services.resumen import reconstruir
+    filas = reconstruir()
+    click.echo(f"✅ Resumen reconstruido: {filas} filas")
+
+
+busqueda_cli = AppGroup("busqueda", help="Búsqueda de estudiantes.")
+
+
+@busqueda_cli.command("normalizar")
+def normalizar_busqueda():
+    """Agrega las columnas e índices de búsqueda si faltan y las rellena para todos los estudiantes."""
+    from app import db
+    from app.migraciones import normalizar_busqueda as normalizar, preparar_busqueda
+    with db.engine.begin() as conexion:
+        agregadas = preparar_busqueda(conexion)
+        total = normalizar(conexion)
+    if agregadas:
+        click.echo(f"  Columnas agregadas: {', '.join(agregadas)}")
+    click.echo(f"✅ Columnas de búsqueda normalizadas: {total} estudiantes")
+
+
+esquema_cli = AppGroup("esquema", help="Migraciones versionadas del esquema.")
+
+
+@esquema_cli.command("actualizar")
+@click.option("--hasta", type=int, help="Última versión a aplicar (por defecto todas)")
+def actualizar_esquema(hasta):
+    """Aplica las migraciones pendientes."""
+    from app.migraciones import actualizar
+    aplicadas = actualizar(hasta=hasta, al_aplicar=lambda v, d: click.echo(f"  {v:>3}  {d}"))
+    click.echo(f"✅ Migraciones aplicadas: {len(aplicadas)}" if aplicadas else "✅ El esquema está al día")
+
+
+@esquema_cli.command("estado")
+def estado_esquema():
+    """Muestra la versión actual y las migraciones pendientes."""
+    from app import db
+    from app.migraciones import pendientes, version_actual
+    with db.engine.connect() as conexion:
+        click.echo(f"Versión actual: {version_actual(conexion)}")
+        for version, descripcion in pendientes(conexion):
+            click.echo(f"  pendiente {version:>3}  {descripcion}")
+
+
+archivo_cli = AppGroup("archivo", help="Archivado de estudiantes inactivos.")
+
+
+@archivo_cli.command("inactivos")
+@click.option("--dias", type=int, help="Días de inactividad (por defecto ARCHIVO_DIAS_INACTIVO)")
+@click.option("--lote", type=int, help="Estudiantes por transacción (por defecto ARCHIVO_LOTE)")
+def archivar_inactivos(dias, lote):
+    """Mueve a las tablas de archivo a los estudiantes inactivos y sus calificaciones."""
+    from flask import current_app
+    from app.services.archivo import archivar_inactivos as archivar
+    dias = dias if dias is not None else current_app.config["ARCHIVO_DIAS_INACTIVO"]
+    lote = lote or current_app.config["ARCHIVO_LOTE"]
+    resultado = archivar(dias, lote, al_mover=lambda t: click.echo(
+        f"  lote {t['lotes']}: {t['estudiantes']} estudiantes, {t['calificaciones']} calificaciones"))
+    click.echo(f"✅ Archivados {resultado['estudiantes']} estudiantes y {resultado['calificaciones']} "
+               f"calificaciones en {resultado['segundos']} s ({resultado['filas_por_segundo']} filas/s)")
+
+
+def registrar_comandos(app):
+    app.cli.add_command(resumen_cli)
+    app.cli.add_command(busqueda_cli)
+    app.cli.add_command(esquema_cli)
+    app.cli.add_command(archivo_cli)
@@ -8,12 +8,135 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "clave-por-defecto-insegura")
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ECHO = True
+    # Eco de TODAS las sentencias, solo para depurar; en su lugar ver SQL_LENTA_MS
+    SQLALCHEMY_ECHO = os.getenv("SQLALCHEMY_ECHO", "0") == "1"
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-clave-insegura")
+    KARDEX_LOTE_TAMANO = int(os.getenv("KARDEX_LOTE_TAMANO", 200))
+    CALIFICACIONES_LOTE_TAMANO = int(os.getenv("CALIFICACIONES_LOTE_TAMANO", 1000))
+    ESTUDIANTES_LOTE_TAMANO = int(os.getenv("ESTUDIANTES_LOTE_TAMANO", 1000))
+    EXPORTAR_LOTE_TAMANO = int(os.getenv("EXPORTAR_LOTE_TAMANO", 1000))
+
+    # Caché de respuestas GET: "memoria" (LRU en proceso), "local" o "redis" (CACHE_URL)
+    CACHE_HABILITADO = os.getenv("CACHE_HABILITADO", "1") == "1"
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria")
+    CACHE_TTL = int(os.getenv("CACHE_TTL", 60))
+    CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", 1024))
+    CACHE_URL = os.getenv("CACHE_URL")
+    ANALITICA_CACHE_TTL = int(os.getenv("ANALITICA_CACHE_TTL", 24 * 3600))
+    RANKING_CACHE_TTL = int(os.getenv("RANKING_CACHE_TTL", 3600))
+
+    # Codificador JSON: "auto" usa orjson si está instalado, "estandar" fuerza el de Flask
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+
+    # Pool de conexiones (se ignora en SQLite, que usa su propio pool)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
+    # Réplicas de lectura (URLs separadas por coma): los GET leen de ellas por turnos
+    DB_REPLICAS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    DB_REPLICA_SONDA_SEGUNDOS = float(os.getenv("DB_REPLICA_SONDA_SEGUNDOS", 10))
+    DB_REPLICA_PEGAR_SEGUNDOS = float(os.getenv("DB_REPLICA_PEGAR_SEGUNDOS", 5))
+    DB_REPLICA_MARCAS_MAX = int(os.getenv("DB_REPLICA_MARCAS_MAX", 10000))
+
+    # Registro diferido de calificaciones: validar, encolar (202) y aplicar por lotes
+    COLA_ESCRITURA_HABILITADA = os.getenv("COLA_ESCRITURA_HABILITADA", "0") == "1"
+    COLA_ESCRITURA_LOTE = int(os.getenv("COLA_ESCRITURA_LOTE", 500))
+    COLA_ESCRITURA_VENTANA_MS = int(os.getenv("COLA_ESCRITURA_VENTANA_MS", 50))
+    COLA_ESCRITURA_MAX = int(os.getenv("COLA_ESCRITURA_MAX", 10000))
+    COLA_ESCRITURA_ESPERA = float(os.getenv("COLA_ESCRITURA_ESPERA", 1.0))
+    COLA_ESCRITURA_ESTADOS = int(os.getenv("COLA_ESCRITURA_ESTADOS", 100000))
+
+    # Roles en las rutas de escritura (admin / docente) según los claims del JWT
+    AUTH_REQUERIDA = os.getenv("AUTH_REQUERIDA", "0") == "1"
+    AUTH_USUARIOS_TTL = int(os.getenv("AUTH_USUARIOS_TTL", 300))
+    AUTH_USUARIOS_MAX = int(os.getenv("AUTH_USUARIOS_MAX", 10000))
+
+    # Hash de contraseñas (método de werkzeug con su costo); los hashes viejos se
+    # rehacen al iniciar sesión. PASSWORD_HILOS > 0 calcula en un pool acotado.
+    PASSWORD_METODO = os.getenv("PASSWORD_METODO", "scrypt:32768:8:1")
+    PASSWORD_HILOS = int(os.getenv("PASSWORD_HILOS", 0))
+    PASSWORD_COLA_MAX = int(os.getenv("PASSWORD_COLA_MAX", 32))
+    PASSWORD_ESPERA = float(os.getenv("PASSWORD_ESPERA", 2.0))
+
+    # Idempotency-Key en POST: respuestas guardadas (mismo backend que CACHE_BACKEND)
+    IDEMPOTENCIA_TTL = int(os.getenv("IDEMPOTENCIA_TTL", 24 * 3600))
+    IDEMPOTENCIA_MAX_ENTRADAS = int(os.getenv("IDEMPOTENCIA_MAX_ENTRADAS", 10000))
+    IDEMPOTENCIA_ESPERA = float(os.getenv("IDEMPOTENCIA_ESPERA", 10))
+    IDEMPOTENCIA_EN_CURSO_TTL = int(os.getenv("IDEMPOTENCIA_EN_CURSO_TTL", 60))
+
+    # Búsqueda de estudiantes: "auto" (SQL en PostgreSQL, índice en memoria en SQLite), "sql" o "memoria"
+    BUSQUEDA_INDICE = os.getenv("BUSQUEDA_INDICE", "auto")
+
+    # Modo asíncrono (asgi.py): por defecto DATABASE_URL con aiosqlite/asyncpg
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+    # /health reutiliza el resultado de la sonda a la base durante estos segundos
+    HEALTH_CACHE_SEGUNDOS = float(os.getenv("HEALTH_CACHE_SEGUNDOS", 5))
+
+    # Consultas lentas: log JSON muestreado (con EXPLAIN opcional) y huellas en /api/admin/consultas
+    SQL_REGISTRO_HABILITADO = os.getenv("SQL_REGISTRO_HABILITADO", "1") == "1"
+    SQL_LENTA_MS = float(os.getenv("SQL_LENTA_MS", 200))
+    SQL_MUESTREO = float(os.getenv("SQL_MUESTREO", 1.0))
+    SQL_EXPLAIN = os.getenv("SQL_EXPLAIN", "0") == "1"
+    SQL_EXPLAIN_SEGUNDOS = float(os.getenv("SQL_EXPLAIN_SEGUNDOS", 300))
+    SQL_HUELLAS_MAX = int(os.getenv("SQL_HUELLAS_MAX", 1000))
+
+    # Archivado (flask archivo inactivos): inactivos desde hace más de estos días, por lotes
+    ARCHIVO_DIAS_INACTIVO = int(os.getenv("ARCHIVO_DIAS_INACTIVO", 365))
+    ARCHIVO_LOTE = int(os.getenv("ARCHIVO_LOTE", 500))
+
+    # Latencia y consultas SQL por endpoint, expuestas en /metrics
+    METRICAS_HABILITADAS = os.getenv("METRICAS_HABILITADAS", "1") == "1"
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    SQL_LENTA_MS = float(os.getenv("SQL_LENTA_MS", 50))
+    SQL_EXPLAIN = os.getenv("SQL_EXPLAIN", "1") == "1"
 
 class ProductionConfig(Config):
     DEBUG = False
-    SQLALCHEMY_ECHO = False
+    SQL_MUESTREO = float(os.getenv("SQL_MUESTREO", 0.1))
+    PASSWORD_HILOS = int(os.getenv("PASSWORD_HILOS", 4))
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+
+class TestingConfig(Config):
+    TESTING = True
+    # Costo mínimo: las pruebas crean y verifican muchas contraseñas
+    PASSWORD_METODO = os.getenv("PASSWORD_METODO", "pbkdf2:sha256:1000")
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite://")
+
+
+CONFIGURACIONES = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+    "testing": TestingConfig,
+}
+
+
+def obtener_config(nombre=None):
+    """Elige la configuración según APP_ENV (o FLASK_ENV); por defecto development."""
+    nombre = nombre or os.getenv("APP_ENV") or os.getenv("FLASK_ENV") or "development"
+    if nombre not in CONFIGURACIONES:
+        raise ValueError(f"Entorno desconocido: {nombre}")
+    return CONFIGURACIONES[nombre]
+
+
+def opciones_motor(config):
+    """SQLALCHEMY_ENGINE_OPTIONS a partir de los valores DB_POOL_* de la configuración."""
+    uri = config.get("SQLALCHEMY_DATABASE_URI") or ""
+    if uri.startswith("sqlite"):
+        return {}
+
+    from app.pool import QueuePoolMedido
+    return {
+        "poolclass": QueuePoolMedido,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
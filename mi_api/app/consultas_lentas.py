@@ -0,0 +1,179 @@
+# app/consultas_lentas.py
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+_ESPACIOS = re.compile(r"\s+")
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_MARCA = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_LISTAS = re.compile(rf"\(\s*{_MARCA}(?:\s*,\s*{_MARCA})*\s*\)")
+# Con EXPLAIN se pide el plan sin ejecutar la sentencia; solo para lecturas
+EXPLAIN = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+ORDENES = ("total_ms", "max_ms", "llamadas", "lentas")
+
+
+@lru_cache(maxsize=4096)
+def normalizar_sql(sentencia):
+    """
+    Forma canónica de una sentencia y su huella: sin literales, con espacios
+    simples y las listas de parámetros colapsadas, así 'IN (?, ?, ?)' e
+    'IN (?, ?)' cuentan como la misma consulta.
+    """
+    texto = _LITERALES.sub("?", _ESPACIOS.sub(" ", sentencia).strip())
+    texto = _LISTAS.sub("(...)", texto)
+    return texto, hashlib.sha1(texto.encode()).hexdigest()[:16]
+
+
+def huella_parametros(parametros, executemany):
+    """Tipos de los parámetros y un hash de sus valores: identifica repeticiones sin mostrar datos."""
+    if executemany:
+        return {"filas": len(parametros)}
+    valores = list(parametros.values()) if isinstance(parametros, dict) else list(parametros or ())
+    return {
+        "tipos": [type(v).__name__ for v in valores],
+        "hash": hashlib.sha1(repr(valores).encode()).hexdigest()[:12],
+    }
+
+
+class RegistroConsultas:
+    """
+    Registro de consultas lentas en lugar de SQLALCHEMY_ECHO. Cada sentencia
+    se agrupa por su huella normalizada (llamadas, tiempo total y máximo,
+    endpoints que la originan) para /api/admin/consultas.
+
+    Las que tardan al menos SQL_LENTA_MS se escriben en el log como JSON (una
+    fracción SQL_MUESTREO de ellas) con la huella de sus parámetros y, con
+    SQL_EXPLAIN, el plan de ejecución, capturado a lo sumo una vez cada
+    SQL_EXPLAIN_SEGUNDOS por huella.
+    """
+
+    def __init__(self, app=None):
+        self._candado = threading.Lock()
+        self._huellas = {}
+        self.descartadas = 0
+        self.config = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["consultas_lentas"] = self
+        self.config = {
+            "umbral": app.config.get("SQL_LENTA_MS", 200) / 1000,
+            "muestreo": app.config.get("SQL_MUESTREO", 1.0),
+            "explain": app.config.get("SQL_EXPLAIN", False),
+            "explain_cada": app.config.get("SQL_EXPLAIN_SEGUNDOS", 300),
+            "maximo": app.config.get("SQL_HUELLAS_MAX", 1000),
+        }
+        if not app.config.get("SQL_REGISTRO_HABILITADO", True):
+            return
+        if not event.contains(Engine, "before_cursor_execute", self._antes):
+            event.listen(Engine, "before_cursor_execute", self._antes)
+            event.listen(Engine, "after_cursor_execute", self._despues)
+
+    # El inicio va en el contexto de ejecución de la sentencia: si falla no hay
+    # after_cursor_execute, y una pila por conexión quedaría desalineada
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._inicio_sql = time.perf_counter()
+
+    def _despues(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, "_inicio_sql", None)
+        if inicio is None:
+            return
+        duracion = time.perf_counter() - inicio
+        texto, huella = normalizar_sql(statement)
+        endpoint = request.endpoint if has_request_context() else None
+        lenta = duracion >= self.config["umbral"]
+
+        with self._candado:
+            datos = self._huellas.get(huella)
+            if datos is None:
+                if len(self._huellas) >= self.config["maximo"]:
+                    self.descartadas += 1
+                    return
+                datos = self._huellas[huella] = {"sql": texto, "llamadas": 0, "lentas": 0, "total_ms": 0.0,
+                                                 "max_ms": 0.0, "endpoints": {}, "plan": None, "plan_en": 0.0}
+            datos["llamadas"] += 1
+            datos["lentas"] += lenta
+            datos["total_ms"] += duracion * 1000
+            datos["max_ms"] = max(datos["max_ms"], duracion * 1000)
+            clave = endpoint or "-"
+            datos["endpoints"][clave] = datos["endpoints"].get(clave, 0) + 1
+            pedir_plan = (lenta and self.config["explain"] and not executemany
+                          and time.monotonic() - datos["plan_en"] >= self.config["explain_cada"])
+            if pedir_plan:
+                datos["plan_en"] = time.monotonic()
+
+        if not lenta or random.random() >= self.config["muestreo"]:
+            return
+        registro = {
+            "evento": "consulta_lenta",
+            "duracion_ms": round(duracion * 1000, 3),
+            "huella": huella,
+            "sql": texto[:2000],
+            "parametros": huella_parametros(parameters, executemany),
+            "endpoint": endpoint,
+            "metodo": request.method if has_request_context() else None,
+        }
+        if pedir_plan:
+            plan = self._explicar(conn, statement, parameters)
+            if plan is not None:
+                registro["plan"] = plan
+                with self._candado:
+                    datos["plan"] = plan
+        log.warning("%s", json.dumps(registro, ensure_ascii=False, default=str))
+
+    @staticmethod
+    def _explicar(conn, statement, parameters):
+        """Plan de la sentencia en la misma conexión; None si no aplica o falla."""
+        prefijo = EXPLAIN.get(conn.dialect.name)
+        if prefijo is None or statement.lstrip()[:6].upper() not in ("SELECT", "WITH"):
+            return None
+        postgres = conn.dialect.name == "postgresql"
+        cursor = conn.connection.cursor()
+        try:
+            # En PostgreSQL un error abortaría la transacción de la petición
+            if postgres:
+                cursor.execute("SAVEPOINT explain_consulta_lenta")
+            cursor.execute(prefijo + statement, parameters)
+            filas = cursor.fetchall()
+            if postgres:
+                cursor.execute("RELEASE SAVEPOINT explain_consulta_lenta")
+            return [f[0] if postgres else f[-1] for f in filas]
+        except Exception as e:
+            log.debug("No se pudo obtener el plan: %s", e)
+            if postgres:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_consulta_lenta")
+            return None
+        finally:
+            cursor.close()
+
+    def resumen(self, orden="total_ms", limite=20, endpoint=None):
+        """Las huellas con más 'orden', opcionalmente solo las originadas en endpoints con ese prefijo."""
+        with self._candado:
+            filas = [dict(datos, huella=h, endpoints=dict(datos["endpoints"]))
+                     for h, datos in self._huellas.items()]
+            descartadas = self.descartadas
+        if endpoint:
+            filas = [f for f in filas if any(e.startswith(endpoint) for e in f["endpoints"])]
+        filas.sort(key=lambda f: f[orden], reverse=True)
+        for f in filas[:limite]:
+            f.pop("plan_en")
+            f["total_ms"], f["max_ms"] = round(f["total_ms"], 3), round(f["max_ms"], 3)
+            f["media_ms"] = round(f["total_ms"] / f["llamadas"], 3)
+        return {"huellas": len(filas), "descartadas": descartadas, "consultas": filas[:limite]}
+
+    def reiniciar(self):
+        with self._candado:
+            self._huellas.clear()
+            self.descartadas = 0
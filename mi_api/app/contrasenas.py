@@ -0,0 +1,135 @@
+# app/contrasenas.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PoolSaturado(Exception):
+    """Hay demasiadas verificaciones en curso o en cola: el cliente debe reintentar."""
+
+
+@lru_cache(maxsize=8)
+def prefijo_de(metodo):
+    """
+    Forma completa de un método de werkzeug ('scrypt' -> 'scrypt:32768:8:1'),
+    tal como queda al inicio del hash. Cuesta un hash, una vez por método.
+    """
+    return generate_password_hash("", method=metodo, salt_length=1).split("$", 1)[0]
+
+
+def necesita_rehash(password_hash, metodo):
+    """True si el hash guardado no usa el algoritmo y costo configurados."""
+    return password_hash.split("$", 1)[0] != prefijo_de(metodo)
+
+
+class VerificadorContrasenas:
+    """
+    Hash y verificación de contraseñas con el método de PASSWORD_METODO
+    (p. ej. "scrypt:32768:8:1" o "pbkdf2:sha256:600000").
+
+    Con PASSWORD_HILOS > 0 el cálculo corre en un pool acotado: a lo sumo
+    PASSWORD_HILOS hashes a la vez y PASSWORD_COLA_MAX esperando. Si no hay
+    lugar en PASSWORD_ESPERA segundos se lanza PoolSaturado, así una ola de
+    logins no acapara la CPU ni los hilos que atienden el resto de la API
+    (hashlib suelta el GIL mientras calcula scrypt y PBKDF2).
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._ejecutor = None
+        self._cupos = None
+        self._hilos = 0
+        self._candado = threading.Lock()
+        self._contadores = {"en_curso": 0, "en_cola": 0, "completadas": 0, "rechazadas": 0,
+                            "segundos_hash": 0.0, "segundos_espera": 0.0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        hilos = self._hilos = app.config.get("PASSWORD_HILOS", 0)
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False)
+            self._ejecutor = None
+        if hilos > 0:
+            self._ejecutor = ThreadPoolExecutor(hilos, thread_name_prefix="contrasenas")
+            self._cupos = threading.BoundedSemaphore(hilos + app.config.get("PASSWORD_COLA_MAX", 32))
+        app.extensions["contrasenas"] = self
+        metricas = app.extensions.get("metricas")
+        if metricas is not None:
+            metricas.agregar_colector(self.lineas_metricas)
+
+    @property
+    def metodo(self):
+        return current_app.config.get("PASSWORD_METODO", "scrypt")
+
+    def generar(self, password):
+        return self._ejecutar(generate_password_hash, password, self.metodo)
+
+    def verificar(self, password_hash, password):
+        return self._ejecutar(check_password_hash, password_hash, password)
+
+    def _ejecutar(self, funcion, *args):
+        if self._ejecutor is None:
+            return self._medido(funcion, *args)
+
+        encolada = time.perf_counter()
+        if not self._cupos.acquire(timeout=current_app.config.get("PASSWORD_ESPERA", 2.0)):
+            self._sumar(rechazadas=1)
+            raise PoolSaturado("Demasiadas contraseñas por verificar, intenta de nuevo en unos segundos")
+        self._sumar(en_cola=1)
+
+        def tarea():
+            self._sumar(en_cola=-1, segundos_espera=time.perf_counter() - encolada)
+            return self._medido(funcion, *args)
+
+        try:
+            return self._ejecutor.submit(tarea).result()
+        finally:
+            self._cupos.release()
+
+    def _medido(self, funcion, *args):
+        self._sumar(en_curso=1)
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args)
+        finally:
+            self._sumar(en_curso=-1, completadas=1, segundos_hash=time.perf_counter() - inicio)
+
+    def _sumar(self, **cambios):
+        with self._candado:
+            for clave, valor in cambios.items():
+                self._contadores[clave] += valor
+
+    def estado(self):
+        with self._candado:
+            datos = dict(self._contadores)
+        datos["hilos"] = self._hilos
+        datos["metodo"] = self.app.config.get("PASSWORD_METODO", "scrypt")
+        return datos
+
+    def lineas_metricas(self):
+        datos = self.estado()
+        return [
+            "# HELP password_hash_in_progress Hashes de contraseña calculándose ahora.",
+            "# TYPE password_hash_in_progress gauge",
+            f"password_hash_in_progress {datos['en_curso']}",
+            "# HELP password_hash_queued Hashes de contraseña esperando un hilo del pool.",
+            "# TYPE password_hash_queued gauge",
+            f"password_hash_queued {datos['en_cola']}",
+            "# HELP password_hash_total Hashes de contraseña calculados.",
+            "# TYPE password_hash_total counter",
+            f"password_hash_total {datos['completadas']}",
+            "# HELP password_hash_rejected_total Verificaciones rechazadas por pool saturado.",
+            "# TYPE password_hash_rejected_total counter",
+            f"password_hash_rejected_total {datos['rechazadas']}",
+            "# HELP password_hash_seconds_total Tiempo calculando hashes de contraseña.",
+            "# TYPE password_hash_seconds_total counter",
+            f"password_hash_seconds_total {datos['segundos_hash']}",
+            "# HELP password_hash_wait_seconds_total Tiempo esperando un hilo del pool.",
+            "# TYPE password_hash_wait_seconds_total counter",
+            f"password_hash_wait_seconds_total {datos['segundos_espera']}",
+        ]
@@ -0,0 +1,194 @@
+# app/escrituras.py
+import atexit
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+PENDIENTE, APLICADA, FALLIDA = "pendiente", "aplicada", "fallida"
+_FIN = object()
+
+
+class ColaLlena(Exception):
+    """La cola de escrituras no tiene lugar: el cliente debe reintentar más tarde."""
+
+
+class ColaEscrituras:
+    """
+    Escritura diferida con commit agrupado. Las rutas validan y encolan; un hilo
+    de fondo junta lo encolado hasta COLA_ESCRITURA_LOTE elementos o
+    COLA_ESCRITURA_VENTANA_MS milisegundos y lo aplica con un solo commit.
+
+    La cola es acotada (COLA_ESCRITURA_MAX): si está llena, encolar() espera
+    COLA_ESCRITURA_ESPERA segundos y luego lanza ColaLlena. Al terminar el
+    proceso (o con detener()) la cola se cierra: se aplica lo pendiente y
+    encolar() lanza ColaLlena en lugar de arrancar otro hilo. Revisar el cierre y
+    encolar ocurren bajo el mismo candado, así que todo lo aceptado se aplica. El
+    estado de cada escritura se consulta por su id en el mismo proceso que la aceptó
+    (se recuerdan hasta COLA_ESCRITURA_ESTADOS).
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._aplicar = None
+        self._cola = None
+        self._hilo = None
+        self._cerrada = False
+        self._al_salir = False
+        self._candado = threading.Lock()
+        # Serializa encolar() con el cierre; el hilo de fondo nunca lo toma
+        self._candado_cola = threading.Lock()
+        self._estados = OrderedDict()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self._cerrada = False
+        app.extensions["cola_escrituras"] = self
+        if not self._al_salir:
+            atexit.register(self.detener)
+            self._al_salir = True
+
+    @property
+    def habilitada(self):
+        return self.app is not None and self.app.config.get("COLA_ESCRITURA_HABILITADA", False)
+
+    def registrar_aplicador(self, funcion):
+        """
+        'funcion(lote)' escribe una lista de elementos y hace commit; devuelve un
+        resultado por elemento o lanza una excepción si el lote falla completo.
+        """
+        self._aplicar = funcion
+        return funcion
+
+    def _arrancar(self):
+        with self._candado:
+            if self._cerrada:
+                raise ColaLlena("La cola de escrituras está cerrada, intenta de nuevo en unos segundos")
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._cola = queue.Queue(maxsize=self.app.config.get("COLA_ESCRITURA_MAX", 10000))
+            self._hilo = threading.Thread(target=self._trabajar, name="cola-escrituras", daemon=True)
+            self._hilo.start()
+
+    def encolar(self, elemento):
+        """Agrega un elemento ya validado y devuelve su id de seguimiento (ColaLlena si está llena o cerrada)."""
+        id = uuid.uuid4().hex
+        # detener() no puede colarse entre revisar el cierre y el put: un elemento
+        # aceptado detrás del aviso de fin quedaría pendiente para siempre
+        with self._candado_cola:
+            self._arrancar()
+            self._guardar_estado(id, {"estado": PENDIENTE})
+            try:
+                self._cola.put((id, elemento), timeout=self.app.config.get("COLA_ESCRITURA_ESPERA", 1.0))
+            except queue.Full:
+                self._olvidar(id)
+                raise ColaLlena("Demasiadas escrituras pendientes, intenta de nuevo en unos segundos")
+        return id
+
+    def estado(self, id):
+        with self._candado:
+            estado = self._estados.get(id)
+            return dict(estado, id=id) if estado is not None else None
+
+    def pendientes(self):
+        return self._cola.qsize() if self._cola is not None else 0
+
+    def detener(self, timeout=30):
+        """Deja de aceptar trabajo y espera (hasta 'timeout' segundos) a que se aplique lo encolado."""
+        limite = time.monotonic() + timeout
+        with self._candado_cola:
+            with self._candado:
+                self._cerrada = True
+            hilo = self._hilo
+            if hilo is None or not hilo.is_alive():
+                return
+            try:
+                self._cola.put(_FIN, timeout=timeout)
+            except queue.Full:
+                log.warning("La cola de escrituras no se vació en %ss; quedan %d pendientes",
+                            timeout, self.pendientes())
+                return
+        hilo.join(max(0, limite - time.monotonic()))
+
+    def _guardar_estado(self, id, estado):
+        with self._candado:
+            self._estados[id] = estado
+            self._estados.move_to_end(id)
+            # Acotado: se olvidan primero las escrituras ya resueltas más antiguas
+            maximo = self.app.config.get("COLA_ESCRITURA_ESTADOS", 100000)
+            while len(self._estados) > maximo:
+                antiguo, valor = next(iter(self._estados.items()))
+                if valor["estado"] == PENDIENTE:
+                    break
+                del self._estados[antiguo]
+
+    def _olvidar(self, id):
+        with self._candado:
+            self._estados.pop(id, None)
+
+    def _siguiente_lote(self):
+        """Bloquea hasta el primer elemento y junta más hasta llenar el lote o cerrar la ventana."""
+        tamano = self.app.config.get("COLA_ESCRITURA_LOTE", 500)
+        ventana = self.app.config.get("COLA_ESCRITURA_VENTANA_MS", 50) / 1000
+        primero = self._cola.get()
+        if primero is _FIN:
+            return [], True
+        lote, limite = [primero], time.monotonic() + ventana
+        while len(lote) < tamano:
+            restante = limite - time.monotonic()
+            try:
+                elemento = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if elemento is _FIN:
+                return lote, True
+            lote.append(elemento)
+        return lote, False
+
+    def _trabajar(self):
+        terminar = False
+        while not terminar:
+            lote, terminar = self._siguiente_lote()
+            if not lote:
+                continue
+            with self.app.app_context():
+                self._aplicar_lote(lote)
+        # Lo que quedó detrás del aviso de fin también se aplica
+        resto = []
+        while True:
+            try:
+                elemento = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if elemento is not _FIN:
+                resto.append(elemento)
+        if resto:
+            with self.app.app_context():
+                self._aplicar_lote(resto)
+
+    def _aplicar_lote(self, lote):
+        try:
+            resultados = self._aplicar([e for _, e in lote])
+        except Exception:
+            log.exception("Falló un lote de %d escrituras; se reintentan una por una", len(lote))
+            resultados = None
+
+        if resultados is not None:
+            for (id, _), resultado in zip(lote, resultados):
+                self._guardar_estado(id, {"estado": APLICADA, "resultado": resultado})
+            return
+
+        # Un elemento inválido no debe tirar a los demás del lote
+        for id, elemento in lote:
+            try:
+                resultado = self._aplicar([elemento])[0]
+                self._guardar_estado(id, {"estado": APLICADA, "resultado": resultado})
+            except Exception as e:
+                log.warning("Escritura %s fallida: %s", id, e)
+                self._guardar_estado(id, {"estado": FALLIDA, "error": str(e)})
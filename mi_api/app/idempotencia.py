@@ -0,0 +1,123 @@
+# app/idempotencia.py
+import hashlib
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from .cache import _crear_backend, clave_cliente
+
+CABECERA = "Idempotency-Key"
+EN_CURSO, COMPLETA = "en_curso", "completa"
+# Cabeceras de la respuesta original que se repiten al reintentar
+CABECERAS_GUARDADAS = ("Content-Type", "Location", "Retry-After")
+
+
+class Idempotencia:
+    """
+    Soporte de la cabecera Idempotency-Key en las rutas POST. La primera
+    respuesta (salvo las 5xx) se guarda por cliente, endpoint y clave durante
+    IDEMPOTENCIA_TTL segundos; un reintento con la misma clave la recibe tal
+    cual, con 'Idempotent-Replayed: true', sin ejecutar la vista.
+
+    Si el duplicado llega mientras la original sigue en curso, espera su
+    resultado hasta IDEMPOTENCIA_ESPERA segundos (409 si no termina). Reusar la
+    clave con otro cuerpo es un error 422. Con CACHE_BACKEND "redis" la
+    coordinación vale entre procesos (SET NX).
+
+    Las claves en curso se llevan además en un registro del proceso que nunca
+    se desaloja (a lo más una por petición atendida), así que un LRU lleno no
+    deja pasar un duplicado mientras la original se ejecuta.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self._terminada = threading.Condition()
+        self._en_curso = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.backend = _crear_backend(app, app.config.get("IDEMPOTENCIA_MAX_ENTRADAS", 10000),
+                                      prefijo="apiescolar:idempotencia:")
+        app.extensions["idempotencia"] = self
+
+    def idempotente(self, vista):
+        """Decorador para vistas POST; sin la cabecera la vista se ejecuta normalmente."""
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            llave = request.headers.get(CABECERA)
+            if not llave:
+                return vista(*args, **kwargs)
+            if len(llave) > 255:
+                return jsonify({"error": f"{CABECERA} no puede pasar de 255 caracteres"}), 400
+
+            config = current_app.config
+            clave = f"{clave_cliente()}:{request.endpoint}:{llave}"
+            huella = hashlib.sha256(request.get_data()).hexdigest()
+            limite = time.monotonic() + config.get("IDEMPOTENCIA_ESPERA", 10)
+            while True:
+                # Quien logra reservar la clave ejecuta; los demás esperan su resultado
+                if self._reservar(clave, huella, config.get("IDEMPOTENCIA_EN_CURSO_TTL", 60)):
+                    return self._ejecutar(clave, huella, vista, args, kwargs)
+                entrada = self._entrada(clave)
+                if entrada is not None and entrada["huella"] != huella:
+                    return jsonify({"error": f"{CABECERA} ya se usó con otro contenido"}), 422
+                if entrada is not None and entrada["estado"] == COMPLETA:
+                    return self._repetir(entrada)
+                if time.monotonic() >= limite:
+                    return (jsonify({"error": "Una petición con la misma clave sigue en curso"}), 409,
+                            {"Retry-After": "1"})
+                # Aviso inmediato dentro del proceso; entre procesos se vuelve a consultar
+                with self._terminada:
+                    self._terminada.wait(0.05)
+        return envoltura
+
+    def _reservar(self, clave, huella, ttl):
+        with self._terminada:
+            if clave in self._en_curso:
+                return False
+            if not self.backend.add(clave, {"estado": EN_CURSO, "huella": huella}, ttl):
+                return False
+            self._en_curso[clave] = huella
+            return True
+
+    def _entrada(self, clave):
+        """La reserva local si la clave está en curso en este proceso; si no, la del backend."""
+        with self._terminada:
+            huella = self._en_curso.get(clave)
+        if huella is not None:
+            return {"estado": EN_CURSO, "huella": huella}
+        return self.backend.get(clave)
+
+    def _ejecutar(self, clave, huella, vista, args, kwargs):
+        try:
+            respuesta = make_response(vista(*args, **kwargs))
+        except Exception:
+            self.backend.delete(clave)
+            self._avisar(clave)
+            raise
+        if respuesta.status_code >= 500 or respuesta.is_streamed:
+            # Un error del servidor no se fija: el cliente puede reintentar con la misma clave
+            self.backend.delete(clave)
+        else:
+            self.backend.set(clave, {
+                "estado": COMPLETA,
+                "huella": huella,
+                "status": respuesta.status_code,
+                "cuerpo": respuesta.get_data(),
+                "cabeceras": [(k, v) for k, v in respuesta.headers if k in CABECERAS_GUARDADAS],
+            }, current_app.config.get("IDEMPOTENCIA_TTL", 24 * 3600))
+        self._avisar(clave)
+        return respuesta
+
+    def _avisar(self, clave):
+        with self._terminada:
+            self._en_curso.pop(clave, None)
+            self._terminada.notify_all()
+
+    @staticmethod
+    def _repetir(entrada):
+        respuesta = current_app.response_class(entrada["cuerpo"], status=entrada["status"],
+                                               headers=entrada["cabeceras"])
+        respuesta.headers["Idempotent-Replayed"] = "true"
+        return respuesta
@@ -0,0 +1,169 @@
+# app/metricas.py
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+CABECERA_CONSULTAS = "X-Consultas-SQL"
+
+
+class Histograma:
+    """Histograma acumulativo al estilo Prometheus (buckets fijos, suma y conteo)."""
+
+    __slots__ = ("buckets", "conteos", "suma", "total")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * (len(buckets) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.conteos[bisect_left(self.buckets, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, conteo in zip(self.buckets, self.conteos):
+            acumulado += conteo
+            yield f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}'
+        yield f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {self.total}'
+        yield f"{nombre}_sum{{{etiquetas}}} {self.suma}"
+        yield f"{nombre}_count{{{etiquetas}}} {self.total}"
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _antes_de_sql(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "consultas_sql" in g:
+        g.inicio_sql = time.perf_counter()
+
+
+def _despues_de_sql(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "consultas_sql" in g:
+        g.consultas_sql += 1
+        g.tiempo_sql += time.perf_counter() - g.pop("inicio_sql", time.perf_counter())
+
+
+class Metricas:
+    """
+    Latencia por endpoint, códigos de estado y consultas SQL por petición.
+    Las consultas se cuentan con eventos del Engine y se acumulan en 'g'.
+
+    Las respuestas en streaming siguen consultando la base mientras se
+    transmiten: se registran al cerrarse el flujo y no llevan la cabecera
+    X-Consultas-SQL, que saldría antes de conocer el total.
+
+    Una excepción no manejada puede saltarse after_request (p. ej. con
+    PROPAGATE_EXCEPTIONS o si falla otro after_request): entonces la petición
+    se registra como 500 al desmontarse el contexto.
+    """
+
+    def __init__(self, app=None):
+        self._candado = threading.Lock()
+        self.latencias = defaultdict(lambda: Histograma(BUCKETS_LATENCIA))
+        self.consultas = defaultdict(lambda: Histograma(BUCKETS_CONSULTAS))
+        self.tiempo_sql = defaultdict(float)
+        self.estados = defaultdict(int)
+        self.colectores = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["metricas"] = self
+        if not app.config.get("METRICAS_HABILITADAS", True):
+            return
+        if not event.contains(Engine, "before_cursor_execute", _antes_de_sql):
+            event.listen(Engine, "before_cursor_execute", _antes_de_sql)
+            event.listen(Engine, "after_cursor_execute", _despues_de_sql)
+        app.before_request(self._iniciar)
+        app.after_request(self._registrar)
+        app.teardown_request(self._registrar_error)
+
+    def _iniciar(self):
+        g.pop("metricas_registradas", None)
+        g.inicio_peticion = time.perf_counter()
+        g.consultas_sql = 0
+        g.tiempo_sql = 0.0
+
+    def _registrar(self, respuesta):
+        if "inicio_peticion" not in g:
+            return respuesta
+        g.metricas_registradas = True
+        clave = (request.endpoint or "desconocido", request.method, respuesta.status_code)
+        # is_streamed también es cierto para cuerpos ya armados envueltos en un
+        # iterador (p. ej. los errores HTTP); solo los generadores se transmiten
+        if inspect.isgenerator(respuesta.response):
+            # El mismo 'g' sigue acumulando mientras stream_with_context transmite
+            estado = g._get_current_object()
+            respuesta.call_on_close(lambda: self._observar(clave, estado))
+            return respuesta
+        self._observar(clave, g)
+        respuesta.headers[CABECERA_CONSULTAS] = str(g.consultas_sql)
+        return respuesta
+
+    def _registrar_error(self, error):
+        if "inicio_peticion" not in g or "metricas_registradas" in g:
+            return
+        self._observar((request.endpoint or "desconocido", request.method, 500), g)
+
+    def _observar(self, clave, estado):
+        duracion = time.perf_counter() - estado.inicio_peticion
+        with self._candado:
+            self.latencias[clave[:2]].observar(duracion)
+            self.consultas[clave[:2]].observar(estado.consultas_sql)
+            self.tiempo_sql[clave[:2]] += estado.tiempo_sql
+            self.estados[clave] += 1
+
+    def agregar_colector(self, funcion):
+        """'funcion()' devuelve líneas extra en formato Prometheus para /metrics."""
+        if funcion not in self.colectores:
+            self.colectores.append(funcion)
+
+    def exportar(self):
+        """Texto en formato de exposición de Prometheus (0.0.4)."""
+        with self._candado:
+            lineas = [
+                "# HELP http_request_duration_seconds Latencia de las peticiones HTTP.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (endpoint, metodo), h in sorted(self.latencias.items()):
+                lineas.extend(h.lineas("http_request_duration_seconds",
+                                       f'endpoint="{_escapar(endpoint)}",method="{metodo}"'))
+
+            lineas += [
+                "# HELP http_requests_total Peticiones HTTP por código de estado.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (endpoint, metodo, estado), n in sorted(self.estados.items()):
+                lineas.append(f'http_requests_total{{endpoint="{_escapar(endpoint)}",'
+                              f'method="{metodo}",status="{estado}"}} {n}')
+
+            lineas += [
+                "# HELP db_queries_per_request Sentencias SQL ejecutadas por petición.",
+                "# TYPE db_queries_per_request histogram",
+            ]
+            for (endpoint, metodo), h in sorted(self.consultas.items()):
+                lineas.extend(h.lineas("db_queries_per_request",
+                                       f'endpoint="{_escapar(endpoint)}",method="{metodo}"'))
+
+            lineas += [
+                "# HELP db_query_seconds_total Tiempo total en sentencias SQL.",
+                "# TYPE db_query_seconds_total counter",
+            ]
+            for (endpoint, metodo), segundos in sorted(self.tiempo_sql.items()):
+                lineas.append(f'db_query_seconds_total{{endpoint="{_escapar(endpoint)}",'
+                              f'method="{metodo}"}} {segundos}')
+        for colector in self.colectores:
+            lineas.extend(colector())
+        return "\n".join(lineas) + "\n"
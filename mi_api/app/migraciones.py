@@ -0,0 +1,170 @@
+# app/migraciones.py
+"""
+Migraciones versionadas del esquema, en lugar de db.create_all(). La tabla
+version_esquema guarda cuáles se aplicaron; cada una corre en su propia
+transacción y se registra al terminar.
+
+Una base nueva recibe en la migración 1 el esquema completo de los modelos
+actuales, así que toda migración posterior debe ser idempotente (crear con
+checkfirst, agregar columnas solo si faltan): en una base nueva no tiene nada
+que hacer, en una existente pone al día lo que falte.
+
+    flask --app run esquema actualizar
+    flask --app run esquema estado
+"""
+from datetime import datetime
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, bindparam, column, func, inspect, select, table, text,
+    update,
+)
+from app import db
+
+version_esquema = Table(
+    "version_esquema", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("descripcion", String(200), nullable=False),
+    Column("aplicada_en", DateTime, nullable=False),
+)
+
+MIGRACIONES = []
+
+
+def migracion(version, descripcion):
+    """Registra 'funcion(conexion)' como la migración 'version'."""
+    def decorador(funcion):
+        MIGRACIONES.append((version, descripcion, funcion))
+        MIGRACIONES.sort(key=lambda m: m[0])
+        return funcion
+    return decorador
+
+
+def _crear_indices(conexion, tabla):
+    """Índices del modelo que falten; los de columnas aún no agregadas los crea la migración que las agrega."""
+    existentes = {c["name"] for c in inspect(conexion).get_columns(tabla.name)}
+    for indice in tabla.indexes:
+        if {c.name for c in indice.columns} <= existentes:
+            indice.create(conexion, checkfirst=True)
+
+
+def _columnas(tabla, *nombres):
+    """
+    Solo esas columnas de 'tabla', sin los default/onupdate del modelo: un UPDATE
+    de una migración no debe tocar columnas que tal vez todavía no existen.
+    """
+    return table(tabla.name, *(column(n) for n in nombres))
+
+
+def agregar_columnas(conexion, tabla, nombres):
+    """ALTER TABLE ... ADD COLUMN de las columnas del modelo que falten; devuelve las agregadas."""
+    existentes = {c["name"] for c in inspect(conexion).get_columns(tabla.name)}
+    faltantes = [n for n in nombres if n not in existentes]
+    for nombre in faltantes:
+        tipo = tabla.c[nombre].type.compile(conexion.dialect)
+        conexion.execute(text(f"ALTER TABLE {tabla.name} ADD COLUMN {nombre} {tipo}"))
+    return faltantes
+
+
+def preparar_busqueda(conexion):
+    """Columnas normalizadas e índices de búsqueda de estudiantes; devuelve las columnas agregadas."""
+    from app.models.estudiante import COLUMNAS_BUSQUEDA, Estudiante
+    faltantes = agregar_columnas(conexion, Estudiante.__table__, COLUMNAS_BUSQUEDA)
+    if conexion.dialect.name == "postgresql":
+        conexion.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    _crear_indices(conexion, Estudiante.__table__)
+    return faltantes
+
+
+@migracion(1, "Esquema base")
+def _esquema_base(conexion):
+    db.metadata.create_all(conexion)
+
+
+@migracion(2, "Columnas normalizadas para la búsqueda de estudiantes")
+def _columnas_busqueda(conexion):
+    if preparar_busqueda(conexion):
+        normalizar_busqueda(conexion)
+
+
+def normalizar_busqueda(conexion):
+    """Rellena las columnas normalizadas de todos los estudiantes; devuelve cuántos."""
+    from app.models.estudiante import COLUMNAS_BUSQUEDA, Estudiante
+    tabla = _columnas(Estudiante.__table__, "id", "matricula", "nombre", "apellido", *COLUMNAS_BUSQUEDA)
+    filas = conexion.execute(select(tabla.c.id, tabla.c.matricula, tabla.c.nombre, tabla.c.apellido)).all()
+    if filas:
+        conexion.execute(update(tabla).where(tabla.c.id == bindparam("b_id")), [
+            {"b_id": f.id, **Estudiante.normalizados(f._asdict())} for f in filas
+        ])
+    return len(filas)
+
+
+@migracion(3, "Índices de los filtros frecuentes (estudiantes y calificaciones)")
+def _indices_filtros(conexion):
+    from app.models.calificacion import Calificacion
+    from app.models.estudiante import Estudiante
+    _crear_indices(conexion, Estudiante.__table__)
+    _crear_indices(conexion, Calificacion.__table__)
+
+
+@migracion(4, "Fecha de baja de estudiantes y tablas de archivo")
+def _tablas_archivo(conexion):
+    from app.models.archivo import CalificacionArchivada, EstudianteArchivado
+    from app.models.estudiante import Estudiante
+    if agregar_columnas(conexion, Estudiante.__table__, ["fecha_baja"]):
+        # No se sabe cuándo se dio de baja a los inactivos existentes: cuentan
+        # desde hoy, para que el archivado no los mida desde su registro
+        tabla = _columnas(Estudiante.__table__, "activo", "fecha_baja")
+        conexion.execute(update(tabla).where(tabla.c.activo.is_(False)).values(fecha_baja=datetime.utcnow()))
+    EstudianteArchivado.__table__.create(conexion, checkfirst=True)
+    CalificacionArchivada.__table__.create(conexion, checkfirst=True)
+
+
+@migracion(5, "Fecha de última modificación de estudiantes")
+def _actualizado_en(conexion):
+    from app.models.estudiante import Estudiante
+    tabla = Estudiante.__table__
+    if agregar_columnas(conexion, tabla, ["actualizado_en"]):
+        # Sin historial de cambios: todos cuentan como modificados al migrar, así la
+        # siguiente exportación incremental los incluye una vez
+        conexion.execute(update(_columnas(tabla, "actualizado_en")).values(actualizado_en=datetime.utcnow()))
+    _crear_indices(conexion, tabla)
+
+
+@migracion(6, "Índices parciales de estudiantes activos e inactivos")
+def _indices_parciales(conexion):
+    from app.models.estudiante import Estudiante
+    _crear_indices(conexion, Estudiante.__table__)
+    # Lo reemplazan los parciales, que no cargan con la otra mitad de la tabla
+    conexion.execute(text("DROP INDEX IF EXISTS ix_estudiantes_activo_carrera_id"))
+
+
+def version_actual(conexion):
+    if not inspect(conexion).has_table(version_esquema.name):
+        return 0
+    return conexion.scalar(select(func.max(version_esquema.c.version))) or 0
+
+
+def pendientes(conexion):
+    actual = version_actual(conexion)
+    return [(v, d) for v, d, _ in MIGRACIONES if v > actual]
+
+
+def actualizar(motor=None, hasta=None, al_aplicar=None):
+    """Aplica en orden las migraciones pendientes (hasta 'hasta', inclusive); devuelve sus versiones."""
+    import app.models  # noqa: F401 - registra todas las tablas en db.metadata
+    motor = motor or db.engine
+    with motor.begin() as conexion:
+        version_esquema.create(conexion, checkfirst=True)
+        actual = version_actual(conexion)
+
+    aplicadas = []
+    for version, descripcion, funcion in MIGRACIONES:
+        if version <= actual or (hasta is not None and version > hasta):
+            continue
+        with motor.begin() as conexion:
+            funcion(conexion)
+            conexion.execute(version_esquema.insert().values(
+                version=version, descripcion=descripcion, aplicada_en=datetime.utcnow()))
+        aplicadas.append(version)
+        if al_aplicar is not None:
+            al_aplicar(version, descripcion)
+    return aplicadas
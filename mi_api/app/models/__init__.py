@@ -3,3 +3,5 @@ from .estudiante import Estudiante
 from .materia import Materia
 from .calificacion import Calificacion
 from .usuario import Usuario
+from .resumen import ResumenAcademico
+from .archivo import EstudianteArchivado, CalificacionArchivada
@@ -0,0 +1,36 @@
+# app/models/archivo.py
+from app import db
+from datetime import datetime
+from app.models.estudiante import Estudiante
+
+
+class EstudianteArchivado(db.Model):
+    """Estudiante inactivo movido fuera de 'estudiantes' por el archivado; se lee bajo demanda."""
+    __tablename__ = 'estudiantes_archivados'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    matricula = db.Column(db.String(10), nullable=False, index=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    apellido = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    carrera = db.Column(db.String(100), nullable=False)
+    semestre = db.Column(db.Integer, nullable=False)
+    fecha_registro = db.Column(db.DateTime)
+    activo = db.Column(db.Boolean, default=False)
+    fecha_baja = db.Column(db.DateTime)
+    fecha_archivo = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {**Estudiante.serializar(self), "archivado": True}
+
+
+class CalificacionArchivada(db.Model):
+    """Calificación de un estudiante archivado (mismas columnas que 'calificaciones')."""
+    __tablename__ = 'calificaciones_archivadas'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    estudiante_id = db.Column(db.Integer, db.ForeignKey('estudiantes_archivados.id'), nullable=False, index=True)
+    materia_id = db.Column(db.Integer, db.ForeignKey('materias.id'), nullable=False)
+    calificacion = db.Column(db.Numeric(5, 2), nullable=False)
+    periodo = db.Column(db.String(20))
+    fecha_evaluacion = db.Column(db.Date)
@@ -4,6 +4,11 @@ from datetime import datetime
 
 class Calificacion(db.Model):
     __tablename__ = 'calificaciones'
+    __table_args__ = (
+        # Kardex por estudiante y estadísticas por materia, ambos acotables por periodo
+        db.Index("ix_calificaciones_estudiante_periodo", "estudiante_id", "periodo"),
+        db.Index("ix_calificaciones_materia_periodo", "materia_id", "periodo"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     estudiante_id = db.Column(db.Integer, db.ForeignKey('estudiantes.id'), nullable=False)
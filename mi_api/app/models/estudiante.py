@@ -1,9 +1,55 @@
 # app/models/estudiante.py
+import unicodedata
 from app import db
 from datetime import datetime
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import validates
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos: 'José Pérez' -> 'jose perez'."""
+    if texto is None:
+        return None
+    descompuesto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold().strip()
+
+
+def _normalizada(columna):
+    """Default de inserción (también en INSERT masivos) a partir de otra columna."""
+    return lambda contexto: normalizar(contexto.get_current_parameters().get(columna))
+
+
+# Columna normalizada para búsqueda -> columna original
+COLUMNAS_BUSQUEDA = {
+    "nombre_normalizado": "nombre",
+    "apellido_normalizado": "apellido",
+    "matricula_normalizada": "matricula",
+}
+NORMALIZADA_DE = {c: n for n, c in COLUMNAS_BUSQUEDA.items()}
+
 
 class Estudiante(db.Model):
     __tablename__ = 'estudiantes'
+    __table_args__ = (
+        # Índices parciales: los listados solo ven a los activos (por carrera y su
+        # cursor por carrera, id) y el archivado solo a los inactivos. El predicado
+        # repite el de las consultas, activo.is_(True/False), tal como lo compila
+        # cada dialecto, para que el planificador reconozca que aplica
+        db.Index("ix_estudiantes_activos_carrera_id", "carrera", "id",
+                 sqlite_where=db.text("activo IS 1"), postgresql_where=db.text("activo IS true")),
+        db.Index("ix_estudiantes_inactivos_fecha_baja", "fecha_baja",
+                 sqlite_where=db.text("activo IS 0"), postgresql_where=db.text("activo IS false")),
+        # Exportación incremental (?desde=) de los estudiantes creados o modificados
+        db.Index("ix_estudiantes_actualizado_en", "actualizado_en"),
+        # En PostgreSQL: trigramas para prefijos de cualquier palabra y B-tree
+        # con text_pattern_ops para LIKE 'prefijo%' sobre la matrícula
+        db.Index("ix_estudiantes_nombre_trgm", "nombre_normalizado", postgresql_using="gin",
+                 postgresql_ops={"nombre_normalizado": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        db.Index("ix_estudiantes_apellido_trgm", "apellido_normalizado", postgresql_using="gin",
+                 postgresql_ops={"apellido_normalizado": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        db.Index("ix_estudiantes_matricula_prefijo", "matricula_normalizada",
+                 postgresql_ops={"matricula_normalizada": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     matricula = db.Column(db.String(10), unique=True, nullable=False)
@@ -14,23 +60,60 @@ class Estudiante(db.Model):
     semestre = db.Column(db.Integer, nullable=False, default=1)
     fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
     activo = db.Column(db.Boolean, default=True)
+    # Cuándo se desactivó: el archivado mueve a los inactivos más antiguos
+    fecha_baja = db.Column(db.DateTime)
+    # Último cambio del registro (alta, edición, baja o importación)
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Copias normalizadas (sin acentos ni mayúsculas) para /api/estudiantes/buscar
+    nombre_normalizado = db.Column(db.String(100), default=_normalizada("nombre"))
+    apellido_normalizado = db.Column(db.String(100), default=_normalizada("apellido"))
+    matricula_normalizada = db.Column(db.String(10), default=_normalizada("matricula"))
 
     # Relación con calificaciones
     calificaciones = db.relationship('Calificacion', back_populates='estudiante')
 
+    @validates("nombre", "apellido", "matricula")
+    def _sincronizar_normalizado(self, columna, valor):
+        setattr(self, NORMALIZADA_DE[columna], normalizar(valor))
+        return valor
+
+    @validates("activo")
+    def _registrar_baja(self, columna, valor):
+        if not valor and self.activo is not False:
+            self.fecha_baja = datetime.utcnow()
+        elif valor:
+            self.fecha_baja = None
+        return valor
+
+    @staticmethod
+    def normalizados(valores):
+        """Columnas normalizadas para un dict de valores (INSERT/UPDATE masivos)."""
+        return {n: normalizar(valores[c]) for n, c in COLUMNAS_BUSQUEDA.items() if c in valores}
+
     def to_dict(self):
+        return Estudiante.serializar(self)
+
+    @staticmethod
+    def serializar(e):
+        """Sirve igual para una instancia o para una fila de columnas con los mismos nombres."""
         return {
-            "id": self.id,
-            "matricula": self.matricula,
-            "nombre": self.nombre,
-            "apellido": self.apellido,
-            "nombre_completo": f"{self.nombre} {self.apellido}",
-            "email": self.email,
-            "carrera": self.carrera,
-            "semestre": self.semestre,
-            "fecha_registro": self.fecha_registro.isoformat(),
-            "activo": self.activo
+            "id": e.id,
+            "matricula": e.matricula,
+            "nombre": e.nombre,
+            "apellido": e.apellido,
+            "nombre_completo": f"{e.nombre} {e.apellido}",
+            "email": e.email,
+            "carrera": e.carrera,
+            "semestre": e.semestre,
+            "fecha_registro": e.fecha_registro.isoformat() if e.fecha_registro else None,
+            "activo": e.activo
         }
 
     def __repr__(self):
         return f"<Estudiante {self.matricula}: {self.nombre} {self.apellido}>"
+
+
+# Los índices de trigramas necesitan la extensión pg_trgm
+event.listen(Estudiante.__table__, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
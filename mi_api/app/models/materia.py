@@ -13,10 +13,15 @@ class Materia(db.Model):
     calificaciones = db.relationship('Calificacion', back_populates='materia')
 
     def to_dict(self):
+        return Materia.serializar(self)
+
+    @staticmethod
+    def serializar(m):
+        """Sirve igual para una instancia o para una fila de columnas con los mismos nombres."""
         return {
-            "id": self.id,
-            "clave": self.clave,
-            "nombre": self.nombre,
-            "creditos": self.creditos,
-            "docente": self.docente
+            "id": m.id,
+            "clave": m.clave,
+            "nombre": m.nombre,
+            "creditos": m.creditos,
+            "docente": m.docente
         }
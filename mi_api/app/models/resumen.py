@@ -0,0 +1,24 @@
+# app/models/resumen.py
+from app import db
+
+class ResumenAcademico(db.Model):
+    """Acumulados por estudiante y periodo; periodo '*' guarda el total general."""
+    __tablename__ = 'resumenes_academicos'
+    __table_args__ = (
+        db.UniqueConstraint('estudiante_id', 'periodo', name='uq_resumen_estudiante_periodo'),
+    )
+
+    TOTAL = '*'
+
+    id = db.Column(db.Integer, primary_key=True)
+    estudiante_id = db.Column(db.Integer, db.ForeignKey('estudiantes.id'), nullable=False)
+    periodo = db.Column(db.String(20), nullable=False, default=TOTAL)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    suma = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    maxima = db.Column(db.Numeric(5, 2))
+    minima = db.Column(db.Numeric(5, 2))
+    aprobadas = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def promedio(self):
+        return float(self.suma) / self.total if self.total else 0.0
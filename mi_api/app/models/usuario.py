@@ -1,6 +1,6 @@
 # app/models/usuario.py
-from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app import contrasenas, db
+from app.contrasenas import necesita_rehash
 
 class Usuario(db.Model):
     __tablename__ = 'usuarios'
@@ -14,7 +14,11 @@ class Usuario(db.Model):
 
     def set_password(self, password):
         """NUNCA guardes contraseñas en texto plano, siempre hashea."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = contrasenas.generar(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return contrasenas.verificar(self.password_hash, password)
+
+    def necesita_rehash(self):
+        """El hash guardado usa otro algoritmo o costo que PASSWORD_METODO."""
+        return necesita_rehash(self.password_hash, contrasenas.metodo)
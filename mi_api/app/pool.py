@@ -0,0 +1,48 @@
+# app/pool.py
+import threading
+import time
+from sqlalchemy.pool import QueuePool
+
+
+class QueuePoolMedido(QueuePool):
+    """QueuePool que mide cuánto esperan los hilos para obtener una conexión."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._candado_esperas = threading.Lock()
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._candado_esperas:
+                self.esperas += 1
+                self.espera_total += espera
+                self.espera_maxima = max(self.espera_maxima, espera)
+
+
+def estadisticas_pool(engine):
+    """Estado del pool de conexiones del engine (tamaño, en uso, overflow y esperas)."""
+    pool = engine.pool
+    datos = {"tipo": type(pool).__name__, "estado": pool.status()}
+    if isinstance(pool, QueuePool):
+        datos.update({
+            "tamano": pool.size(),
+            "disponibles": pool.checkedin(),
+            "en_uso": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "timeout_s": pool.timeout(),
+        })
+    if isinstance(pool, QueuePoolMedido):
+        datos["espera"] = {
+            "adquisiciones": pool.esperas,
+            "total_ms": round(pool.espera_total * 1000, 3),
+            "promedio_ms": round(pool.espera_total * 1000 / pool.esperas, 3) if pool.esperas else 0.0,
+            "maxima_ms": round(pool.espera_maxima * 1000, 3),
+        }
+    return datos
@@ -0,0 +1,145 @@
+# app/replicas.py
+import itertools
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from .cache import _crear_backend, clave_cliente
+from .config import opciones_motor
+
+METODOS_LECTURA = {"GET", "HEAD", "OPTIONS"}
+
+
+class SesionEnrutada(Session):
+    """
+    Session que, dentro de una petición de lectura, envía los SELECT a la réplica
+    elegida para esa petición. Los flush y las sentencias DML siempre van a la
+    primaria, y desde la primera escritura el resto de la petición también.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or getattr(clause, "is_dml", False):
+                if not g.get("escribio"):
+                    g.escribio = True
+                    replicas = current_app.extensions.get("replicas")
+                    if replicas is not None:
+                        replicas.marcar_escritura()
+            elif g.get("bd_lectura") is not None and not g.get("escribio"):
+                return g.bd_lectura
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class Replicas:
+    """
+    Reparte las peticiones de lectura entre las réplicas (DB_REPLICAS) por turnos.
+    Cada réplica se sondea con SELECT 1 como mucho cada DB_REPLICA_SONDA_SEGUNDOS
+    y se salta mientras esté caída; sin réplicas sanas se lee de la primaria.
+
+    Después de una petición que escribió, las lecturas del mismo usuario (token o
+    IP) van a la primaria durante DB_REPLICA_PEGAR_SEGUNDOS, para que vea sus
+    propios cambios aunque la réplica vaya atrasada. En esa misma ventana, tras
+    cualquier escritura, lo leído de una réplica no se guarda en la caché de
+    respuestas: podría ser el estado anterior recién invalidado.
+
+    Las marcas viven en su propio backend (prefijo "apiescolar:replicas:"), así
+    no desalojan respuestas del LRU ni dependen de que la caché esté encendida.
+    """
+
+    def __init__(self, app=None):
+        self.marcas = None
+        self._claves = []
+        self._estado = {}
+        self._turno = itertools.count()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["replicas"] = self
+        self.app = app
+        self._claves = list(app.config.get("DB_REPLICAS") or [])
+        self.marcas = _crear_backend(app, app.config.get("DB_REPLICA_MARCAS_MAX", 10000),
+                                     prefijo="apiescolar:replicas:")
+        self._estado = {url: {"sana": True, "revisada": 0.0, "candado": threading.Lock(), "motor": None}
+                        for url in self._claves}
+        if self._claves:
+            app.before_request(self._elegir_para_peticion)
+            app.after_request(self._recordar_escritura)
+
+    def elegir(self):
+        """Motor de la siguiente réplica sana, o None para usar la primaria."""
+        inicio = next(self._turno)
+        for i in range(len(self._claves)):
+            clave = self._claves[(inicio + i) % len(self._claves)]
+            if self._disponible(clave):
+                return self._estado[clave]["motor"]
+        return None
+
+    def _motor(self, clave):
+        """Motor propio de cada réplica (fuera de db.engines, así create_all() no las toca)."""
+        estado = self._estado[clave]
+        if estado["motor"] is None:
+            opciones = opciones_motor({**self.app.config, "SQLALCHEMY_DATABASE_URI": clave})
+            motor = create_engine(clave, **opciones)
+            event.listen(motor, "handle_error", lambda contexto: self._al_fallar(clave, contexto))
+            estado["motor"] = motor
+        return estado["motor"]
+
+    def _disponible(self, clave):
+        estado = self._estado[clave]
+        motor = self._motor(clave)
+        vencida = time.monotonic() - estado["revisada"] >= self.app.config.get("DB_REPLICA_SONDA_SEGUNDOS", 10)
+        # Solo un hilo sondea; los demás usan el último resultado
+        if vencida and estado["candado"].acquire(blocking=False):
+            try:
+                with motor.connect() as conexion:
+                    conexion.execute(text("SELECT 1"))
+                estado["sana"] = True
+            except Exception:
+                estado["sana"] = False
+            finally:
+                estado["revisada"] = time.monotonic()
+                estado["candado"].release()
+        return estado["sana"]
+
+    def _al_fallar(self, clave, contexto):
+        if contexto.is_disconnect:
+            self._estado[clave].update(sana=False, revisada=time.monotonic())
+
+    def estado(self):
+        """Salud de cada réplica, sin credenciales en la URL."""
+        return [{"replica": make_url(c).render_as_string(hide_password=True), "sana": e["sana"]}
+                for c, e in self._estado.items()]
+
+    @staticmethod
+    def _clave_usuario():
+        return "primaria:" + clave_cliente()
+
+    @property
+    def _segundos_pegado(self):
+        return self.app.config.get("DB_REPLICA_PEGAR_SEGUNDOS", 5)
+
+    def _pegado_a_primaria(self):
+        return self._segundos_pegado > 0 and self.marcas.get(self._clave_usuario()) is not None
+
+    def _elegir_para_peticion(self):
+        if request.method in METODOS_LECTURA and not self._pegado_a_primaria():
+            g.bd_lectura = self.elegir()
+
+    def marcar_escritura(self):
+        """Llamado en la primera escritura de una petición, antes de su commit e invalidaciones."""
+        if self._claves and self._segundos_pegado > 0:
+            self.marcas.set("escritura", True, self._segundos_pegado)
+
+    def lectura_cacheable(self):
+        """False si la petición leyó de una réplica poco después de alguna escritura."""
+        if g.get("bd_lectura") is None or self._segundos_pegado <= 0:
+            return True
+        return self.marcas.get("escritura") is None
+
+    def _recordar_escritura(self, respuesta):
+        if g.get("escribio") and self._segundos_pegado > 0:
+            self.marcas.set(self._clave_usuario(), True, self._segundos_pegado)
+        return respuesta
@@ -1,9 +1,36 @@
 # app/routes/__init__.py
-from flask import Blueprint, jsonify
+import threading
+import time
+from flask import Blueprint, Response, current_app, jsonify
 from datetime import datetime
+from sqlalchemy import text
+from app import contrasenas, db, metricas, replicas
+from app.pool import estadisticas_pool
 
 main_bp = Blueprint('main', __name__)
 
+_sonda_candado = threading.Lock()
+
+
+def _sondear_base():
+    """Ejecuta SELECT 1 midiendo la latencia; el resultado se reutiliza unos segundos."""
+    vigencia = current_app.config.get("HEALTH_CACHE_SEGUNDOS", 5)
+    sonda = current_app.extensions.setdefault("sonda_db", {"instante": 0.0, "resultado": None})
+    with _sonda_candado:
+        if sonda["resultado"] and time.monotonic() - sonda["instante"] < vigencia:
+            return sonda["resultado"]
+
+        inicio = time.perf_counter()
+        try:
+            with db.engine.connect() as conexion:
+                conexion.execute(text("SELECT 1"))
+            resultado = {"conectada": True, "latencia_ms": round((time.perf_counter() - inicio) * 1000, 3)}
+        except Exception as e:
+            resultado = {"conectada": False, "error": type(e).__name__}
+
+        sonda.update(instante=time.monotonic(), resultado=resultado)
+        return resultado
+
 @main_bp.route("/", methods=["GET"])
 def index():
     """Ruta raíz - bienvenida."""
@@ -16,9 +43,29 @@ def index():
 
 @main_bp.route("/health", methods=["GET"])
 def health_check():
-    """Verifica que la API está activa."""
-    return jsonify({
-        "estado": "OK",
+    """Verifica que la API está activa y que la base de datos responde."""
+    sonda = _sondear_base()
+    respuesta = {
+        "estado": "OK" if sonda["conectada"] else "ERROR",
         "timestamp": datetime.now().isoformat(),
-        "base_de_datos": "Conectada"
-    }), 200
+        "base_de_datos": "Conectada" if sonda["conectada"] else "Sin conexión",
+    }
+    if sonda["conectada"]:
+        respuesta["latencia_db_ms"] = sonda["latencia_ms"]
+    else:
+        respuesta["error"] = sonda["error"]
+    return jsonify(respuesta), 200 if sonda["conectada"] else 503
+
+@main_bp.route("/health/pool", methods=["GET"])
+def pool_stats():
+    """Estadísticas del pool de conexiones (en uso, overflow, tiempo de espera) y del de contraseñas."""
+    datos = estadisticas_pool(db.engine)
+    if replicas.estado():
+        datos["replicas"] = replicas.estado()
+    datos["contrasenas"] = contrasenas.estado()
+    return jsonify(datos), 200
+
+@main_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Métricas de latencia y consultas SQL en formato Prometheus."""
+    return Response(metricas.exportar(), mimetype="text/plain; version=0.0.4")
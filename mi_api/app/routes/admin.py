@@ -0,0 +1,61 @@
+# app/routes/admin.py
+from flask import Blueprint, jsonify, request
+from app import autorizacion, consultas_lentas
+from app.consultas_lentas import ORDENES
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+
+@admin_bp.route("/consultas", methods=["GET"])
+@autorizacion.requiere_rol("admin")
+def consultas_frecuentes():
+    """
+    Consultas SQL agrupadas por huella normalizada, de la más costosa a la menos
+    ---
+    tags:
+      - Administración
+    security:
+      - Bearer: []
+    parameters:
+      - name: orden
+        in: query
+        type: string
+        enum: [total_ms, max_ms, llamadas, lentas]
+        default: total_ms
+      - name: limite
+        in: query
+        type: integer
+        default: 20
+      - name: endpoint
+        in: query
+        type: string
+        description: Prefijo del endpoint de origen (ej. "estudiantes." o "calificaciones.")
+    responses:
+      200:
+        description: Llamadas, tiempo total/máximo/medio, endpoints y último plan por huella
+      400:
+        description: Orden inválido
+    """
+    orden = request.args.get("orden", "total_ms")
+    if orden not in ORDENES:
+        return jsonify({"error": f"orden debe ser uno de: {', '.join(ORDENES)}"}), 400
+    limite = min(max(request.args.get("limite", 20, type=int), 1), 200)
+    return jsonify(consultas_lentas.resumen(orden, limite, request.args.get("endpoint"))), 200
+
+
+@admin_bp.route("/consultas", methods=["DELETE"])
+@autorizacion.requiere_rol("admin")
+def reiniciar_consultas():
+    """
+    Reinicia las estadísticas de consultas
+    ---
+    tags:
+      - Administración
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Estadísticas reiniciadas
+    """
+    consultas_lentas.reiniciar()
+    return jsonify({"mensaje": "Estadísticas de consultas reiniciadas"}), 200
@@ -0,0 +1,101 @@
+# app/routes/analitica.py
+from flask import Blueprint, current_app, jsonify, request
+from app.models.resumen import ResumenAcademico
+from app.services.analitica import AGRUPACIONES, calcular_con_cache
+from app.services.ranking import ranking_con_cache
+
+analitica_bp = Blueprint('analitica', __name__, url_prefix='/api/analitica')
+
+
+@analitica_bp.route("/calificaciones", methods=["GET"])
+def analitica_calificaciones():
+    """
+    Estadísticas de calificaciones agrupadas por materia, periodo y/o carrera
+    ---
+    tags:
+      - Analítica
+    parameters:
+      - name: agrupar
+        in: query
+        type: string
+        default: materia,periodo
+        description: Combinación de materia, periodo y carrera separada por coma
+      - name: periodo
+        in: query
+        type: string
+        description: Filtra un periodo (los resultados por periodo se guardan en caché)
+      - name: materia_id
+        in: query
+        type: integer
+      - name: carrera
+        in: query
+        type: string
+    responses:
+      200:
+        description: Promedio, desviación estándar, tasa de aprobación, histograma y percentiles por grupo
+      400:
+        description: Agrupación inválida
+    """
+    agrupar = [g.strip() for g in request.args.get("agrupar", "materia,periodo").split(",") if g.strip()]
+    invalidos = [g for g in agrupar if g not in AGRUPACIONES]
+    if not agrupar or invalidos:
+        return jsonify({"error": f"Agrupación inválida; usa {', '.join(AGRUPACIONES)}"}), 400
+
+    filtros = {
+        "periodo": request.args.get("periodo"),
+        "materia_id": request.args.get("materia_id", type=int),
+        "carrera": request.args.get("carrera"),
+    }
+    grupos = calcular_con_cache(list(dict.fromkeys(agrupar)), filtros,
+                                current_app.config.get("ANALITICA_CACHE_TTL"))
+    return jsonify({"agrupar": agrupar, "filtros": filtros, "grupos": grupos}), 200
+
+
+@analitica_bp.route("/ranking", methods=["GET"])
+def ranking():
+    """
+    Ranking de estudiantes por promedio dentro de su carrera y semestre
+    ---
+    tags:
+      - Analítica
+    parameters:
+      - name: carrera
+        in: query
+        type: string
+      - name: semestre
+        in: query
+        type: integer
+      - name: periodo
+        in: query
+        type: string
+        description: Periodo a evaluar (por defecto el promedio general)
+      - name: pagina
+        in: query
+        type: integer
+        default: 1
+      - name: por_pagina
+        in: query
+        type: integer
+        default: 20
+    responses:
+      200:
+        description: Posición (RANK) y percentil (PERCENT_RANK) de cada estudiante en su cohorte
+    """
+    carrera = request.args.get("carrera")
+    semestre = request.args.get("semestre", type=int)
+    periodo = request.args.get("periodo", ResumenAcademico.TOTAL)
+    pagina = max(1, request.args.get("pagina", 1, type=int))
+    por_pagina = max(1, min(request.args.get("por_pagina", 20, type=int), 500))
+
+    filas, total = ranking_con_cache(carrera, semestre, periodo, pagina, por_pagina,
+                                     current_app.config.get("RANKING_CACHE_TTL"))
+    return jsonify({
+        "carrera": carrera,
+        "semestre": semestre,
+        "periodo": periodo,
+        "total": total,
+        "paginas": -(-total // por_pagina),
+        "pagina_actual": pagina,
+        "por_pagina": por_pagina,
+        "ranking": filas
+    }), 200
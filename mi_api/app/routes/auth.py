@@ -1,9 +1,9 @@
 # app/routes/auth.py
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from app import db
+from flask_jwt_extended import get_jwt, jwt_required
+from app import autorizacion, db
+from app.contrasenas import PoolSaturado
 from app.models.usuario import Usuario
-from datetime import timedelta
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -28,10 +28,17 @@ def registro():
     responses:
       201:
         description: Usuario creado
+      403:
+        description: Con AUTH_REQUERIDA, solo un admin puede crear usuarios que no sean docentes
       409:
         description: Username ya en uso
+      503:
+        description: Pool de hash de contraseñas saturado, reintentar tras Retry-After
     """
     datos = request.get_json()
+    rol = datos.get("rol", "docente")
+    if rol != "docente" and autorizacion.requerida and not autorizacion.tiene_rol("admin"):
+        return jsonify({"error": "Solo un admin puede crear usuarios con rol " + rol}), 403
 
     if Usuario.query.filter_by(username=datos.get("username")).first():
         return jsonify({"error": "El username ya está en uso"}), 409
@@ -39,9 +46,12 @@ def registro():
     usuario = Usuario(
         username=datos["username"],
         email=datos["email"],
-        rol=datos.get("rol", "docente")
+        rol=rol
     )
-    usuario.set_password(datos["password"])
+    try:
+        usuario.set_password(datos["password"])
+    except PoolSaturado as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
 
     db.session.add(usuario)
     db.session.commit()
@@ -68,17 +78,26 @@ def login():
         description: Token JWT generado
       401:
         description: Credenciales inválidas
+      503:
+        description: Pool de verificación de contraseñas saturado, reintentar tras Retry-After
     """
     datos = request.get_json()
     usuario = Usuario.query.filter_by(username=datos.get("username")).first()
 
-    if not usuario or not usuario.check_password(datos.get("password", "")):
+    if not usuario or not usuario.activo:
         return jsonify({"error": "Credenciales inválidas"}), 401
+    password = datos.get("password", "")
+    try:
+        if not usuario.check_password(password):
+            return jsonify({"error": "Credenciales inválidas"}), 401
+        if usuario.necesita_rehash():
+            # Cambió PASSWORD_METODO: se aprovecha que aquí se conoce la contraseña
+            usuario.set_password(password)
+            db.session.commit()
+    except PoolSaturado as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
 
-    token = create_access_token(
-        identity={"id": usuario.id, "rol": usuario.rol},
-        expires_delta=timedelta(hours=24)
-    )
+    token = autorizacion.crear_token(usuario)
 
     return jsonify({
         "token": token,
@@ -108,10 +127,31 @@ def perfil():
       401:
         description: Token inválido o expirado
     """
-    identidad = get_jwt_identity()
-    usuario = Usuario.query.get(identidad["id"])
+    usuario = autorizacion.usuario_actual()
+    if usuario is None:
+        return jsonify({"error": "Usuario no encontrado"}), 404
     return jsonify({
-        "usuario": usuario.username,
-        "email": usuario.email,
-        "rol": identidad["rol"]
+        "usuario": usuario["username"],
+        "email": usuario["email"],
+        "rol": get_jwt()["rol"]
     }), 200
+
+
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required()
+def logout():
+    """
+    Revoca el token con el que se hace la petición
+    ---
+    tags:
+      - Autenticación
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Token revocado
+      401:
+        description: Token inválido, expirado o ya revocado
+    """
+    autorizacion.revocar(get_jwt())
+    return jsonify({"mensaje": "Sesión cerrada"}), 200
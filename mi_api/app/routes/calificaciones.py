@@ -1,20 +1,33 @@
 # app/routes/calificaciones.py
-from flask import Blueprint, jsonify, request
-from app import db
+from flask import Blueprint, Response, abort, current_app, jsonify, request, stream_with_context, url_for
+from app import autorizacion, cache, db, escrituras, idempotencia
+from app.escrituras import ColaLlena
 from app.models.calificacion import Calificacion
 from app.models.estudiante import Estudiante
 from app.models.materia import Materia
+from app.services import resumen
+from app.services.archivo import kardex_archivado, obtener_archivado
+from app.services.calificaciones import importar_calificaciones, invalidar_caches, validar_calificacion
+from app.services.importacion import FormatoInvalido, leer_registros, tamano_bloque
+from app.services.kardex import CAMPOS_CALIFICACION, clave_kardex, construir_kardex, kardex_en_lote
+from app.services.serializacion import (
+    CAMPOS_MATERIA, CamposInvalidos, leer_campos, materias_como_filas, serializar_materias,
+)
 
 cal_bp = Blueprint('calificaciones', __name__, url_prefix='/api')
 
 
 @cal_bp.route("/materias/", methods=["POST"])
+@autorizacion.requiere_rol("admin")
+@idempotencia.idempotente
 def crear_materia():
     """
     Crea una nueva materia
     ---
     tags:
       - Materias
+    security:
+      - Bearer: []
     parameters:
       - in: body
         name: body
@@ -25,9 +38,20 @@ def crear_materia():
             nombre: {type: string, example: "Programación Web"}
             creditos: {type: integer, example: 5}
             docente: {type: string, example: "Ing. Ramírez"}
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Reintentos con la misma clave devuelven la primera respuesta sin repetir la escritura
     responses:
       201:
         description: Materia creada
+      409:
+        description: La clave ya existe, o sigue en curso una petición con la misma Idempotency-Key
+      422:
+        description: La Idempotency-Key ya se usó con otro contenido
+      403:
+        description: Con AUTH_REQUERIDA, el rol del token no tiene permiso
     """
     datos = request.get_json()
     if not datos:
@@ -44,31 +68,49 @@ def crear_materia():
     )
     db.session.add(materia)
     db.session.commit()
+    cache.invalidar_respuestas("materias")
     return jsonify(materia.to_dict()), 201
 
 
 @cal_bp.route("/materias/", methods=["GET"])
+@cache.respuesta(lambda: None if "campos" in request.args else "materias")
 def obtener_materias():
     """
     Lista todas las materias
     ---
     tags:
       - Materias
+    parameters:
+      - name: campos
+        in: query
+        type: string
+        description: Campos a devolver separados por coma (ej. id,clave,nombre)
     responses:
       200:
         description: Lista de materias
+      304:
+        description: Sin cambios desde el ETag enviado en If-None-Match
     """
-    materias = Materia.query.all()
-    return jsonify([m.to_dict() for m in materias]), 200
+    try:
+        campos = leer_campos(request.args.get("campos"), CAMPOS_MATERIA)
+    except CamposInvalidos as e:
+        return jsonify({"error": str(e), "disponibles": e.disponibles}), 400
+
+    filas = db.session.execute(materias_como_filas(campos)).all()
+    return jsonify(serializar_materias(filas, campos)), 200
 
 
 @cal_bp.route("/calificaciones/", methods=["POST"])
+@autorizacion.requiere_rol("docente", "admin")
+@idempotencia.idempotente
 def registrar_calificacion():
     """
     Registra una calificación para un estudiante en una materia
     ---
     tags:
       - Calificaciones
+    security:
+      - Bearer: []
     parameters:
       - in: body
         name: body
@@ -79,13 +121,30 @@ def registrar_calificacion():
             materia_id: {type: integer, example: 1}
             calificacion: {type: number, example: 87.5}
             periodo: {type: string, example: "2024-1"}
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Reintentos con la misma clave devuelven la primera respuesta sin repetir la escritura
     responses:
       201:
         description: Calificación registrada
+      202:
+        description: Con COLA_ESCRITURA_HABILITADA, calificación validada y encolada (id de seguimiento)
       400:
         description: Calificación fuera de rango
+      409:
+        description: Sigue en curso una petición con la misma Idempotency-Key
+      422:
+        description: La Idempotency-Key ya se usó con otro contenido
+      503:
+        description: Cola de escrituras llena, reintentar tras Retry-After
+      403:
+        description: Con AUTH_REQUERIDA, el rol del token no tiene permiso
     """
     datos = request.get_json()
+    if escrituras.habilitada:
+        return _encolar_calificacion(datos or {})
 
     cal = datos.get("calificacion", 0)
     if not 0 <= float(cal) <= 100:
@@ -97,12 +156,100 @@ def registrar_calificacion():
         calificacion=cal,
         periodo=datos.get("periodo", "2024-1")
     )
+    fila = {"estudiante_id": nueva.estudiante_id, "calificacion": cal, "periodo": nueva.periodo}
     db.session.add(nueva)
+    resumen.acumular([fila])
     db.session.commit()
+    invalidar_caches([fila])
     return jsonify(nueva.to_dict()), 201
 
 
+def _encolar_calificacion(datos):
+    """Valida ahora y deja la escritura a la cola, que la aplica por lotes."""
+    try:
+        valores = validar_calificacion(datos)
+        id = escrituras.encolar(valores)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ColaLlena as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    return (jsonify({"id": id, "estado": "pendiente"}), 202,
+            {"Location": url_for(".estado_escritura", id=id)})
+
+
+@cal_bp.route("/calificaciones/seguimiento/<id>", methods=["GET"])
+def estado_escritura(id):
+    """
+    Estado de una calificación encolada (pendiente, aplicada o fallida)
+    ---
+    tags:
+      - Calificaciones
+    parameters:
+      - name: id
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: Estado y, si ya se aplicó, el id de la calificación
+      404:
+        description: Id desconocido (o atendido por otro proceso)
+    """
+    estado = escrituras.estado(id)
+    if estado is None:
+        return jsonify({"error": "Escritura no encontrada"}), 404
+    return jsonify(estado), 200
+
+
+@cal_bp.route("/calificaciones/lote", methods=["POST"])
+@autorizacion.requiere_rol("docente", "admin")
+def registrar_calificaciones_lote():
+    """
+    Registra muchas calificaciones en una sola petición (JSON, NDJSON o CSV)
+    ---
+    tags:
+      - Calificaciones
+    security:
+      - Bearer: []
+    consumes:
+      - application/json
+      - application/x-ndjson
+      - text/csv
+      - multipart/form-data
+    parameters:
+      - name: lote
+        in: query
+        type: integer
+        description: Filas por INSERT (por defecto CALIFICACIONES_LOTE_TAMANO)
+      - in: body
+        name: body
+        schema:
+          type: array
+          items:
+            properties:
+              estudiante_id: {type: integer, example: 1}
+              materia_id: {type: integer, example: 1}
+              calificacion: {type: number, example: 87.5}
+              periodo: {type: string, example: "2024-1"}
+    responses:
+      200:
+        description: Resumen de filas insertadas y errores por fila
+      400:
+        description: Formato de entrada inválido
+      403:
+        description: Con AUTH_REQUERIDA, el rol del token no tiene permiso
+    """
+    tamano = tamano_bloque(request, current_app.config.get("CALIFICACIONES_LOTE_TAMANO", 1000))
+    try:
+        reporte = importar_calificaciones(leer_registros(request), tamano)
+    except FormatoInvalido as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    return jsonify(reporte.to_dict()), 200
+
+
 @cal_bp.route("/estudiantes/<int:id>/kardex", methods=["GET"])
+@cache.respuesta(lambda id: None if "campos" in request.args else clave_kardex(id))
 def obtener_kardex(id):
     """
     Obtiene el kardex completo de un estudiante con estadísticas
@@ -114,34 +261,93 @@ def obtener_kardex(id):
         in: path
         type: integer
         required: true
+      - name: campos
+        in: query
+        type: string
+        description: Campos de cada calificación (id, estudiante, materia, calificacion, aprobado, periodo)
     responses:
       200:
-        description: Kardex del estudiante con promedio y estadísticas
+        description: Kardex del estudiante con promedio y estadísticas (también de estudiantes archivados, sin ranking)
+      304:
+        description: Sin cambios desde el ETag enviado en If-None-Match
+      404:
+        description: Estudiante no encontrado
     """
-    estudiante = Estudiante.query.get_or_404(id)
-    calificaciones = Calificacion.query.filter_by(estudiante_id=id).all()
-
-    if not calificaciones:
-        return jsonify({
-            "estudiante": estudiante.to_dict(),
-            "mensaje": "Sin calificaciones registradas",
-            "calificaciones": []
-        }), 200
-
-    valores = [float(c.calificacion) for c in calificaciones]
-    promedio = sum(valores) / len(valores)
-    materias_aprobadas = sum(1 for v in valores if v >= 60)
-
-    return jsonify({
-        "estudiante": estudiante.to_dict(),
-        "estadisticas": {
-            "promedio_general": round(promedio, 2),
-            "total_materias": len(calificaciones),
-            "materias_aprobadas": materias_aprobadas,
-            "materias_reprobadas": len(calificaciones) - materias_aprobadas,
-            "calificacion_maxima": max(valores),
-            "calificacion_minima": min(valores),
-            "estatus": "Regular" if promedio >= 70 else "En riesgo"
-        },
-        "calificaciones": [c.to_dict() for c in calificaciones]
-    }), 200
+    try:
+        campos = leer_campos(request.args.get("campos"), CAMPOS_CALIFICACION)
+    except CamposInvalidos as e:
+        return jsonify({"error": str(e), "disponibles": e.disponibles}), 400
+
+    estudiante = db.session.get(Estudiante, id)
+    if estudiante is not None:
+        return jsonify(construir_kardex(estudiante, campos)), 200
+    archivado = obtener_archivado(id)
+    if archivado is None:
+        abort(404)
+    return jsonify(kardex_archivado(archivado, campos)), 200
+
+
+@cal_bp.route("/kardex", methods=["GET"])
+def obtener_kardex_lote():
+    """
+    Obtiene el kardex de muchos estudiantes en una sola petición (respuesta en streaming)
+    ---
+    tags:
+      - Calificaciones
+    parameters:
+      - name: ids
+        in: query
+        type: string
+        description: IDs separados por coma (ej. 1,2,3)
+      - name: carrera
+        in: query
+        type: string
+        description: Filtrar estudiantes activos por carrera
+      - name: semestre
+        in: query
+        type: integer
+        description: Filtrar estudiantes activos por semestre
+      - name: campos
+        in: query
+        type: string
+        description: Campos de cada calificación (id, estudiante, materia, calificacion, aprobado, periodo)
+    responses:
+      200:
+        description: Arreglo JSON con el kardex de cada estudiante
+      400:
+        description: Falta un filtro o los IDs no son válidos
+    """
+    ids = request.args.get("ids")
+    carrera = request.args.get("carrera")
+    semestre = request.args.get("semestre", type=int)
+
+    if not (ids or carrera or semestre):
+        return jsonify({"error": "Indica 'ids', 'carrera' o 'semestre'"}), 400
+    try:
+        campos = leer_campos(request.args.get("campos"), CAMPOS_CALIFICACION)
+    except CamposInvalidos as e:
+        return jsonify({"error": str(e), "disponibles": e.disponibles}), 400
+
+    filtros = []
+    if ids:
+        try:
+            lista_ids = {int(i) for i in ids.split(",") if i.strip()}
+        except ValueError:
+            return jsonify({"error": "Los IDs deben ser enteros separados por coma"}), 400
+        filtros.append(Estudiante.id.in_(lista_ids))
+    else:
+        filtros.append(Estudiante.activo.is_(True))
+    if carrera:
+        filtros.append(Estudiante.carrera == carrera)
+    if semestre:
+        filtros.append(Estudiante.semestre == semestre)
+
+    tamano_lote = current_app.config.get("KARDEX_LOTE_TAMANO", 200)
+
+    def generar():
+        yield "["
+        for i, kardex in enumerate(kardex_en_lote(filtros, tamano_lote, campos)):
+            yield ("," if i else "") + current_app.json.dumps(kardex)
+        yield "]"
+
+    return Response(stream_with_context(generar()), mimetype="application/json")
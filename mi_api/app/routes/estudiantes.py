@@ -1,18 +1,33 @@
 # app/routes/estudiantes.py
-from flask import Blueprint, jsonify, request
-from app import db
+from flask import Blueprint, abort, current_app, jsonify, request
+from app import autorizacion, cache, db, idempotencia
 from app.models.estudiante import Estudiante
+from app.models.resumen import ResumenAcademico
+from app.services.archivo import obtener_archivado
+from app.services.busqueda import BusquedaInvalida, actualizar_indice, buscar
+from app.services.estudiantes import importar_estudiantes
+from app.services.importacion import FormatoInvalido, leer_registros, tamano_bloque
+from app.services.kardex import PROMEDIO_REGULAR, estadisticas_de_resumen
+from app.services.paginacion import CursorInvalido, codificar_cursor, decodificar_cursor, paginar_por_clave
+from app.services.serializacion import (
+    CAMPOS_ESTUDIANTE, CamposInvalidos, PaginacionFilas, contar, estudiantes_como_filas,
+    leer_campos, serializar_estudiantes,
+)
 
 estudiantes_bp = Blueprint('estudiantes', __name__, url_prefix='/api/estudiantes')
 
 # ─── CREATE: POST /api/estudiantes/ ─────────────────────────────────────────
 @estudiantes_bp.route("/", methods=["POST"])
+@autorizacion.requiere_rol("admin")
+@idempotencia.idempotente
 def crear_estudiante():
     """
     Crea un nuevo estudiante
     ---
     tags:
       - Estudiantes
+    security:
+      - Bearer: []
     parameters:
       - in: body
         name: body
@@ -25,13 +40,22 @@ def crear_estudiante():
             email: {type: string, example: "ana@uni.edu.mx"}
             carrera: {type: string, example: "ITIC"}
             semestre: {type: integer, example: 5}
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Reintentos con la misma clave devuelven la primera respuesta sin repetir la escritura
     responses:
       201:
         description: Estudiante creado exitosamente
       400:
         description: Datos inválidos o faltantes
       409:
-        description: La matrícula ya existe
+        description: La matrícula ya existe, o sigue en curso una petición con la misma Idempotency-Key
+      422:
+        description: La Idempotency-Key ya se usó con otro contenido
+      403:
+        description: Con AUTH_REQUERIDA, el rol del token no tiene permiso
     """
     datos = request.get_json()
 
@@ -60,6 +84,7 @@ def crear_estudiante():
 
     db.session.add(nuevo)
     db.session.commit()
+    actualizar_indice(Estudiante.id == nuevo.id)
 
     return jsonify({
         "mensaje": "Estudiante creado exitosamente",
@@ -67,6 +92,54 @@ def crear_estudiante():
     }), 201
 
 
+# ─── BULK: POST /api/estudiantes/importar ───────────────────────────────────
+@estudiantes_bp.route("/importar", methods=["POST"])
+@autorizacion.requiere_rol("admin")
+def importar_estudiantes_lote():
+    """
+    Importa estudiantes en bloque desde NDJSON, CSV o un arreglo JSON
+    ---
+    tags:
+      - Estudiantes
+    security:
+      - Bearer: []
+    consumes:
+      - application/x-ndjson
+      - text/csv
+      - application/json
+      - multipart/form-data
+    parameters:
+      - name: modo
+        in: query
+        type: string
+        enum: [insertar, upsert]
+        default: insertar
+        description: Con 'upsert' las matrículas existentes se actualizan
+      - name: lote
+        in: query
+        type: integer
+        description: Filas por bloque (por defecto ESTUDIANTES_LOTE_TAMANO)
+    responses:
+      200:
+        description: Resumen de filas insertadas, actualizadas y errores por fila
+      400:
+        description: Formato de entrada inválido
+      403:
+        description: Con AUTH_REQUERIDA, el rol del token no tiene permiso
+    """
+    modo = request.args.get("modo", "insertar")
+    if modo not in ("insertar", "upsert"):
+        return jsonify({"error": "El modo debe ser 'insertar' o 'upsert'"}), 400
+
+    tamano = tamano_bloque(request, current_app.config.get("ESTUDIANTES_LOTE_TAMANO", 1000))
+    try:
+        reporte = importar_estudiantes(leer_registros(request), tamano, upsert=modo == "upsert")
+    except FormatoInvalido as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    return jsonify(reporte.to_dict()), 200
+
+
 # ─── READ ALL: GET /api/estudiantes/ ────────────────────────────────────────
 @estudiantes_bp.route("/", methods=["GET"])
 def obtener_estudiantes():
@@ -88,31 +161,205 @@ def obtener_estudiantes():
         in: query
         type: integer
         default: 10
+      - name: campos
+        in: query
+        type: string
+        description: Campos a devolver separados por coma (ej. id,matricula,nombre_completo)
+      - name: cursor
+        in: query
+        type: string
+        description: Activa la paginación por cursor (vacío para la primera página)
+      - name: limite
+        in: query
+        type: integer
+        default: 10
+        description: Tamaño de página en modo cursor
+      - name: orden
+        in: query
+        type: string
+        enum: [id, carrera]
+        default: id
+        description: Orden del cursor, por id o por (carrera, id)
+      - name: total
+        in: query
+        type: boolean
+        description: En modo cursor, incluye el conteo total (cuesta un COUNT)
     responses:
       200:
         description: Lista de estudiantes paginada
+      400:
+        description: Cursor, orden o campos inválidos
     """
     carrera = request.args.get("carrera")
     pagina = request.args.get("pagina", 1, type=int)
     por_pagina = request.args.get("por_pagina", 10, type=int)
+    try:
+        campos = leer_campos(request.args.get("campos"), CAMPOS_ESTUDIANTE)
+    except CamposInvalidos as e:
+        return jsonify({"error": str(e), "disponibles": e.disponibles}), 400
 
-    query = Estudiante.query.filter_by(activo=True)
+    condiciones = [Estudiante.activo.is_(True)]
     if carrera:
-        query = query.filter_by(carrera=carrera)
+        condiciones.append(Estudiante.carrera == carrera)
 
-    paginacion = query.paginate(page=pagina, per_page=por_pagina, error_out=False)
+    if "cursor" in request.args or "limite" in request.args:
+        return _pagina_por_cursor(condiciones, campos)
+
+    paginacion = PaginacionFilas(page=pagina, per_page=por_pagina, error_out=False,
+                                 select=estudiantes_como_filas(*condiciones, campos=campos))
 
     return jsonify({
         "total": paginacion.total,
         "paginas": paginacion.pages,
         "pagina_actual": pagina,
         "por_pagina": por_pagina,
-        "estudiantes": [e.to_dict() for e in paginacion.items]
+        "estudiantes": serializar_estudiantes(paginacion.items, campos)
+    }), 200
+
+
+ORDENES_CURSOR = {
+    "id": (Estudiante.id,),
+    "carrera": (Estudiante.carrera, Estudiante.id),
+}
+
+
+def _pagina_por_cursor(condiciones, campos=None):
+    """Página keyset: sin OFFSET y sin COUNT salvo que se pida '?total=1'."""
+    orden = request.args.get("orden", "id")
+    if orden not in ORDENES_CURSOR:
+        return jsonify({"error": "El orden debe ser 'id' o 'carrera'"}), 400
+    limite = max(1, min(request.args.get("limite", 10, type=int), 1000))
+    consulta = estudiantes_como_filas(*condiciones, campos=campos,
+                                      extra=[c.key for c in ORDENES_CURSOR[orden]])
+
+    try:
+        clave = decodificar_cursor(request.args.get("cursor"), orden, ORDENES_CURSOR[orden])
+        estudiantes, siguiente = paginar_por_clave(consulta, ORDENES_CURSOR[orden], clave, limite)
+    except CursorInvalido as e:
+        return jsonify({"error": str(e)}), 400
+
+    respuesta = {
+        "limite": limite,
+        "orden": orden,
+        "siguiente": codificar_cursor(orden, siguiente) if siguiente else None,
+        "estudiantes": serializar_estudiantes(estudiantes, campos)
+    }
+    if request.args.get("total", "").lower() in ("1", "true", "si"):
+        respuesta["total"] = contar(consulta)
+    return jsonify(respuesta), 200
+
+
+# ─── EN RIESGO: GET /api/estudiantes/en-riesgo ──────────────────────────────
+@estudiantes_bp.route("/en-riesgo", methods=["GET"])
+def obtener_estudiantes_en_riesgo():
+    """
+    Lista estudiantes activos con promedio por debajo del umbral
+    ---
+    tags:
+      - Estudiantes
+    parameters:
+      - name: carrera
+        in: query
+        type: string
+      - name: semestre
+        in: query
+        type: integer
+      - name: periodo
+        in: query
+        type: string
+        description: Evalúa solo este periodo (por defecto el promedio general)
+      - name: umbral
+        in: query
+        type: number
+        default: 70
+      - name: limite
+        in: query
+        type: integer
+        default: 100
+    responses:
+      200:
+        description: Estudiantes en riesgo ordenados del promedio más bajo al más alto
+    """
+    umbral = request.args.get("umbral", PROMEDIO_REGULAR, type=float)
+    limite = max(1, min(request.args.get("limite", 100, type=int), 1000))
+    periodo = request.args.get("periodo", ResumenAcademico.TOTAL)
+
+    query = (db.session.query(Estudiante, ResumenAcademico)
+             .join(ResumenAcademico, ResumenAcademico.estudiante_id == Estudiante.id)
+             .filter(Estudiante.activo.is_(True),
+                     ResumenAcademico.periodo == periodo,
+                     ResumenAcademico.total > 0,
+                     ResumenAcademico.suma < umbral * ResumenAcademico.total))
+    if request.args.get("carrera"):
+        query = query.filter(Estudiante.carrera == request.args["carrera"])
+    if request.args.get("semestre", type=int):
+        query = query.filter(Estudiante.semestre == request.args.get("semestre", type=int))
+
+    filas = (query.order_by(ResumenAcademico.suma * 1.0 / ResumenAcademico.total, Estudiante.id)
+             .limit(limite).all())
+
+    return jsonify({
+        "umbral": umbral,
+        "periodo": periodo,
+        "total": len(filas),
+        "estudiantes": [
+            {"estudiante": e.to_dict(), "estadisticas": estadisticas_de_resumen(r)}
+            for e, r in filas
+        ]
+    }), 200
+
+
+# ─── BUSCAR: GET /api/estudiantes/buscar ────────────────────────────────────
+@estudiantes_bp.route("/buscar", methods=["GET"])
+def buscar_estudiantes():
+    """
+    Busca estudiantes activos por prefijo de nombre, apellido o matrícula
+    ---
+    tags:
+      - Estudiantes
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Texto a buscar; no distingue acentos ni mayúsculas (ej. "jose per")
+      - name: limite
+        in: query
+        type: integer
+        default: 20
+      - name: campos
+        in: query
+        type: string
+        description: Campos a devolver separados por coma
+    responses:
+      200:
+        description: Coincidencias ordenadas por relevancia (matrícula, apellido, nombre)
+      400:
+        description: Búsqueda demasiado corta o campos inválidos
+    """
+    q = request.args.get("q", "")
+    limite = max(1, min(request.args.get("limite", 20, type=int), 100))
+    try:
+        campos = leer_campos(request.args.get("campos"), CAMPOS_ESTUDIANTE)
+        ids = buscar(q, limite)
+    except CamposInvalidos as e:
+        return jsonify({"error": str(e), "disponibles": e.disponibles}), 400
+    except BusquedaInvalida as e:
+        return jsonify({"error": str(e)}), 400
+
+    filas = db.session.execute(estudiantes_como_filas(Estudiante.id.in_(ids), campos=campos,
+                                                      extra=["id"])).all() if ids else []
+    por_id = {f.id: f for f in filas}
+    return jsonify({
+        "q": q,
+        "total": len(ids),
+        "estudiantes": serializar_estudiantes([por_id[i] for i in ids if i in por_id], campos)
     }), 200
 
 
 # ─── READ ONE: GET /api/estudiantes/<id> ────────────────────────────────────
 @estudiantes_bp.route("/<int:id>", methods=["GET"])
+@cache.respuesta(lambda id: None if "campos" in request.args else f"estudiante:{id}")
 def obtener_estudiante(id):
     """
     Obtiene un estudiante por su ID
@@ -124,24 +371,51 @@ def obtener_estudiante(id):
         in: path
         type: integer
         required: true
+      - name: campos
+        in: query
+        type: string
+        description: Campos a devolver separados por coma
     responses:
       200:
-        description: Estudiante encontrado
+        description: Estudiante encontrado (con "archivado" si se lee del archivo de inactivos)
+      304:
+        description: Sin cambios desde el ETag enviado en If-None-Match
       404:
         description: Estudiante no encontrado
     """
-    estudiante = Estudiante.query.get_or_404(id, description="Estudiante no encontrado")
-    return jsonify(estudiante.to_dict()), 200
+    try:
+        campos = leer_campos(request.args.get("campos"), CAMPOS_ESTUDIANTE)
+    except CamposInvalidos as e:
+        return jsonify({"error": str(e), "disponibles": e.disponibles}), 400
+
+    if campos:
+        fila = db.session.execute(estudiantes_como_filas(Estudiante.id == id, campos=campos)).first()
+        if fila is not None:
+            return jsonify(serializar_estudiantes([fila], campos)[0]), 200
+    else:
+        estudiante = db.session.get(Estudiante, id)
+        if estudiante is not None:
+            return jsonify(estudiante.to_dict()), 200
+
+    # Los inactivos antiguos se movieron a estudiantes_archivados (flask archivo inactivos)
+    archivado = obtener_archivado(id)
+    if archivado is None:
+        abort(404, description="Estudiante no encontrado")
+    datos = archivado.to_dict()
+    return jsonify({c: datos[c] for c in campos} if campos else datos), 200
 
 
 # ─── UPDATE: PUT /api/estudiantes/<id> ──────────────────────────────────────
 @estudiantes_bp.route("/<int:id>", methods=["PUT"])
+@autorizacion.requiere_rol("admin")
 def actualizar_estudiante(id):
     """
     Actualiza los datos de un estudiante
     ---
     tags:
       - Estudiantes
+    security:
+      - Bearer: []
     parameters:
       - name: id
         in: path
@@ -159,6 +433,8 @@ def actualizar_estudiante(id):
     responses:
       200:
         description: Estudiante actualizado
+      403:
+        description: Con AUTH_REQUERIDA, el rol del token no tiene permiso
     """
     estudiante = Estudiante.query.get_or_404(id)
     datos = request.get_json()
@@ -175,17 +451,23 @@ def actualizar_estudiante(id):
         estudiante.semestre = datos["semestre"]
 
     db.session.commit()
+    cache.invalidar_respuestas(f"estudiante:{id}")
+    cache.nueva_generacion("estudiantes")
+    actualizar_indice(Estudiante.id == id)
     return jsonify({"mensaje": "Actualizado", "estudiante": estudiante.to_dict()}), 200
 
 
 # ─── DELETE: DELETE /api/estudiantes/<id> ───────────────────────────────────
 @estudiantes_bp.route("/<int:id>", methods=["DELETE"])
+@autorizacion.requiere_rol("admin")
 def eliminar_estudiante(id):
     """
     Desactiva (borrado lógico) un estudiante
     ---
     tags:
       - Estudiantes
+    security:
+      - Bearer: []
     parameters:
       - name: id
         in: path
@@ -194,8 +476,13 @@ def eliminar_estudiante(id):
     responses:
       200:
         description: Estudiante desactivado
+      403:
+        description: Con AUTH_REQUERIDA, el rol del token no tiene permiso
     """
     estudiante = Estudiante.query.get_or_404(id)
     estudiante.activo = False  # Borrado lógico: no borramos el registro real
     db.session.commit()
+    cache.invalidar_respuestas(f"estudiante:{id}")
+    cache.nueva_generacion("estudiantes")
+    actualizar_indice(Estudiante.id == id)
     return jsonify({"mensaje": f"Estudiante {estudiante.matricula} desactivado"}), 200
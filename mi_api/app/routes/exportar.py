@@ -0,0 +1,156 @@
+# app/routes/exportar.py
+import csv
+import io
+from datetime import datetime
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from app import autorizacion, db
+from app.models.calificacion import Calificacion
+from app.models.estudiante import Estudiante
+
+exportar_bp = Blueprint('exportar', __name__, url_prefix='/api/exportar')
+
+FORMATOS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+COLUMNAS_ESTUDIANTE = [
+    Estudiante.id, Estudiante.matricula, Estudiante.nombre, Estudiante.apellido,
+    Estudiante.email, Estudiante.carrera, Estudiante.semestre,
+    Estudiante.fecha_registro, Estudiante.activo, Estudiante.actualizado_en,
+]
+COLUMNAS_CALIFICACION = [
+    Calificacion.id, Calificacion.estudiante_id, Calificacion.materia_id,
+    Calificacion.calificacion, Calificacion.periodo, Calificacion.fecha_evaluacion,
+]
+
+
+def _valor(valor):
+    """Convierte tipos de la base (Decimal, fechas) a algo serializable."""
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    if valor is not None and not isinstance(valor, (bool, int, float, str)):
+        return float(valor)
+    return valor
+
+
+def _exportar(columnas, columna_fecha, nombre):
+    """
+    Filtra por 'desde_id' (filas nuevas) o 'desde' (filas con 'columna_fecha'
+    posterior) y transmite las filas sin materializarlas.
+    """
+    formato = request.args.get("formato", "ndjson")
+    if formato not in FORMATOS:
+        return jsonify({"error": "El formato debe ser 'ndjson' o 'csv'"}), 400
+
+    consulta = db.select(*columnas).order_by(columnas[0])
+
+    desde_id = request.args.get("desde_id", type=int)
+    if desde_id is not None:
+        consulta = consulta.where(columnas[0] > desde_id)
+
+    desde = request.args.get("desde")
+    if desde:
+        try:
+            limite = datetime.fromisoformat(desde)
+        except ValueError:
+            return jsonify({"error": "'desde' debe ser una fecha ISO 8601"}), 400
+        if not isinstance(columna_fecha.type, db.DateTime):
+            limite = limite.date()
+        consulta = consulta.where(columna_fecha >= limite)
+
+    tamano = current_app.config.get("EXPORTAR_LOTE_TAMANO", 1000)
+    nombres = [c.key for c in columnas]
+
+    def generar():
+        # yield_per activa cursores del lado del servidor donde el driver lo permite
+        filas = db.session.execute(consulta.execution_options(yield_per=tamano))
+        if formato == "csv":
+            buffer = io.StringIO()
+            escritor = csv.writer(buffer)
+            escritor.writerow(nombres)
+            for particion in filas.partitions():
+                escritor.writerows([_valor(v) for v in fila] for fila in particion)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            dumps = current_app.json.dumps
+            for particion in filas.partitions():
+                yield "".join(
+                    dumps(dict(zip(nombres, map(_valor, fila)))) + "\n" for fila in particion
+                )
+
+    return Response(
+        stream_with_context(generar()),
+        mimetype=FORMATOS[formato],
+        headers={"Content-Disposition": f"attachment; filename={nombre}.{formato}"}
+    )
+
+
+@exportar_bp.route("/estudiantes", methods=["GET"])
+@autorizacion.requiere_rol("admin")
+def exportar_estudiantes():
+    """
+    Exporta todos los estudiantes en streaming (NDJSON o CSV)
+    ---
+    tags:
+      - Exportación
+    security:
+      - Bearer: []
+    parameters:
+      - name: formato
+        in: query
+        type: string
+        enum: [ndjson, csv]
+        default: ndjson
+      - name: desde_id
+        in: query
+        type: integer
+        description: Solo filas con id mayor a este valor (exportación incremental)
+      - name: desde
+        in: query
+        type: string
+        description: Solo estudiantes creados o modificados (también dados de baja) a partir de esta fecha ISO 8601
+    responses:
+      200:
+        description: Flujo de estudiantes
+      400:
+        description: Formato o filtro inválido
+      403:
+        description: Con AUTH_REQUERIDA, el rol del token no tiene permiso
+    """
+    return _exportar(COLUMNAS_ESTUDIANTE, Estudiante.actualizado_en, "estudiantes")
+
+
+@exportar_bp.route("/calificaciones", methods=["GET"])
+@autorizacion.requiere_rol("admin")
+def exportar_calificaciones():
+    """
+    Exporta todas las calificaciones en streaming (NDJSON o CSV)
+    ---
+    tags:
+      - Exportación
+    security:
+      - Bearer: []
+    parameters:
+      - name: formato
+        in: query
+        type: string
+        enum: [ndjson, csv]
+        default: ndjson
+      - name: desde_id
+        in: query
+        type: integer
+        description: Solo filas con id mayor a este valor (exportación incremental)
+      - name: desde
+        in: query
+        type: string
+        description: Solo calificaciones evaluadas a partir de esta fecha ISO 8601 (no se modifican después de registrarse)
+    responses:
+      200:
+        description: Flujo de calificaciones
+      400:
+        description: Formato o filtro inválido
+      403:
+        description: Con AUTH_REQUERIDA, el rol del token no tiene permiso
+    """
+    return _exportar(COLUMNAS_CALIFICACION, Calificacion.fecha_evaluacion, "calificaciones")
@@ -0,0 +1,2 @@
+# app/services/__init__.py
+# Lógica de negocio compartida entre blueprints (consultas, agregados, lotes)
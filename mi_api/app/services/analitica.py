@@ -0,0 +1,147 @@
+# app/services/analitica.py
+import math
+from itertools import groupby
+from sqlalchemy import case, func
+from app import cache, db
+from app.models.calificacion import Calificacion
+from app.models.estudiante import Estudiante
+from app.models.materia import Materia
+from app.services.kardex import CALIFICACION_APROBATORIA
+
+AGRUPACIONES = {
+    "materia": (Calificacion.materia_id, Materia.nombre),
+    "periodo": (Calificacion.periodo,),
+    "carrera": (Estudiante.carrera,),
+}
+PERCENTILES = (25, 50, 75, 90)
+ANCHO_BUCKET = 10
+
+
+def _buckets():
+    """Columnas SUM(CASE) para el histograma: [0,10), [10,20) ... [90,100]."""
+    columnas = []
+    for inicio in range(0, 100, ANCHO_BUCKET):
+        fin = inicio + ANCHO_BUCKET
+        condicion = (Calificacion.calificacion >= inicio) & (
+            Calificacion.calificacion <= fin if fin == 100 else Calificacion.calificacion < fin
+        )
+        columnas.append(func.sum(case((condicion, 1), else_=0)).label(f"h{inicio}"))
+    return columnas
+
+
+def _percentil(ordenados, p):
+    """Interpolación lineal, equivalente a percentile_cont de PostgreSQL."""
+    if not ordenados:
+        return None
+    posicion = (len(ordenados) - 1) * p / 100
+    abajo, arriba = math.floor(posicion), math.ceil(posicion)
+    if abajo == arriba:
+        return ordenados[abajo]
+    return ordenados[abajo] + (ordenados[arriba] - ordenados[abajo]) * (posicion - abajo)
+
+
+def _con_uniones(consulta, agrupar, filtros):
+    if "materia" in agrupar:
+        consulta = consulta.join(Materia, Materia.id == Calificacion.materia_id)
+    if "carrera" in agrupar or filtros.get("carrera"):
+        consulta = consulta.join(Estudiante, Estudiante.id == Calificacion.estudiante_id)
+    if filtros.get("periodo"):
+        consulta = consulta.where(Calificacion.periodo == filtros["periodo"])
+    if filtros.get("materia_id"):
+        consulta = consulta.where(Calificacion.materia_id == filtros["materia_id"])
+    if filtros.get("carrera"):
+        consulta = consulta.where(Estudiante.carrera == filtros["carrera"])
+    return consulta
+
+
+def _formatear(claves, fila, percentiles):
+    n = fila.total
+    media = float(fila.suma) / n
+    varianza = (float(fila.suma_cuadrados) - n * media * media) / (n - 1) if n > 1 else 0.0
+    return {
+        **claves,
+        "total": n,
+        "promedio": round(media, 2),
+        "desviacion_estandar": round(math.sqrt(max(varianza, 0.0)), 2),
+        "tasa_aprobacion": round(int(fila.aprobadas) / n, 4),
+        "minima": float(fila.minima),
+        "maxima": float(fila.maxima),
+        "histograma": {
+            f"{i}-{i + ANCHO_BUCKET}": int(getattr(fila, f"h{i}")) for i in range(0, 100, ANCHO_BUCKET)
+        },
+        "percentiles": {f"p{p}": None if v is None else round(float(v), 2) for p, v in percentiles.items()},
+    }
+
+
+def calcular(agrupar, filtros):
+    """
+    Estadísticas por grupo. Conteos, sumas, histograma y extremos salen de un
+    único GROUP BY; los percentiles usan percentile_cont en PostgreSQL y, en
+    otros motores, un recorrido columnar ordenado (sin objetos ORM).
+    """
+    columnas_grupo = [c for g in agrupar for c in AGRUPACIONES[g]]
+    es_postgres = db.session.get_bind().dialect.name == "postgresql"
+
+    agregados = [
+        func.count(Calificacion.id).label("total"),
+        func.sum(Calificacion.calificacion).label("suma"),
+        func.sum(Calificacion.calificacion * Calificacion.calificacion).label("suma_cuadrados"),
+        func.min(Calificacion.calificacion).label("minima"),
+        func.max(Calificacion.calificacion).label("maxima"),
+        func.sum(case((Calificacion.calificacion >= CALIFICACION_APROBATORIA, 1), else_=0)).label("aprobadas"),
+        *_buckets(),
+    ]
+    if es_postgres:
+        agregados += [
+            func.percentile_cont(p / 100).within_group(Calificacion.calificacion).label(f"p{p}")
+            for p in PERCENTILES
+        ]
+
+    consulta = _con_uniones(
+        db.select(*columnas_grupo, *agregados).select_from(Calificacion), agrupar, filtros
+    ).group_by(*columnas_grupo).order_by(*columnas_grupo)
+
+    filas = db.session.execute(consulta).all()
+    n_grupo = len(columnas_grupo)
+    nombres = [c.key for c in columnas_grupo]
+
+    if es_postgres:
+        percentiles = {tuple(f[:n_grupo]): {p: getattr(f, f"p{p}") for p in PERCENTILES} for f in filas}
+    else:
+        percentiles = {}
+        valores = _con_uniones(
+            db.select(*columnas_grupo, Calificacion.calificacion).select_from(Calificacion), agrupar, filtros
+        ).order_by(*columnas_grupo, Calificacion.calificacion)
+        resultado = db.session.execute(valores.execution_options(yield_per=10000))
+        for clave, grupo in groupby(resultado, key=lambda f: tuple(f[:n_grupo])):
+            ordenados = [float(f[-1]) for f in grupo]
+            percentiles[clave] = {p: _percentil(ordenados, p) for p in PERCENTILES}
+
+    return [
+        _formatear(dict(zip(nombres, f[:n_grupo])), f, percentiles.get(tuple(f[:n_grupo]), {}))
+        for f in filas
+    ]
+
+
+def calcular_con_cache(agrupar, filtros, ttl=None):
+    """
+    Igual que calcular(), pero cuando se filtra por periodo guarda el resultado
+    en la caché. Registrar calificaciones de ese periodo cambia su generación,
+    así que un periodo cerrado se calcula una sola vez. Si se agrupa o filtra
+    por carrera, la clave lleva también la generación de estudiantes: cambiar
+    la carrera de alguien o archivarlo la renueva.
+    """
+    periodo = filtros.get("periodo")
+    if not periodo:
+        return calcular(agrupar, filtros)
+
+    partes = [f"{k}={filtros[k]}" for k in sorted(filtros) if filtros[k]]
+    generaciones = [cache.generacion("periodo:" + periodo)]
+    if "carrera" in agrupar or filtros.get("carrera"):
+        generaciones.append(cache.generacion("estudiantes"))
+    clave = f"analitica:{':'.join(generaciones)}:{','.join(agrupar)}:{'&'.join(partes)}"
+    resultado = cache.obtener(clave)
+    if resultado is None:
+        resultado = calcular(agrupar, filtros)
+        cache.guardar(clave, resultado, ttl)
+    return resultado
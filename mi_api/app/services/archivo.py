@@ -0,0 +1,113 @@
+# app/services/archivo.py
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, delete, insert, literal
+from app import cache, db
+from app.models.archivo import CalificacionArchivada, EstudianteArchivado
+from app.models.calificacion import Calificacion
+from app.models.estudiante import Estudiante
+from app.models.resumen import ResumenAcademico
+from app.services.calificaciones import invalidar_caches
+from app.services.kardex import armar_kardex, consulta_calificaciones, consulta_estadisticas, formatear_estadisticas
+
+COLUMNAS_ESTUDIANTE = ("id", "matricula", "nombre", "apellido", "email", "carrera", "semestre",
+                       "fecha_registro", "activo", "fecha_baja")
+COLUMNAS_CALIFICACION = ("id", "estudiante_id", "materia_id", "calificacion", "periodo", "fecha_evaluacion")
+
+
+def _candidatos(limite, despues_de, lote):
+    """Ids del siguiente lote de inactivos dados de baja antes de 'limite'."""
+    return db.session.scalars(
+        db.select(Estudiante.id)
+        .where(Estudiante.activo.is_(False),
+               Estudiante.fecha_baja < limite,
+               Estudiante.id > despues_de)
+        .order_by(Estudiante.id)
+        .limit(lote)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+
+def _mover_lote(ids, ahora):
+    """Copia un lote a las tablas de archivo y lo borra de las calientes; devuelve las calificaciones movidas."""
+    periodos = db.session.execute(
+        db.select(Calificacion.estudiante_id, Calificacion.periodo)
+        .where(Calificacion.estudiante_id.in_(ids)).distinct()
+    ).all()
+    db.session.execute(insert(EstudianteArchivado).from_select(
+        [*COLUMNAS_ESTUDIANTE, "fecha_archivo"],
+        db.select(*(Estudiante.__table__.c[c] for c in COLUMNAS_ESTUDIANTE), literal(ahora, DateTime))
+        .where(Estudiante.id.in_(ids))
+    ))
+    movidas = db.session.execute(insert(CalificacionArchivada).from_select(
+        list(COLUMNAS_CALIFICACION),
+        db.select(*(Calificacion.__table__.c[c] for c in COLUMNAS_CALIFICACION))
+        .where(Calificacion.estudiante_id.in_(ids))
+    )).rowcount
+    db.session.execute(delete(ResumenAcademico).where(ResumenAcademico.estudiante_id.in_(ids)))
+    db.session.execute(delete(Calificacion).where(Calificacion.estudiante_id.in_(ids)))
+    db.session.execute(delete(Estudiante).where(Estudiante.id.in_(ids)))
+    return movidas, [{"estudiante_id": e, "periodo": p} for e, p in periodos]
+
+
+def archivar_inactivos(dias=365, lote=500, al_mover=None):
+    """
+    Mueve a estudiantes_archivados / calificaciones_archivadas a los estudiantes
+    inactivos desde hace más de 'dias', junto con sus calificaciones. Cada lote
+    de 'lote' estudiantes es una transacción propia: copiar, borrar y commit,
+    así las tablas calientes no quedan bloqueadas durante todo el recorrido.
+
+    Las analíticas y el ranking dejan de contar lo archivado; el estudiante y
+    su kardex se siguen leyendo con obtener_archivado() y kardex_archivado().
+    """
+    inicio = time.perf_counter()
+    limite = datetime.utcnow() - timedelta(days=dias)
+    totales = {"estudiantes": 0, "calificaciones": 0, "lotes": 0}
+    ultimo = 0
+    while True:
+        ids = _candidatos(limite, ultimo, lote)
+        if not ids:
+            db.session.rollback()
+            break
+        try:
+            movidas, afectadas = _mover_lote(ids, datetime.utcnow())
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        cache.invalidar_respuestas(*(f"estudiante:{i}" for i in ids))
+        cache.nueva_generacion("estudiantes")
+        if afectadas:
+            invalidar_caches(afectadas)
+        totales["estudiantes"] += len(ids)
+        totales["calificaciones"] += movidas
+        totales["lotes"] += 1
+        ultimo = ids[-1]
+        if al_mover is not None:
+            al_mover(dict(totales, segundos=time.perf_counter() - inicio))
+
+    segundos = time.perf_counter() - inicio
+    filas = totales["estudiantes"] + totales["calificaciones"]
+    return dict(totales, segundos=round(segundos, 3),
+                filas_por_segundo=round(filas / segundos, 1) if segundos else 0.0)
+
+
+def obtener_archivado(id):
+    """Estudiante archivado o None: la lectura de respaldo cuando ya no está en 'estudiantes'."""
+    return db.session.get(EstudianteArchivado, id)
+
+
+def kardex_archivado(estudiante, campos=None):
+    """Kardex de un estudiante archivado, calculado sobre sus calificaciones archivadas (sin ranking)."""
+    filas = db.session.execute(
+        consulta_calificaciones(campos, CalificacionArchivada)
+        .where(CalificacionArchivada.estudiante_id == estudiante.id)
+    ).all()
+    if not filas:
+        return armar_kardex(estudiante, filas, None)
+    f = db.session.execute(
+        consulta_estadisticas(CalificacionArchivada).where(CalificacionArchivada.estudiante_id == estudiante.id)
+    ).one()
+    estadisticas = formatear_estadisticas(f.total, f.promedio, f.maxima, f.minima, f.aprobadas)
+    return armar_kardex(estudiante, filas, estadisticas, None, campos)
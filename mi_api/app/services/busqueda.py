@@ -0,0 +1,216 @@
+# app/services/busqueda.py
+"""
+Búsqueda de estudiantes por prefijo de nombre, apellido o matrícula, sin
+distinguir acentos ni mayúsculas. Cada término de la consulta debe ser prefijo
+de alguna palabra del estudiante.
+
+En PostgreSQL se resuelve con SQL sobre las columnas normalizadas (índices de
+trigramas y text_pattern_ops). En SQLite se usa un índice de prefijos en memoria
+del proceso que se carga en la primera búsqueda y se actualiza en cada escritura
+mediante actualizar_indice(). Con varios procesos cada uno tiene su índice y
+solo ve las escrituras que él mismo atendió.
+"""
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from itertools import islice
+from flask import current_app
+from sqlalchemy import case, or_
+from app import db
+from app.models.estudiante import Estudiante, normalizar
+
+LONGITUD_MINIMA = 2
+
+
+class BusquedaInvalida(ValueError):
+    pass
+
+
+def terminos(q):
+    """Términos normalizados de la consulta; lanza BusquedaInvalida si es muy corta."""
+    partes = normalizar(q or "").split()
+    if len("".join(partes)) < LONGITUD_MINIMA:
+        raise BusquedaInvalida(f"La búsqueda debe tener al menos {LONGITUD_MINIMA} caracteres")
+    return partes
+
+
+class IndicePrefijos:
+    """
+    Índice invertido en memoria. Un vocabulario ordenado resuelve un prefijo
+    con dos bisect (equivale a buscar sus n-gramas de borde sin guardarlos) y
+    cada palabra apunta a los ids que la contienen, por campo:
+
+      palabra    cualquier palabra de matrícula, apellido o nombre (filtra)
+      matricula  / apellido / nombre: solo la primera palabra (ordena por relevancia)
+
+    Dentro de cada nivel de relevancia los resultados van por apellido, nombre e
+    id: un nivel chico se ordena con heapq y uno grande se recorre sobre la lista
+    global ya ordenada hasta juntar 'limite', así ninguno cuesta más de ~sqrt(n·limite).
+    """
+    CAMPOS = ("palabra", "matricula", "apellido", "nombre")
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._documentos = {}   # id -> (apellido, nombre, matrícula, id): también es la clave de orden
+        self._vocabulario = []
+        self._orden = []        # documentos ordenados
+        self._ids = {c: defaultdict(set) for c in self.CAMPOS}
+
+    def __len__(self):
+        return len(self._documentos)
+
+    @staticmethod
+    def _entradas(documento):
+        apellido, nombre, matricula, _ = documento
+        primeras = [(campo, texto.split()[:1]) for campo, texto in
+                    (("matricula", matricula), ("apellido", apellido), ("nombre", nombre))]
+        palabras = f"{matricula} {apellido} {nombre}".split()
+        return [("palabra", p) for p in palabras] + [(c, p[0]) for c, p in primeras if p]
+
+    def _agregar(self, id, documento, nuevas):
+        self._documentos[id] = documento
+        for campo, palabra in self._entradas(documento):
+            if campo == "palabra" and palabra not in self._ids["palabra"]:
+                nuevas.add(palabra)
+            self._ids[campo][palabra].add(id)
+
+    def _quitar(self, id):
+        documento = self._documentos.pop(id, None)
+        if documento is None:
+            return
+        del self._orden[bisect_left(self._orden, documento)]
+        for campo, palabra in self._entradas(documento):
+            ids = self._ids[campo].get(palabra)
+            if ids is not None:
+                ids.discard(id)
+                if not ids:
+                    del self._ids[campo][palabra]
+                    if campo == "palabra":
+                        del self._vocabulario[bisect_left(self._vocabulario, palabra)]
+
+    def actualizar(self, filas):
+        """Agrega, reemplaza o quita (si está inactivo) a cada estudiante de 'filas'."""
+        with self._candado:
+            palabras, documentos = set(), set()
+            for f in filas:
+                self._quitar(f.id)
+                if f.activo:
+                    documento = (normalizar(f.apellido), normalizar(f.nombre), normalizar(f.matricula), f.id)
+                    self._agregar(f.id, documento, palabras)
+                    documentos.add(documento)
+            # Cargas grandes: reordenar todo es más barato que insertar uno por uno
+            if len(documentos) > 64:
+                self._vocabulario = sorted(self._ids["palabra"])
+                self._orden = sorted(self._documentos.values())
+            else:
+                for palabra in palabras:
+                    insort(self._vocabulario, palabra)
+                for documento in documentos:
+                    insort(self._orden, documento)
+
+    def _con_prefijo(self, campo, prefijo):
+        inicio = bisect_left(self._vocabulario, prefijo)
+        fin = bisect_left(self._vocabulario, prefijo + "\uffff", inicio)
+        ids = self._ids[campo]
+        return set().union(*(ids[p] for p in self._vocabulario[inicio:fin] if p in ids))
+
+    def buscar(self, partes, limite):
+        with self._candado:
+            candidatos = None
+            for termino in sorted(partes, key=len, reverse=True):
+                encontrados = self._con_prefijo("palabra", termino)
+                candidatos = encontrados if candidatos is None else candidatos & encontrados
+                if not candidatos:
+                    return []
+
+            resultado = []
+            for nivel, desde in self._niveles(candidatos, partes[0]):
+                resultado += self._primeros(nivel, limite - len(resultado), desde)
+                if len(resultado) >= limite:
+                    break
+            return resultado
+
+    def _niveles(self, candidatos, primero):
+        """(ids, inicio del recorrido) por nivel de relevancia; se calculan a medida que hacen falta."""
+        por_matricula = candidatos & self._con_prefijo("matricula", primero)
+        exactos = {i for i in por_matricula if self._documentos[i][2] == primero}
+        yield exactos, ()
+        yield por_matricula - exactos, ()
+        vistos = set(por_matricula)
+        for campo in ("apellido", "nombre"):
+            nivel = (candidatos & self._con_prefijo(campo, primero)) - vistos
+            # Los de apellido con ese prefijo están juntos en el orden global
+            yield nivel, (primero,) if campo == "apellido" else ()
+            vistos |= nivel
+        yield candidatos - vistos, ()
+
+    def _primeros(self, ids, n, desde=()):
+        """Los n primeros ids en orden (apellido, nombre, id), recorriendo desde 'desde'."""
+        if not ids:
+            return []
+        if len(ids) ** 2 <= n * len(self._orden):
+            # El documento es su propia clave de orden y termina en el id
+            return [d[3] for d in heapq.nsmallest(n, map(self._documentos.__getitem__, ids))]
+        inicio = bisect_left(self._orden, desde) if desde else 0
+        return list(islice((d[3] for d in islice(self._orden, inicio, None) if d[3] in ids), n))
+
+
+COLUMNAS_INDICE = (Estudiante.id, Estudiante.matricula, Estudiante.apellido,
+                   Estudiante.nombre, Estudiante.activo)
+
+
+def usa_indice_local():
+    """BUSQUEDA_INDICE: 'auto' (SQL en PostgreSQL, memoria en otros motores), 'sql' o 'memoria'."""
+    modo = current_app.config.get("BUSQUEDA_INDICE", "auto")
+    if modo == "auto":
+        return db.engine.dialect.name != "postgresql"
+    return modo == "memoria"
+
+
+def _indice():
+    """Índice en memoria de esta app; se construye en la primera búsqueda."""
+    indice = current_app.extensions.get("indice_busqueda")
+    if indice is None:
+        indice = IndicePrefijos()
+        indice.actualizar(db.session.execute(db.select(*COLUMNAS_INDICE).where(Estudiante.activo.is_(True))))
+        current_app.extensions["indice_busqueda"] = indice
+    return indice
+
+
+def actualizar_indice(*condiciones):
+    """Refleja en el índice en memoria a los estudiantes que cumplen 'condiciones' (tras un commit)."""
+    indice = current_app.extensions.get("indice_busqueda")
+    if indice is not None:
+        indice.actualizar(db.session.execute(db.select(*COLUMNAS_INDICE).where(*condiciones)))
+
+
+def _consulta_sql(partes, limite):
+    nombre, apellido = Estudiante.nombre_normalizado, Estudiante.apellido_normalizado
+    matricula = Estudiante.matricula_normalizada
+    condiciones = [Estudiante.activo.is_(True)]
+    for t in partes:
+        condiciones.append(or_(
+            matricula.startswith(t, autoescape=True),
+            apellido.startswith(t, autoescape=True), apellido.contains(" " + t, autoescape=True),
+            nombre.startswith(t, autoescape=True), nombre.contains(" " + t, autoescape=True),
+        ))
+
+    primero = partes[0]
+    relevancia = case(
+        (matricula == primero, 0),
+        (matricula.startswith(primero, autoescape=True), 1),
+        (apellido.startswith(primero, autoescape=True), 2),
+        (nombre.startswith(primero, autoescape=True), 3),
+        else_=4,
+    )
+    return (db.select(Estudiante.id).where(*condiciones)
+            .order_by(relevancia, apellido, nombre, Estudiante.id).limit(limite))
+
+
+def buscar(q, limite=20):
+    """Ids de estudiantes activos que coinciden con 'q', del más al menos relevante."""
+    partes = terminos(q)
+    if usa_indice_local():
+        return _indice().buscar(partes, limite)
+    return list(db.session.scalars(_consulta_sql(partes, limite)))
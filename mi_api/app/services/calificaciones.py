@@ -0,0 +1,120 @@
+# app/services/calificaciones.py
+from sqlalchemy import insert
+from app import cache, db, escrituras
+from app.models.calificacion import Calificacion
+from app.models.estudiante import Estudiante
+from app.models.materia import Materia
+from app.models.resumen import ResumenAcademico
+from app.services import resumen
+from app.services.importacion import ReporteImportacion, en_bloques
+
+PERIODO_POR_DEFECTO = "2024-1"
+
+
+def _validar_fila(registro):
+    """Convierte un registro crudo en valores para INSERT o lanza ValueError."""
+    try:
+        estudiante_id = int(registro["estudiante_id"])
+        materia_id = int(registro["materia_id"])
+    except KeyError as faltante:
+        raise ValueError(f"El campo {faltante} es requerido")
+    except (TypeError, ValueError):
+        raise ValueError("estudiante_id y materia_id deben ser enteros")
+
+    try:
+        calificacion = float(registro.get("calificacion"))
+    except (TypeError, ValueError):
+        raise ValueError("La calificación debe ser numérica")
+    if not 0 <= calificacion <= 100:
+        raise ValueError("La calificación debe estar entre 0 y 100")
+
+    return {
+        "estudiante_id": estudiante_id,
+        "materia_id": materia_id,
+        "calificacion": calificacion,
+        "periodo": registro.get("periodo") or PERIODO_POR_DEFECTO
+    }
+
+
+def _ids_existentes(columna, ids):
+    if not ids:
+        return set()
+    return set(db.session.scalars(db.select(columna).where(columna.in_(ids))))
+
+
+def invalidar_caches(filas):
+    """
+    Invalida los agregados por periodo afectados por calificaciones nuevas. La
+    generación del promedio general ('*') siempre cambia, y con ella todos los
+    kardex cacheados: el ranking de la cohorte del estudiante se movió.
+    """
+    periodos = {f.get("periodo") or "" for f in filas} | {ResumenAcademico.TOTAL}
+    cache.nueva_generacion(*(f"periodo:{p}" for p in periodos))
+
+
+def validar_calificacion(registro):
+    """Validación completa (formato y existencia) de una calificación a encolar o ValueError."""
+    valores = _validar_fila(registro)
+    if not _ids_existentes(Estudiante.id, {valores["estudiante_id"]}):
+        raise ValueError(f"El estudiante {valores['estudiante_id']} no existe")
+    if not _ids_existentes(Materia.id, {valores["materia_id"]}):
+        raise ValueError(f"La materia {valores['materia_id']} no existe")
+    return valores
+
+
+@escrituras.registrar_aplicador
+def aplicar_calificaciones(filas):
+    """Inserta calificaciones ya validadas y actualiza el resumen con un solo commit."""
+    try:
+        ids = db.session.scalars(
+            insert(Calificacion).returning(Calificacion.id, sort_by_parameter_order=True), filas
+        ).all()
+        resumen.acumular(filas)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    invalidar_caches(filas)
+    return [{"calificacion_id": id} for id in ids]
+
+
+def importar_calificaciones(registros, tamano_lote=1000):
+    """
+    Valida e inserta calificaciones por bloques. Cada bloque cuesta dos
+    consultas de existencia (estudiantes y materias) y un INSERT multi-fila.
+    """
+    reporte = ReporteImportacion()
+    numero = 0
+
+    for bloque in en_bloques(registros, tamano_lote):
+        validas = []
+        for registro in bloque:
+            numero += 1
+            if not isinstance(registro, dict):
+                reporte.error(numero, "Cada fila debe ser un objeto")
+                continue
+            try:
+                validas.append((numero, _validar_fila(registro)))
+            except ValueError as e:
+                reporte.error(numero, str(e))
+
+        estudiantes = _ids_existentes(Estudiante.id, {v["estudiante_id"] for _, v in validas})
+        materias = _ids_existentes(Materia.id, {v["materia_id"] for _, v in validas})
+
+        filas = []
+        for fila, valores in validas:
+            if valores["estudiante_id"] not in estudiantes:
+                reporte.error(fila, f"El estudiante {valores['estudiante_id']} no existe")
+            elif valores["materia_id"] not in materias:
+                reporte.error(fila, f"La materia {valores['materia_id']} no existe")
+            else:
+                filas.append(valores)
+
+        if filas:
+            db.session.execute(insert(Calificacion), filas)
+            resumen.acumular(filas)
+            db.session.commit()
+            invalidar_caches(filas)
+            reporte.insertadas += len(filas)
+
+    return reporte
@@ -0,0 +1,111 @@
+# app/services/estudiantes.py
+from sqlalchemy import insert, or_, update
+from app import cache, db
+from app.models.estudiante import Estudiante
+from app.services.busqueda import actualizar_indice
+from app.services.importacion import ReporteImportacion, en_bloques
+
+CAMPOS_REQUERIDOS = ["matricula", "nombre", "apellido", "email", "carrera"]
+CAMPOS_ACTUALIZABLES = ["nombre", "apellido", "email", "carrera", "semestre"]
+
+
+def _validar_fila(registro):
+    """Normaliza un registro crudo (JSON o CSV) o lanza ValueError."""
+    for campo in CAMPOS_REQUERIDOS:
+        if not registro.get(campo):
+            raise ValueError(f"El campo '{campo}' es requerido")
+    try:
+        semestre = int(registro.get("semestre") or 1)
+    except (TypeError, ValueError):
+        raise ValueError("El semestre debe ser entero")
+
+    valores = {campo: str(registro[campo]).strip() for campo in CAMPOS_REQUERIDOS}
+    valores["semestre"] = semestre
+    return valores
+
+
+def _existentes(matriculas, emails):
+    """Una sola consulta: estudiantes que ya usan alguna matrícula o email del bloque."""
+    filas = db.session.execute(
+        db.select(Estudiante.id, Estudiante.matricula, Estudiante.email)
+        .where(or_(Estudiante.matricula.in_(matriculas), Estudiante.email.in_(emails)))
+    )
+    por_matricula, por_email = {}, {}
+    for fila in filas:
+        por_matricula[fila.matricula] = fila.id
+        por_email[fila.email] = fila.id
+    return por_matricula, por_email
+
+
+def importar_estudiantes(registros, tamano_lote=1000, upsert=False):
+    """
+    Inserta estudiantes por bloques detectando conflictos de matrícula y email
+    contra la base y dentro del propio lote. Con 'upsert' las matrículas
+    existentes se actualizan en lugar de rechazarse.
+    """
+    reporte = ReporteImportacion()
+    numero = 0
+
+    for bloque in en_bloques(registros, tamano_lote):
+        validas = []
+        for registro in bloque:
+            numero += 1
+            if not isinstance(registro, dict):
+                reporte.error(numero, "Cada fila debe ser un objeto")
+                continue
+            try:
+                validas.append((numero, _validar_fila(registro)))
+            except ValueError as e:
+                reporte.error(numero, str(e))
+
+        if not validas:
+            continue
+
+        por_matricula, por_email = _existentes(
+            {v["matricula"] for _, v in validas}, {v["email"] for _, v in validas}
+        )
+
+        nuevas, cambios = [], []
+        vistas_matricula, vistas_email = set(), set()
+        for fila, valores in validas:
+            matricula, email = valores["matricula"], valores["email"]
+            if matricula in vistas_matricula:
+                reporte.error(fila, "La matrícula está repetida en el lote")
+                continue
+            if email in vistas_email:
+                reporte.error(fila, "El email está repetido en el lote")
+                continue
+
+            existente = por_matricula.get(matricula)
+            dueno_email = por_email.get(email)
+            if existente and not upsert:
+                reporte.error(fila, "La matrícula ya está registrada")
+                continue
+            if dueno_email and dueno_email != existente:
+                reporte.error(fila, "El email ya está registrado")
+                continue
+
+            vistas_matricula.add(matricula)
+            vistas_email.add(email)
+            if existente:
+                cambio = {c: valores[c] for c in CAMPOS_ACTUALIZABLES}
+                cambios.append({"id": existente, **cambio, **Estudiante.normalizados(cambio)})
+            else:
+                nuevas.append(valores)
+
+        if nuevas:
+            db.session.execute(insert(Estudiante), nuevas)
+            reporte.insertadas += len(nuevas)
+        if cambios:
+            db.session.execute(update(Estudiante), cambios)
+            reporte.actualizadas += len(cambios)
+        db.session.commit()
+        for cambio in cambios:
+            cache.invalidar_respuestas(f"estudiante:{cambio['id']}")
+        if cambios:
+            cache.nueva_generacion("estudiantes")
+        if nuevas or cambios:
+            actualizar_indice(or_(Estudiante.matricula.in_([v["matricula"] for v in nuevas]),
+                                  Estudiante.id.in_([c["id"] for c in cambios])))
+
+    return reporte
@@ -0,0 +1,95 @@
+# app/services/importacion.py
+import csv
+import io
+import json
+from itertools import islice
+
+TIPOS_CSV = ("text/csv", "application/csv")
+TIPOS_NDJSON = ("application/x-ndjson", "application/ndjson")
+
+
+class FormatoInvalido(ValueError):
+    """El cuerpo de la petición no es un JSON, NDJSON o CSV válido."""
+
+
+def _lineas_texto(flujo):
+    return io.TextIOWrapper(flujo, encoding="utf-8-sig", newline="")
+
+
+def _registros_ndjson(flujo):
+    for numero, linea in enumerate(_lineas_texto(flujo), start=1):
+        if not linea.strip():
+            continue
+        try:
+            yield json.loads(linea)
+        except ValueError:
+            raise FormatoInvalido(f"Línea {numero} no es JSON válido")
+
+
+def leer_registros(req):
+    """
+    Itera los registros enviados en la petición sin cargarlos todos en memoria.
+    Acepta un arreglo JSON, NDJSON, CSV en el cuerpo o un archivo 'archivo'
+    (multipart) con extensión .csv, .ndjson o .json.
+    """
+    if "archivo" in req.files:
+        archivo = req.files["archivo"]
+        nombre = (archivo.filename or "").lower()
+        if nombre.endswith(".csv"):
+            return csv.DictReader(_lineas_texto(archivo.stream))
+        if nombre.endswith((".ndjson", ".jsonl")):
+            return _registros_ndjson(archivo.stream)
+        try:
+            datos = json.load(archivo.stream)
+        except ValueError:
+            raise FormatoInvalido("El archivo no es JSON válido")
+    elif req.mimetype in TIPOS_CSV:
+        return csv.DictReader(_lineas_texto(req.stream))
+    elif req.mimetype in TIPOS_NDJSON:
+        return _registros_ndjson(req.stream)
+    else:
+        datos = req.get_json(silent=True)
+
+    if not isinstance(datos, list):
+        raise FormatoInvalido("Se esperaba un arreglo JSON, NDJSON o CSV")
+    return iter(datos)
+
+
+def en_bloques(registros, tamano):
+    """Agrupa un iterable en listas de 'tamano' elementos (el último puede ser menor)."""
+    registros = iter(registros)
+    while True:
+        bloque = list(islice(registros, tamano))
+        if not bloque:
+            return
+        yield bloque
+
+
+def tamano_bloque(req, por_defecto, maximo=10000):
+    """Lee '?lote=' de la petición acotándolo entre 1 y 'maximo'."""
+    tamano = req.args.get("lote", por_defecto, type=int)
+    return max(1, min(tamano, maximo))
+
+
+class ReporteImportacion:
+    """Acumula resultados por fila; guarda como máximo 'limite' errores detallados."""
+
+    def __init__(self, limite=1000):
+        self.limite = limite
+        self.insertadas = 0
+        self.actualizadas = 0
+        self.total_errores = 0
+        self.errores = []
+
+    def error(self, fila, mensaje):
+        self.total_errores += 1
+        if len(self.errores) < self.limite:
+            self.errores.append({"fila": fila, "error": mensaje})
+
+    def to_dict(self):
+        return {
+            "insertadas": self.insertadas,
+            "actualizadas": self.actualizadas,
+            "total_errores": self.total_errores,
+            "errores": sorted(self.errores, key=lambda e: e["fila"])
+        }
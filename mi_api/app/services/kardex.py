@@ -0,0 +1,214 @@
+# app/services/kardex.py
+from collections import defaultdict
+from sqlalchemy import case, func
+from app import cache, db
+from app.models.calificacion import Calificacion
+from app.models.estudiante import Estudiante
+from app.models.materia import Materia
+from app.models.resumen import ResumenAcademico
+from app.services.ranking import ranking_de_cohorte, ranking_por_estudiante
+from app.services.serializacion import FilaParcial
+
+CALIFICACION_APROBATORIA = 60
+PROMEDIO_REGULAR = 70
+
+
+def consulta_estadisticas(modelo=Calificacion):
+    """
+    Agregado SQL por estudiante: total, suma, promedio, máx, mín y aprobadas.
+    'modelo' puede ser también CalificacionArchivada (mismas columnas).
+    """
+    return db.select(
+        modelo.estudiante_id,
+        func.count(modelo.id).label("total"),
+        func.avg(modelo.calificacion).label("promedio"),
+        func.max(modelo.calificacion).label("maxima"),
+        func.min(modelo.calificacion).label("minima"),
+        func.sum(case((modelo.calificacion >= CALIFICACION_APROBATORIA, 1), else_=0)).label("aprobadas"),
+    ).group_by(modelo.estudiante_id)
+
+
+def formatear_estadisticas(total, promedio, maxima, minima, aprobadas):
+    """Construye el bloque 'estadisticas' del kardex a partir del agregado."""
+    promedio = float(promedio)
+    aprobadas = int(aprobadas or 0)
+    return {
+        "promedio_general": round(promedio, 2),
+        "total_materias": total,
+        "materias_aprobadas": aprobadas,
+        "materias_reprobadas": total - aprobadas,
+        "calificacion_maxima": float(maxima),
+        "calificacion_minima": float(minima),
+        "estatus": "Regular" if promedio >= PROMEDIO_REGULAR else "En riesgo"
+    }
+
+
+def estadisticas_de_resumen(resumen):
+    """Bloque 'estadisticas' leído de un ResumenAcademico, sin recorrer calificaciones."""
+    return formatear_estadisticas(resumen.total, resumen.promedio, resumen.maxima,
+                                  resumen.minima, resumen.aprobadas)
+
+
+def consulta_resumenes(ids):
+    """Filas de resumen general (periodo '*') de varios estudiantes."""
+    return db.select(ResumenAcademico).where(
+        ResumenAcademico.estudiante_id.in_(ids),
+        ResumenAcademico.periodo == ResumenAcademico.TOTAL,
+        ResumenAcademico.total > 0
+    )
+
+
+def estadisticas_desde_agregado(filas, estadisticas=None):
+    """Completa 'estadisticas' con filas de consulta_estadisticas()."""
+    estadisticas = {} if estadisticas is None else estadisticas
+    for f in filas:
+        estadisticas[f.estudiante_id] = formatear_estadisticas(
+            f.total, f.promedio, f.maxima, f.minima, f.aprobadas
+        )
+    return estadisticas
+
+
+def estadisticas_por_estudiante(ids):
+    """
+    Estadísticas generales de varios estudiantes. Se leen del resumen académico;
+    solo los estudiantes sin resumen (p. ej. antes de un backfill) se agregan
+    sobre calificaciones.
+    """
+    ids = set(ids)
+    resumenes = db.session.scalars(consulta_resumenes(ids))
+    estadisticas = {r.estudiante_id: estadisticas_de_resumen(r) for r in resumenes}
+
+    faltantes = ids - estadisticas.keys()
+    if faltantes:
+        filas = db.session.execute(consulta_estadisticas().where(Calificacion.estudiante_id.in_(faltantes)))
+        estadisticas_desde_agregado(filas, estadisticas)
+    return estadisticas
+
+
+def obtener_estadisticas(estudiante_id):
+    """Estadísticas de un estudiante; None si no tiene calificaciones."""
+    return estadisticas_por_estudiante([estudiante_id]).get(estudiante_id)
+
+
+# Campo de cada calificación en el kardex -> columna que necesita (None: no lee columnas)
+CAMPOS_CALIFICACION = {
+    "id": None,
+    "estudiante": None,
+    "materia": "materia",
+    "calificacion": "calificacion",
+    "aprobado": "calificacion",
+    "periodo": "periodo",
+}
+
+
+def consulta_calificaciones(campos=None, modelo=Calificacion):
+    """
+    Columnas de calificación con el nombre de la materia ya unido (sin cargas
+    perezosas). Con 'campos' solo se seleccionan las columnas necesarias y el
+    JOIN con materias se omite si no se pide 'materia'.
+    """
+    necesarias = {CAMPOS_CALIFICACION[c] for c in (campos or CAMPOS_CALIFICACION)}
+    columnas = [modelo.id, modelo.estudiante_id]
+    if "materia" in necesarias:
+        columnas.append(Materia.nombre.label("materia"))
+    if "calificacion" in necesarias:
+        columnas.append(modelo.calificacion)
+    if "periodo" in necesarias:
+        columnas.append(modelo.periodo)
+
+    consulta = db.select(*columnas)
+    if "materia" in necesarias:
+        consulta = consulta.join(Materia, Materia.id == modelo.materia_id)
+    return consulta.order_by(modelo.id)
+
+
+def formatear_calificacion(fila, nombre_estudiante, campos=None):
+    """Misma forma que Calificacion.to_dict() a partir de una fila de columnas."""
+    if campos is not None:
+        fila = FilaParcial(fila)
+    valor = float(fila.calificacion) if fila.calificacion is not None else None
+    datos = {
+        "id": fila.id,
+        "estudiante": nombre_estudiante,
+        "materia": fila.materia,
+        "calificacion": valor,
+        "aprobado": valor >= CALIFICACION_APROBATORIA if valor is not None else None,
+        "periodo": fila.periodo
+    }
+    return datos if campos is None else {c: datos[c] for c in campos}
+
+
+def armar_kardex(estudiante, filas, estadisticas, ranking=None, campos=None):
+    """Respuesta de kardex a partir de filas, estadísticas y ranking ya consultados."""
+    if not filas:
+        return {
+            "estudiante": estudiante.to_dict(),
+            "mensaje": "Sin calificaciones registradas",
+            "calificaciones": []
+        }
+
+    nombre = f"{estudiante.nombre} {estudiante.apellido}"
+    return {
+        "estudiante": estudiante.to_dict(),
+        "estadisticas": estadisticas,
+        "ranking": ranking,
+        "calificaciones": [formatear_calificacion(f, nombre, campos) for f in filas]
+    }
+
+
+def clave_kardex(id):
+    """
+    Clave de caché del kardex de un estudiante. El ranking depende de toda su
+    cohorte, así que la clave lleva las generaciones del promedio general y de
+    estudiantes: cualquier calificación nueva o cambio de estudiante la renueva.
+    """
+    return (f"kardex:{id}:{cache.generacion('periodo:' + ResumenAcademico.TOTAL)}:"
+            f"{cache.generacion('estudiantes')}")
+
+
+def construir_kardex(estudiante, campos=None):
+    """Kardex completo de un estudiante con un número fijo de consultas."""
+    filas = db.session.execute(
+        consulta_calificaciones(campos).where(Calificacion.estudiante_id == estudiante.id)
+    ).all()
+    if not filas:
+        return armar_kardex(estudiante, filas, None)
+    ranking = ranking_de_cohorte(estudiante.carrera, estudiante.semestre).get(estudiante.id)
+    return armar_kardex(estudiante, filas, obtener_estadisticas(estudiante.id), ranking, campos)
+
+
+def kardex_en_lote(filtros, tamano_lote=200, campos=None):
+    """
+    Genera kardex de los estudiantes que cumplen 'filtros' recorriéndolos por bloques de id.
+    Cada bloque cuesta un número fijo de consultas agrupadas sin importar cuántos
+    estudiantes o calificaciones contenga, y solo un bloque vive en memoria a la vez.
+    La consulta se arma aquí, dentro del generador, para usar la sesión del
+    contexto en el que realmente se transmite la respuesta.
+    """
+    ultimo_id = 0
+    while True:
+        estudiantes = (Estudiante.query
+                       .filter(*filtros, Estudiante.id > ultimo_id)
+                       .order_by(Estudiante.id)
+                       .limit(tamano_lote)
+                       .all())
+        if not estudiantes:
+            return
+
+        ids = [e.id for e in estudiantes]
+        filas_por_estudiante = defaultdict(list)
+        calificaciones = consulta_calificaciones(campos).where(Calificacion.estudiante_id.in_(ids))
+        for fila in db.session.execute(calificaciones):
+            filas_por_estudiante[fila.estudiante_id].append(fila)
+
+        con_calificaciones = filas_por_estudiante.keys()
+        estadisticas = estadisticas_por_estudiante(con_calificaciones) if con_calificaciones else {}
+        rankings = ranking_por_estudiante(con_calificaciones) if con_calificaciones else {}
+
+        for estudiante in estudiantes:
+            yield armar_kardex(estudiante, filas_por_estudiante.get(estudiante.id, []),
+                               estadisticas.get(estudiante.id), rankings.get(estudiante.id), campos)
+
+        ultimo_id = ids[-1]
+        for estudiante in estudiantes:
+            db.session.expunge(estudiante)
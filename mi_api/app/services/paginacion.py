@@ -0,0 +1,64 @@
+# app/services/paginacion.py
+import base64
+import json
+from sqlalchemy import and_, or_
+from app import db
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no se puede decodificar o no corresponde al orden pedido."""
+
+
+def codificar_cursor(orden, clave):
+    """Cursor opaco (base64 URL-safe) con el orden y la última clave vista."""
+    crudo = json.dumps({"o": orden, "k": clave}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def _valor_valido(valor, columna):
+    tipo = columna.type.python_type
+    # bool es subclase de int, pero True no es un id
+    return isinstance(valor, tipo) and not (isinstance(valor, bool) and tipo is not bool)
+
+
+def decodificar_cursor(cursor, orden, columnas):
+    """
+    Devuelve la clave guardada en el cursor, o None si el cursor viene vacío.
+    La clave debe ser una lista con un valor por columna, del tipo de cada una.
+    """
+    if not cursor:
+        return None
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        clave = datos["k"]
+    except (ValueError, KeyError, TypeError):
+        raise CursorInvalido("Cursor inválido")
+    if datos.get("o") != orden:
+        raise CursorInvalido("El cursor no corresponde al orden solicitado")
+    if (not isinstance(clave, list) or len(clave) != len(columnas)
+            or not all(_valor_valido(v, c) for v, c in zip(clave, columnas))):
+        raise CursorInvalido("Cursor inválido")
+    return clave
+
+
+def paginar_por_clave(consulta, columnas, clave, limite):
+    """
+    Paginación keyset sobre un SELECT: filtra las filas posteriores a 'clave'
+    según 'columnas' (la última debe ser única, p. ej. el id) sin COUNT ni OFFSET.
+    Devuelve (filas, clave_siguiente); clave_siguiente es None en la última página.
+    """
+    if clave is not None:
+        condiciones = []
+        for i, columna in enumerate(columnas):
+            iguales = [c == v for c, v in zip(columnas[:i], clave[:i])]
+            condiciones.append(and_(*iguales, columna > clave[i]))
+        consulta = consulta.where(or_(*condiciones))
+
+    filas = db.session.execute(consulta.order_by(*columnas).limit(limite + 1)).all()
+    if len(filas) <= limite:
+        return filas, None
+
+    filas = filas[:limite]
+    ultima = filas[-1]
+    return filas, [getattr(ultima, c.key) for c in columnas]
@@ -0,0 +1,170 @@
+# app/services/ranking.py
+import sqlite3
+from itertools import groupby
+from sqlalchemy import Float, cast, func, tuple_
+from app import cache, db
+from app.models.estudiante import Estudiante
+from app.models.resumen import ResumenAcademico
+
+PROMEDIO = (cast(ResumenAcademico.suma, Float) / ResumenAcademico.total).label("promedio")
+COHORTE = (Estudiante.carrera, Estudiante.semestre)
+
+
+def soporta_ventanas(dialecto=None):
+    """RANK/PERCENT_RANK existen en PostgreSQL y en SQLite desde la versión 3.25."""
+    dialecto = dialecto or db.session.get_bind().dialect.name
+    if dialecto == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 25)
+    return True
+
+
+def _base(condiciones, periodo):
+    return (
+        db.select(Estudiante.id, Estudiante.matricula, Estudiante.nombre, Estudiante.apellido,
+                  Estudiante.carrera, Estudiante.semestre, ResumenAcademico.total, PROMEDIO)
+        .join(ResumenAcademico, ResumenAcademico.estudiante_id == Estudiante.id)
+        .where(Estudiante.activo.is_(True), ResumenAcademico.periodo == periodo,
+               ResumenAcademico.total > 0, *condiciones)
+    )
+
+
+def _con_ventanas(condiciones, periodo):
+    """Subconsulta con posición (RANK desc) y percentil (PERCENT_RANK asc) por cohorte."""
+    return _base(condiciones, periodo).add_columns(
+        func.rank().over(partition_by=COHORTE, order_by=PROMEDIO.desc()).label("posicion"),
+        func.percent_rank().over(partition_by=COHORTE, order_by=PROMEDIO.asc()).label("percentil"),
+        func.count().over(partition_by=COHORTE).label("tamano_cohorte"),
+    ).subquery()
+
+
+def _ranking_en_python(filas):
+    """
+    Respaldo sin funciones de ventana; mismas reglas de empates que RANK/PERCENT_RANK.
+    Un solo ordenamiento: dentro de la cohorte, cada grupo de promedios iguales
+    empieza en su posición y deja detrás a los que tienen menos.
+    """
+    resultado = []
+    filas = sorted(filas, key=lambda f: (f.carrera, f.semestre, -f.promedio, f.id))
+    for _, cohorte in groupby(filas, key=lambda f: (f.carrera, f.semestre)):
+        cohorte = list(cohorte)
+        n = len(cohorte)
+        inicio = 0
+        for _, empatados in groupby(cohorte, key=lambda f: f.promedio):
+            empatados = list(empatados)
+            menores = n - inicio - len(empatados)
+            for f in empatados:
+                resultado.append({**f._asdict(), "posicion": inicio + 1,
+                                  "percentil": menores / (n - 1) if n > 1 else 0.0,
+                                  "tamano_cohorte": n})
+            inicio += len(empatados)
+    return resultado
+
+
+def _formatear(fila):
+    return {
+        "posicion": fila["posicion"],
+        "percentil": round(float(fila["percentil"]), 4),
+        "tamano_cohorte": fila["tamano_cohorte"],
+        "estudiante_id": fila["id"],
+        "matricula": fila["matricula"],
+        "nombre_completo": f"{fila['nombre']} {fila['apellido']}",
+        "carrera": fila["carrera"],
+        "semestre": fila["semestre"],
+        "promedio": round(float(fila["promedio"]), 2),
+        "total_materias": fila["total"],
+    }
+
+
+def calcular_ranking(carrera=None, semestre=None, periodo=ResumenAcademico.TOTAL, pagina=1, por_pagina=20):
+    """Ranking por cohorte (carrera, semestre) paginado; devuelve (filas, total)."""
+    condiciones = []
+    if carrera:
+        condiciones.append(Estudiante.carrera == carrera)
+    if semestre:
+        condiciones.append(Estudiante.semestre == semestre)
+
+    if not soporta_ventanas():
+        filas = _ranking_en_python(db.session.execute(_base(condiciones, periodo)).all())
+        filas.sort(key=lambda f: (f["carrera"], f["semestre"], f["posicion"], f["id"]))
+        inicio = (pagina - 1) * por_pagina
+        return [_formatear(f) for f in filas[inicio:inicio + por_pagina]], len(filas)
+
+    ranking = _con_ventanas(condiciones, periodo)
+    consulta = (db.select(ranking, func.count().over().label("total_filas"))
+                .order_by(ranking.c.carrera, ranking.c.semestre, ranking.c.posicion, ranking.c.id)
+                .limit(por_pagina).offset((pagina - 1) * por_pagina))
+    filas = [f._asdict() for f in db.session.execute(consulta)]
+    if filas:
+        total = filas[0]["total_filas"]
+    else:
+        total = db.session.scalar(db.select(func.count()).select_from(ranking))
+    return [_formatear(f) for f in filas], total
+
+
+def ranking_con_cache(carrera, semestre, periodo, pagina, por_pagina, ttl=None):
+    """
+    Cachea el ranking por (carrera, semestre, periodo, página). La clave incluye
+    la generación del periodo y la de estudiantes, así que registrar una
+    calificación en ese periodo o modificar estudiantes la invalida.
+    """
+    clave = (f"ranking:{_claves_generacion(periodo)}:"
+             f"{carrera or ''}:{semestre or ''}:{periodo}:{pagina}:{por_pagina}")
+    resultado = cache.obtener(clave)
+    if resultado is None:
+        resultado = calcular_ranking(carrera, semestre, periodo, pagina, por_pagina)
+        cache.guardar(clave, resultado, ttl)
+    return resultado
+
+
+def _claves_generacion(periodo):
+    return f"{cache.generacion('periodo:' + periodo)}:{cache.generacion('estudiantes')}"
+
+
+def ranking_de_cohorte(carrera, semestre, periodo=ResumenAcademico.TOTAL, ttl=None):
+    """
+    {id: ranking} de toda una cohorte, cacheado con las mismas generaciones que
+    ranking_con_cache(): la consulta con ventanas corre una vez por cohorte y
+    no una vez por kardex.
+    """
+    clave = f"ranking_cohorte:{_claves_generacion(periodo)}:{carrera}:{semestre}:{periodo}"
+    resultado = cache.obtener(clave)
+    if resultado is None:
+        condiciones = [Estudiante.carrera == carrera, Estudiante.semestre == semestre]
+        ventanas = soporta_ventanas()
+        if ventanas:
+            filas = db.session.execute(db.select(_con_ventanas(condiciones, periodo))).all()
+        else:
+            filas = db.session.execute(_base(condiciones, periodo)).all()
+        resultado = ranking_desde_filas(filas, None, ventanas)
+        cache.guardar(clave, resultado, ttl)
+    return resultado
+
+
+def consulta_ranking_estudiantes(ids, ventanas=True, periodo=ResumenAcademico.TOTAL):
+    """SELECT con las cohortes de 'ids'; con ventanas ya trae posición y percentil."""
+    cohortes = db.select(*COHORTE).where(Estudiante.id.in_(ids))
+    condiciones = [tuple_(*COHORTE).in_(cohortes)]
+    if not ventanas:
+        return _base(condiciones, periodo)
+    ranking = _con_ventanas(condiciones, periodo)
+    return db.select(ranking).where(ranking.c.id.in_(ids))
+
+
+def ranking_desde_filas(filas, ids, ventanas=True):
+    """Convierte el resultado de consulta_ranking_estudiantes() en {id: ranking} (ids=None: todos)."""
+    filas = [f._asdict() for f in filas] if ventanas else _ranking_en_python(filas)
+    return {
+        f["id"]: {"posicion": f["posicion"], "de": f["tamano_cohorte"],
+                  "percentil": round(float(f["percentil"]), 4)}
+        for f in filas if ids is None or f["id"] in ids
+    }
+
+
+def ranking_por_estudiante(ids, periodo=ResumenAcademico.TOTAL):
+    """Posición y percentil de cada estudiante dentro de su cohorte, en una consulta."""
+    ids = set(ids)
+    if not ids:
+        return {}
+    ventanas = soporta_ventanas()
+    filas = db.session.execute(consulta_ranking_estudiantes(ids, ventanas, periodo)).all()
+    return ranking_desde_filas(filas, ids, ventanas)
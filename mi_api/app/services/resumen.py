@@ -0,0 +1,102 @@
+# app/services/resumen.py
+from sqlalchemy import case, delete, func, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.calificacion import Calificacion
+from app.models.resumen import ResumenAcademico
+from app.services.kardex import CALIFICACION_APROBATORIA
+
+INSERTS_CON_CONFLICTO = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _deltas(calificaciones):
+    """Agrupa calificaciones nuevas en incrementos por (estudiante, periodo) y total."""
+    deltas = {}
+    for c in calificaciones:
+        valor = float(c["calificacion"])
+        for periodo in (c.get("periodo") or "", ResumenAcademico.TOTAL):
+            clave = (c["estudiante_id"], periodo)
+            d = deltas.get(clave)
+            if d is None:
+                d = deltas[clave] = {
+                    "estudiante_id": clave[0], "periodo": periodo, "total": 0,
+                    "suma": 0.0, "maxima": valor, "minima": valor, "aprobadas": 0
+                }
+            d["total"] += 1
+            d["suma"] += valor
+            d["maxima"] = max(d["maxima"], valor)
+            d["minima"] = min(d["minima"], valor)
+            d["aprobadas"] += valor >= CALIFICACION_APROBATORIA
+    return list(deltas.values())
+
+
+def _acumular_sin_upsert(deltas):
+    """Ruta genérica para motores sin INSERT ... ON CONFLICT."""
+    for d in deltas:
+        resumen = ResumenAcademico.query.filter_by(
+            estudiante_id=d["estudiante_id"], periodo=d["periodo"]
+        ).with_for_update().first()
+        if resumen is None:
+            db.session.add(ResumenAcademico(**d))
+            continue
+        resumen.total += d["total"]
+        resumen.suma = float(resumen.suma) + d["suma"]
+        resumen.maxima = max(float(resumen.maxima), d["maxima"])
+        resumen.minima = min(float(resumen.minima), d["minima"])
+        resumen.aprobadas += d["aprobadas"]
+
+
+def acumular(calificaciones):
+    """
+    Suma calificaciones recién insertadas al resumen dentro de la transacción
+    actual (no hace commit). 'calificaciones' son dicts con estudiante_id,
+    calificacion y periodo.
+    """
+    deltas = _deltas(calificaciones)
+    if not deltas:
+        return
+
+    insertar = INSERTS_CON_CONFLICTO.get(db.session.get_bind().dialect.name)
+    if insertar is None:
+        _acumular_sin_upsert(deltas)
+        return
+
+    tabla = ResumenAcademico.__table__
+    stmt = insertar(tabla)
+    nuevo = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tabla.c.estudiante_id, tabla.c.periodo],
+        set_={
+            "total": tabla.c.total + nuevo.total,
+            "suma": tabla.c.suma + nuevo.suma,
+            "maxima": case((nuevo.maxima > tabla.c.maxima, nuevo.maxima), else_=tabla.c.maxima),
+            "minima": case((nuevo.minima < tabla.c.minima, nuevo.minima), else_=tabla.c.minima),
+            "aprobadas": tabla.c.aprobadas + nuevo.aprobadas,
+        }
+    )
+    db.session.execute(stmt, deltas)
+
+
+def reconstruir():
+    """Recalcula todo el resumen desde calificaciones (backfill). Devuelve filas escritas."""
+    aprobadas = func.sum(case((Calificacion.calificacion >= CALIFICACION_APROBATORIA, 1), else_=0))
+    columnas = ["estudiante_id", "periodo", "total", "suma", "maxima", "minima", "aprobadas"]
+
+    por_periodo = db.select(
+        Calificacion.estudiante_id, func.coalesce(Calificacion.periodo, ""),
+        func.count(Calificacion.id), func.sum(Calificacion.calificacion),
+        func.max(Calificacion.calificacion), func.min(Calificacion.calificacion), aprobadas
+    ).group_by(Calificacion.estudiante_id, func.coalesce(Calificacion.periodo, ""))
+
+    general = db.select(
+        Calificacion.estudiante_id, literal(ResumenAcademico.TOTAL),
+        func.count(Calificacion.id), func.sum(Calificacion.calificacion),
+        func.max(Calificacion.calificacion), func.min(Calificacion.calificacion), aprobadas
+    ).group_by(Calificacion.estudiante_id)
+
+    tabla = ResumenAcademico.__table__
+    db.session.execute(delete(tabla))
+    db.session.execute(tabla.insert().from_select(columnas, por_periodo))
+    db.session.execute(tabla.insert().from_select(columnas, general))
+    db.session.commit()
+    return db.session.query(func.count(ResumenAcademico.id)).scalar()
@@ -0,0 +1,97 @@
+# app/services/serializacion.py
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import func
+from app import db
+from app.models.estudiante import Estudiante
+from app.models.materia import Materia
+
+# Campo público -> columnas que necesita. Los campos calculados (nombre_completo)
+# dependen de varias columnas; el resto mapea 1:1 con el modelo.
+CAMPOS_ESTUDIANTE = {
+    "id": ("id",),
+    "matricula": ("matricula",),
+    "nombre": ("nombre",),
+    "apellido": ("apellido",),
+    "nombre_completo": ("nombre", "apellido"),
+    "email": ("email",),
+    "carrera": ("carrera",),
+    "semestre": ("semestre",),
+    "fecha_registro": ("fecha_registro",),
+    "activo": ("activo",),
+}
+CAMPOS_MATERIA = {c: (c,) for c in ("id", "clave", "nombre", "creditos", "docente")}
+
+
+class CamposInvalidos(ValueError):
+    def __init__(self, invalidos, disponibles):
+        super().__init__(f"Campos no válidos: {', '.join(invalidos) or '(vacío)'}")
+        self.disponibles = sorted(disponibles)
+
+
+def leer_campos(valor, disponibles):
+    """Parsea '?campos=a,b'; None si no se pidió. Lanza CamposInvalidos."""
+    if valor is None:
+        return None
+    campos = list(dict.fromkeys(c.strip() for c in valor.split(",") if c.strip()))
+    invalidos = [c for c in campos if c not in disponibles]
+    if invalidos or not campos:
+        raise CamposInvalidos(invalidos, disponibles)
+    return campos
+
+
+def columnas_de(modelo, mapa, campos=None, extra=()):
+    """Columnas del modelo necesarias para 'campos' (todas si es None) más 'extra'."""
+    nombres = dict.fromkeys(n for c in (campos or mapa) for n in mapa[c])
+    nombres.update(dict.fromkeys(extra))
+    return [getattr(modelo, n) for n in nombres]
+
+
+class FilaParcial:
+    """Expone una fila con solo algunas columnas; las ausentes se leen como None."""
+    __slots__ = ("_valores",)
+
+    def __init__(self, fila):
+        self._valores = fila._mapping
+
+    def __getattr__(self, nombre):
+        return self._valores.get(nombre)
+
+
+def serializar(serializador, filas, campos=None):
+    """Aplica el serializador del modelo a filas de columnas, recortando a 'campos'."""
+    if campos is None:
+        return [serializador(f) for f in filas]
+    return [{c: d[c] for c in campos} for d in (serializador(FilaParcial(f)) for f in filas)]
+
+
+class PaginacionFilas(Pagination):
+    """Misma semántica que query.paginate(), pero sobre un SELECT de columnas."""
+
+    def _query_items(self):
+        consulta = self._query_args["select"]
+        return db.session.execute(consulta.limit(self.per_page).offset(self._query_offset)).all()
+
+    def _query_count(self):
+        return contar(self._query_args["select"])
+
+
+def contar(consulta):
+    """COUNT(*) de un SELECT sin su ORDER BY."""
+    return db.session.scalar(db.select(func.count()).select_from(consulta.order_by(None).subquery()))
+
+
+def estudiantes_como_filas(*condiciones, campos=None, extra=()):
+    """SELECT de solo las columnas de estudiante que hacen falta (sin objetos ORM)."""
+    return db.select(*columnas_de(Estudiante, CAMPOS_ESTUDIANTE, campos, extra)).where(*condiciones)
+
+
+def materias_como_filas(campos=None):
+    return db.select(*columnas_de(Materia, CAMPOS_MATERIA, campos))
+
+
+def serializar_estudiantes(filas, campos=None):
+    return serializar(Estudiante.serializar, filas, campos)
+
+
+def serializar_materias(filas, campos=None):
+    return serializar(Materia.serializar, filas, campos)
@@ -0,0 +1,4 @@
+# asgi.py - Modo asíncrono opcional: uvicorn asgi:app
+from app.asincrono import crear_app_asincrona
+
+app = crear_app_asincrona()
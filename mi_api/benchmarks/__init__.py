@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Suite de rendimiento: `python -m benchmarks.ejecutar --help` desde mi_api/
@@ -0,0 +1,74 @@
+# benchmarks/autorizacion.py
+"""
+Costo de la autorización por petición: /api/auth/perfil con y sin la caché de
+usuarios, y una escritura protegida con AUTH_REQUERIDA apagado y encendido.
+
+    python -m benchmarks.autorizacion --peticiones 2000
+
+Las consultas por petición salen de X-Consultas-SQL: con la caché caliente y
+los roles leídos del token, las rutas protegidas no agregan ninguna.
+"""
+import argparse
+import json
+import random
+import sys
+
+from app import create_app, db
+from app.config import TestingConfig
+from benchmarks.datos import PASSWORD_BENCH, USUARIO_BENCH, sembrar
+from benchmarks.ejecutar import _medir
+
+VARIANTES = {
+    "perfil_sin_cache": {"AUTH_USUARIOS_TTL": 0},
+    "perfil_con_cache": {},
+    "calificacion_abierta": {},
+    "calificacion_con_rol": {"AUTH_REQUERIDA": True},
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Costo de autorización por petición")
+    parser.add_argument("--db", default="sqlite:///bench.db",
+                        help="URI de la base desechable (se BORRAN sus tablas)")
+    parser.add_argument("--estudiantes", type=int, default=1000)
+    parser.add_argument("--peticiones", type=int, default=1000)
+    parser.add_argument("--hilos", type=int, default=1)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    resultados = {}
+    sembrada = False
+    for nombre, opciones in VARIANTES.items():
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = args.db
+            CACHE_HABILITADO = False
+        for clave, valor in opciones.items():
+            setattr(BenchConfig, clave, valor)
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            if not sembrada:
+                sembrar(args.estudiantes, materias=10, calificaciones_por_estudiante=1, semilla=args.semilla)
+                sembrada = True
+            token = app.test_client().post(
+                "/api/auth/login", json={"username": USUARIO_BENCH, "password": PASSWORD_BENCH}
+            ).get_json()["token"]
+            db.session.remove()
+
+        cabeceras = {"Authorization": f"Bearer {token}"}
+        rnd = random.Random(args.semilla)
+        if nombre.startswith("perfil"):
+            escenario = ("GET", lambda: "/api/auth/perfil", None)
+        else:
+            escenario = ("POST", lambda: "/api/calificaciones/",
+                         lambda: {"estudiante_id": rnd.randint(1, args.estudiantes),
+                                  "materia_id": rnd.randint(1, 10), "calificacion": 90, "periodo": "2025-1"})
+        resultados[nombre] = _medir(app, *escenario, cabeceras, args.peticiones, args.hilos)
+        print(f"{nombre:22} {resultados[nombre]}", file=sys.stderr)
+
+    print(json.dumps({"peticiones": args.peticiones, "hilos": args.hilos, "resultados": resultados},
+                     indent=2, ensure_ascii=False, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
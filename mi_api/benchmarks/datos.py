@@ -0,0 +1,68 @@
+# benchmarks/datos.py
+import random
+from datetime import datetime
+from sqlalchemy import insert
+from app import db
+from app.migraciones import actualizar, version_esquema
+from app.models import Calificacion, Estudiante, Materia, Usuario
+from app.services.importacion import en_bloques
+from app.services.resumen import reconstruir
+
+CARRERAS = ["ITIC", "ISC", "IGE", "IIND", "IMEC"]
+PERIODOS = ["2023-1", "2023-2", "2024-1", "2024-2"]
+NOMBRES = ["Ana", "Luis", "María", "José", "Sofía", "Diego", "Valeria", "Jorge", "Camila", "Andrés"]
+APELLIDOS = ["García", "López", "Martínez", "Hernández", "Pérez", "Sánchez", "Ramírez", "Torres"]
+
+USUARIO_BENCH = "bench"
+PASSWORD_BENCH = "Bench12345"
+
+
+def sembrar(estudiantes=10000, materias=50, calificaciones_por_estudiante=20,
+            semilla=42, lote=5000):
+    """
+    Crea las tablas y llena la base con datos sintéticos reproducibles.
+    Devuelve un dict con los volúmenes insertados.
+    """
+    rnd = random.Random(semilla)
+    db.drop_all()
+    version_esquema.drop(db.engine, checkfirst=True)
+    actualizar()
+
+    db.session.execute(insert(Materia), [
+        {"clave": f"MAT{i:03d}", "nombre": f"Materia {i}", "creditos": rnd.randint(3, 8),
+         "docente": f"Docente {i % 20}"}
+        for i in range(1, materias + 1)
+    ])
+
+    ahora = datetime.utcnow()
+    filas_estudiantes = (
+        {"matricula": f"B{i:08d}", "nombre": rnd.choice(NOMBRES), "apellido": rnd.choice(APELLIDOS),
+         "email": f"est{i}@bench.edu.mx", "carrera": rnd.choice(CARRERAS),
+         "semestre": rnd.randint(1, 9), "fecha_registro": ahora, "activo": rnd.random() > 0.05}
+        for i in range(1, estudiantes + 1)
+    )
+    for bloque in en_bloques(filas_estudiantes, lote):
+        db.session.execute(insert(Estudiante), bloque)
+
+    filas_calificaciones = (
+        {"estudiante_id": e, "materia_id": rnd.randint(1, materias),
+         "calificacion": round(rnd.triangular(30, 100, 80), 2),
+         "periodo": rnd.choice(PERIODOS), "fecha_evaluacion": ahora.date()}
+        for e in range(1, estudiantes + 1)
+        for _ in range(calificaciones_por_estudiante)
+    )
+    for bloque in en_bloques(filas_calificaciones, lote):
+        db.session.execute(insert(Calificacion), bloque)
+
+    usuario = Usuario(username=USUARIO_BENCH, email="bench@bench.edu.mx", rol="admin")
+    usuario.set_password(PASSWORD_BENCH)
+    db.session.add(usuario)
+    db.session.commit()
+    reconstruir()
+
+    return {
+        "estudiantes": estudiantes,
+        "materias": materias,
+        "calificaciones": estudiantes * calificaciones_por_estudiante,
+        "semilla": semilla,
+    }
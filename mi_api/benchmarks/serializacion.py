@@ -0,0 +1,65 @@
+# benchmarks/serializacion.py
+"""
+Costo por fila de listar estudiantes: objetos ORM + to_dict() contra filas de
+columnas + Estudiante.serializar(), y codificación con cada proveedor JSON.
+
+    python -m benchmarks.serializacion --filas 100 --repeticiones 200
+"""
+import argparse
+import json
+import sys
+import time
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app, db
+from app.config import TestingConfig
+from app.models import Estudiante
+from app.proveedor_json import ProveedorOrjson, orjson
+from app.services.serializacion import estudiantes_como_filas, serializar_estudiantes
+from benchmarks.datos import sembrar
+
+
+def _por_fila_us(funcion, filas, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return round((time.perf_counter() - inicio) / (repeticiones * filas) * 1e6, 3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Costo de serialización por fila")
+    parser.add_argument("--filas", type=int, default=100, help="Filas por página")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    app = create_app(TestingConfig)
+    with app.app_context():
+        sembrar(estudiantes=args.filas, materias=1, calificaciones_por_estudiante=0)
+
+        def orm():
+            db.session.expunge_all()
+            return [e.to_dict() for e in Estudiante.query.limit(args.filas).all()]
+
+        def columnas():
+            return serializar_estudiantes(db.session.execute(estudiantes_como_filas().limit(args.filas)).all())
+
+        datos = columnas()
+        resultados = {
+            "orm_to_dict_us": _por_fila_us(orm, args.filas, args.repeticiones),
+            "columnas_serializar_us": _por_fila_us(columnas, args.filas, args.repeticiones),
+            "json_estandar_us": _por_fila_us(lambda: DefaultJSONProvider(app).dumps(datos),
+                                             args.filas, args.repeticiones),
+        }
+        if orjson is not None:
+            resultados["json_orjson_us"] = _por_fila_us(lambda: ProveedorOrjson(app).dumps(datos),
+                                                        args.filas, args.repeticiones)
+        else:
+            print("orjson no está instalado; se omite", file=sys.stderr)
+
+    print(json.dumps({"filas": args.filas, "repeticiones": args.repeticiones,
+                      "microsegundos_por_fila": resultados}, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,14 @@
 # run.py - Ejecutar con: python run.py
-from app import create_app, db
+from app import create_app
+from app.migraciones import actualizar
 
 app = create_app()
 
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()  # Crea todas las tablas automáticamente si no existen
-        print("✅ Tablas creadas correctamente")
+        aplicadas = actualizar()  # Crea o pone al día las tablas (ver app/migraciones.py)
+        print(f"✅ Esquema al día ({len(aplicadas)} migraciones aplicadas)")
 
     print("🚀 Servidor iniciado en http://localhost:5000")
     print("📖 Documentación Swagger en http://localhost:5000/docs/")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000, debug=app.config.get("DEBUG", False))
@@ -0,0 +1,85 @@
+# tests/conftest.py
+import pytest
+from sqlalchemy import event, insert
+from app import create_app, db
+from app.config import TestingConfig
+from app.migraciones import actualizar
+from app.models import Calificacion, Estudiante, Materia
+from app.services.resumen import reconstruir
+
+
+class PruebasConfig(TestingConfig):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    JWT_SECRET_KEY = "clave-de-pruebas-con-al-menos-32-bytes"
+    # Sin caché de respuestas: cada petición debe llegar a la base
+    CACHE_HABILITADO = False
+
+
+@pytest.fixture
+def app():
+    app = create_app(PruebasConfig)
+    with app.app_context():
+        actualizar()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+
+class ContadorConsultas:
+    """Cuenta las sentencias que llegan a la base mientras está activo."""
+
+    def __init__(self, motor):
+        self.motor = motor
+        self.total = 0
+
+    def _contar(self, *args):
+        self.total += 1
+
+    def __enter__(self):
+        event.listen(self.motor, "before_cursor_execute", self._contar)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.motor, "before_cursor_execute", self._contar)
+
+
+@pytest.fixture
+def contar_consultas(app):
+    return lambda: ContadorConsultas(db.engine)
+
+
+def _sembrar(calificaciones_por_estudiante, materias=5, carrera="ITIC", semestre=1, activo=True):
+    """
+    Un estudiante por elemento de 'calificaciones_por_estudiante' con ese número
+    de calificaciones; deja el resumen académico al día. Devuelve sus ids.
+    """
+    if not db.session.scalar(db.select(Materia.id).limit(1)):
+        db.session.execute(insert(Materia), [
+            {"clave": f"MAT{i:03d}", "nombre": f"Materia {i}", "creditos": 5} for i in range(1, materias + 1)
+        ])
+    desde = db.session.scalar(db.select(db.func.count(Estudiante.id)))
+    ids = []
+    for n, total in enumerate(calificaciones_por_estudiante, start=desde + 1):
+        estudiante = Estudiante(matricula=f"T{n:07d}", nombre=f"Nombre{n}", apellido="Prueba",
+                                email=f"est{n}@prueba.mx", carrera=carrera, semestre=semestre, activo=activo)
+        db.session.add(estudiante)
+        db.session.flush()
+        ids.append(estudiante.id)
+        db.session.add_all(
+            Calificacion(estudiante_id=estudiante.id, materia_id=j % materias + 1, calificacion=50 + j % 50,
+                         periodo="2024-1" if j % 2 else "2024-2")
+            for j in range(total)
+        )
+    db.session.commit()
+    reconstruir()
+    return ids
+
+
+@pytest.fixture
+def sembrar(app):
+    return _sembrar
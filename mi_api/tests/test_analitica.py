@@ -0,0 +1,64 @@
+# tests/test_analitica.py
+from sqlalchemy import event
+from app import db
+
+
+def _grupos(cliente, consulta):
+    respuesta = cliente.get(f"/api/analitica/calificaciones?{consulta}")
+    assert respuesta.status_code == 200
+    return respuesta.get_json()["grupos"]
+
+
+def test_estadisticas_por_periodo(cliente, sembrar):
+    # Calificaciones 50..69: las pares en 2024-2 y las impares (51, 53 ... 69) en 2024-1
+    sembrar([20])
+
+    grupo, = _grupos(cliente, "agrupar=periodo&periodo=2024-1")
+
+    assert grupo["periodo"] == "2024-1"
+    assert (grupo["total"], grupo["promedio"], grupo["minima"], grupo["maxima"]) == (10, 60.0, 51.0, 69.0)
+    assert grupo["desviacion_estandar"] == 6.06
+    assert grupo["tasa_aprobacion"] == 0.5
+    assert (grupo["histograma"]["50-60"], grupo["histograma"]["60-70"]) == (5, 5)
+    assert sum(grupo["histograma"].values()) == 10
+    assert grupo["percentiles"] == {"p25": 55.5, "p50": 60.0, "p75": 64.5, "p90": 67.2}
+
+
+def test_agrupa_por_carrera_y_materia(cliente, sembrar):
+    sembrar([5], carrera="ITIC")
+    sembrar([5], carrera="IGE")
+
+    por_carrera = _grupos(cliente, "agrupar=carrera")
+    assert [(g["carrera"], g["total"]) for g in por_carrera] == [("IGE", 5), ("ITIC", 5)]
+    por_materia = _grupos(cliente, "agrupar=materia&carrera=IGE")
+    assert [(g["nombre"], g["total"]) for g in por_materia] == [(f"Materia {i}", 1) for i in range(1, 6)]
+
+
+def test_sin_filtro_de_carrera_no_une_estudiantes(app, cliente, sembrar):
+    sembrar([4])
+    sentencias = []
+    escuchar = lambda conexion, cursor, sentencia, *args: sentencias.append(sentencia)
+    event.listen(db.engine, "before_cursor_execute", escuchar)
+    try:
+        _grupos(cliente, "agrupar=materia,periodo")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", escuchar)
+
+    assert sentencias
+    assert not any("JOIN estudiantes" in s for s in sentencias)
+
+
+def test_agrupacion_invalida_es_400(cliente):
+    assert cliente.get("/api/analitica/calificaciones?agrupar=semestre").status_code == 400
+
+
+def test_cambiar_la_carrera_renueva_el_resultado_en_cache(app, cliente, sembrar):
+    app.config["CACHE_HABILITADO"] = True
+    id, _ = sembrar([4, 4], carrera="ITIC")
+    consulta = "agrupar=carrera&periodo=2024-1"
+    assert [(g["carrera"], g["total"]) for g in _grupos(cliente, consulta)] == [("ITIC", 4)]
+
+    assert cliente.put(f"/api/estudiantes/{id}", json={"carrera": "IGE"}).status_code == 200
+
+    assert [(g["carrera"], g["total"]) for g in _grupos(cliente, consulta)] == [("IGE", 2), ("ITIC", 2)]
+    assert [g["total"] for g in _grupos(cliente, consulta + "&carrera=ITIC")] == [2]
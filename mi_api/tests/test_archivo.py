@@ -0,0 +1,69 @@
+# tests/test_archivo.py
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app import db
+from app.models import Calificacion, Estudiante
+from app.models.archivo import CalificacionArchivada, EstudianteArchivado
+from app.services.archivo import archivar_inactivos
+
+
+def _fechar(id, registro_dias, baja_dias):
+    ahora = datetime.utcnow()
+    db.session.execute(update(Estudiante).where(Estudiante.id == id).values(
+        fecha_registro=ahora - timedelta(days=registro_dias), fecha_baja=ahora - timedelta(days=baja_dias)))
+    db.session.commit()
+
+
+def test_archiva_solo_a_los_inactivos_desde_hace_mas_de_n_dias(app, sembrar):
+    activo, = sembrar([3])
+    antiguo, reciente = sembrar([4, 2], activo=False)
+    _fechar(antiguo, registro_dias=800, baja_dias=400)
+    # Registrado hace dos años pero dado de baja ayer: todavía no se archiva
+    _fechar(reciente, registro_dias=730, baja_dias=1)
+
+    avances = []
+    resultado = archivar_inactivos(dias=365, lote=1, al_mover=avances.append)
+
+    assert (resultado["estudiantes"], resultado["calificaciones"], resultado["lotes"]) == (1, 4, 1)
+    assert resultado["filas_por_segundo"] > 0
+    assert avances[-1]["estudiantes"] == 1
+    assert db.session.scalars(db.select(Estudiante.id).order_by(Estudiante.id)).all() == [activo, reciente]
+    assert db.session.get(EstudianteArchivado, antiguo).fecha_baja is not None
+    assert db.session.scalar(db.select(db.func.count()).select_from(CalificacionArchivada)) == 4
+    assert db.session.scalar(db.select(db.func.count()).where(Calificacion.estudiante_id == antiguo)) == 0
+
+    # Una segunda corrida no encuentra nada más
+    assert archivar_inactivos(dias=365)["estudiantes"] == 0
+
+
+def test_comando_reporta_filas_por_segundo(app, sembrar):
+    id, = sembrar([2], activo=False)
+    _fechar(id, registro_dias=30, baja_dias=30)
+
+    resultado = app.test_cli_runner().invoke(args=["archivo", "inactivos", "--dias", "7"])
+
+    assert resultado.exit_code == 0, resultado.output
+    assert "Archivados 1 estudiantes y 2 calificaciones" in resultado.output
+    assert "filas/s" in resultado.output
+
+
+def test_lectura_de_respaldo_del_estudiante_y_su_kardex(app, cliente, sembrar):
+    id, = sembrar([3], activo=False)
+    _fechar(id, registro_dias=30, baja_dias=30)
+    esperado = cliente.get(f"/api/estudiantes/{id}/kardex").get_json()
+    archivar_inactivos(dias=7)
+
+    estudiante = cliente.get(f"/api/estudiantes/{id}")
+    assert estudiante.status_code == 200
+    assert estudiante.get_json()["archivado"] is True
+    assert cliente.get(f"/api/estudiantes/{id}?campos=matricula").get_json() == {
+        "matricula": estudiante.get_json()["matricula"]}
+
+    kardex = cliente.get(f"/api/estudiantes/{id}/kardex")
+    assert kardex.status_code == 200
+    cuerpo = kardex.get_json()
+    assert cuerpo["estadisticas"] == esperado["estadisticas"]
+    assert len(cuerpo["calificaciones"]) == 3
+
+    assert cliente.get(f"/api/estudiantes/{id + 1}").status_code == 404
+    assert cliente.get(f"/api/estudiantes/{id + 1}/kardex").status_code == 404
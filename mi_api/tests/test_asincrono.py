@@ -0,0 +1,98 @@
+# tests/test_asincrono.py
+import asyncio
+import json
+import pytest
+from app import create_app, db
+from app.migraciones import actualizar
+from tests.conftest import PruebasConfig
+
+pytest.importorskip("asgiref")
+pytest.importorskip("aiosqlite")
+
+from app.asincrono import AppAsincrona  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    # Un archivo: los motores síncrono y asíncrono deben ver la misma base
+    class Config(PruebasConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'asincrono.db'}"
+
+    app = create_app(Config)
+    with app.app_context():
+        actualizar()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _pedir(asgi, ruta):
+    """Una petición GET por la interfaz ASGI; devuelve (estado, cuerpo)."""
+    camino, _, consulta = ruta.partition("?")
+    mensajes = []
+
+    async def recibir():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def enviar(mensaje):
+        mensajes.append(mensaje)
+
+    async def llamar():
+        await asgi({"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                    "scheme": "http", "path": camino, "raw_path": camino.encode(), "root_path": "",
+                    "query_string": consulta.encode(), "headers": [(b"host", b"localhost")],
+                    "server": ("localhost", 80), "client": ("127.0.0.1", 1234)}, recibir, enviar)
+        await asgi.motor.dispose()
+
+    asyncio.run(llamar())
+    cuerpo = b"".join(m.get("body", b"") for m in mensajes if m["type"] == "http.response.body")
+    es_json = (b"content-type", b"application/json") in mensajes[0]["headers"]
+    return mensajes[0]["status"], json.loads(cuerpo) if es_json else cuerpo
+
+
+@pytest.fixture
+def asgi(app):
+    asgi = AppAsincrona(app)
+    delegadas = []
+    wsgi = asgi.wsgi
+
+    async def delegar(scope, receive, send):
+        delegadas.append(scope["path"])
+        await wsgi(scope, receive, send)
+
+    asgi.wsgi = delegar
+    asgi.delegadas = delegadas
+    return asgi
+
+
+@pytest.mark.parametrize("ruta", [
+    "/api/estudiantes/",
+    "/api/estudiantes/?carrera=ITIC&pagina=2&por_pagina=2",
+    "/api/estudiantes/?campos=id,matricula",
+    "/api/estudiantes/{id}",
+    "/api/estudiantes/{id}?campos=nombre_completo",
+    "/api/estudiantes/{id}/kardex",
+    "/api/estudiantes/{id}/kardex?campos=materia,calificacion",
+    "/api/estudiantes/{vacio}/kardex",
+    "/api/materias/",
+])
+def test_misma_respuesta_que_flask_sobre_aiosqlite(app, cliente, sembrar, asgi, ruta):
+    id, _, _, vacio = sembrar([6, 3, 1, 0])
+    ruta = ruta.format(id=id, vacio=vacio)
+
+    esperado = cliente.get(ruta)
+    estado, cuerpo = _pedir(asgi, ruta)
+
+    assert (estado, cuerpo) == (esperado.status_code, esperado.get_json())
+    assert asgi.delegadas == []
+
+
+def test_campos_invalidos_y_no_encontrados(app, sembrar, asgi):
+    id, = sembrar([1])
+
+    estado, cuerpo = _pedir(asgi, f"/api/estudiantes/{id}?campos=clave")
+    assert estado == 400 and "disponibles" in cuerpo
+    # Lo que no existe o no se implementa lo responde Flask
+    assert _pedir(asgi, f"/api/estudiantes/{id + 1}")[0] == 404
+    assert _pedir(asgi, "/api/estudiantes/?cursor=")[0] == 200
+    assert asgi.delegadas == [f"/api/estudiantes/{id + 1}", "/api/estudiantes/"]
@@ -0,0 +1,123 @@
+# tests/test_autorizacion.py
+import time
+import pytest
+from app import autorizacion, db
+from app.models import Usuario
+
+ESTUDIANTE = {"matricula": "A24001", "nombre": "José", "apellido": "Pérez", "email": "jose@prueba.mx",
+              "carrera": "ITIC", "semestre": 1}
+
+
+@pytest.fixture
+def usuario(app):
+    app.config["AUTH_REQUERIDA"] = True
+
+    def crear(rol="docente", username=None):
+        usuario = Usuario(username=username or rol, email=f"{username or rol}@prueba.mx", rol=rol)
+        usuario.set_password("Prueba12345")
+        db.session.add(usuario)
+        db.session.commit()
+        return usuario
+    return crear
+
+
+def _cabecera(usuario):
+    return {"Authorization": f"Bearer {autorizacion.crear_token(usuario)}"}
+
+
+def _login(cliente, username):
+    respuesta = cliente.post("/api/auth/login", json={"username": username, "password": "Prueba12345"})
+    assert respuesta.status_code == 200
+    return {"Authorization": f"Bearer {respuesta.get_json()['token']}"}
+
+
+def test_roles_por_ruta(cliente, usuario):
+    docente, admin = _cabecera(usuario("docente")), _cabecera(usuario("admin"))
+
+    assert cliente.post("/api/estudiantes/", json=ESTUDIANTE).status_code == 401
+    assert cliente.post("/api/estudiantes/", json=ESTUDIANTE, headers=docente).status_code == 403
+    assert cliente.post("/api/estudiantes/", json=ESTUDIANTE, headers=admin).status_code == 201
+    # Las lecturas siguen abiertas
+    assert cliente.get("/api/estudiantes/").status_code == 200
+
+    materia = cliente.post("/api/materias/", json={"clave": "MAT101", "nombre": "Cálculo", "creditos": 8},
+                           headers=admin)
+    assert materia.status_code == 201
+    calificacion = {"estudiante_id": 1, "materia_id": materia.get_json()["id"], "calificacion": 90,
+                    "periodo": "2024-1"}
+    assert cliente.post("/api/calificaciones/", json=calificacion).status_code == 401
+    assert cliente.post("/api/calificaciones/", json=calificacion, headers=docente).status_code == 201
+
+
+def test_registro_de_admin_requiere_admin(cliente, usuario):
+    nuevo = {"username": "otro", "email": "otro@prueba.mx", "password": "Prueba12345", "rol": "admin"}
+
+    assert cliente.post("/api/auth/registro", json=nuevo).status_code == 403
+    assert cliente.post("/api/auth/registro", json=nuevo, headers=_cabecera(usuario("docente"))).status_code == 403
+    assert cliente.post("/api/auth/registro", json=nuevo, headers=_cabecera(usuario("admin"))).status_code == 201
+    # Un docente se puede registrar solo
+    docente = dict(nuevo, username="profe", email="profe@prueba.mx", rol="docente")
+    assert cliente.post("/api/auth/registro", json=docente).status_code == 201
+
+
+def test_logout_revoca_solo_ese_token(cliente, usuario):
+    usuario("docente")
+    sesion, otra_sesion = _login(cliente, "docente"), _login(cliente, "docente")
+    assert cliente.get("/api/auth/perfil", headers=sesion).status_code == 200
+
+    assert cliente.post("/api/auth/logout", headers=sesion).status_code == 200
+
+    assert cliente.get("/api/auth/perfil", headers=sesion).status_code == 401
+    assert cliente.post("/api/auth/logout", headers=sesion).status_code == 401
+    assert cliente.get("/api/auth/perfil", headers=otra_sesion).status_code == 200
+
+
+@pytest.mark.parametrize("cambio", [{"rol": "admin"}, {"activo": False}])
+def test_cambio_de_rol_o_baja_revoca_tokens_emitidos(cliente, usuario, cambio):
+    docente = usuario("docente")
+    antes = _cabecera(docente)
+    otro = _cabecera(usuario("docente", username="otro"))
+
+    for campo, valor in cambio.items():
+        setattr(docente, campo, valor)
+    db.session.commit()
+
+    assert cliente.get("/api/auth/perfil", headers=antes).status_code == 401
+    assert cliente.get("/api/auth/perfil", headers=otro).status_code == 200
+    if docente.activo:
+        # iat tiene resolución de segundos: el token nuevo debe ser de un segundo posterior al cambio
+        time.sleep(1.01)
+        nuevo = _login(cliente, "docente")
+        assert cliente.post("/api/estudiantes/", json=ESTUDIANTE, headers=nuevo).status_code == 201
+    else:
+        assert cliente.post("/api/auth/login", json={"username": "docente", "password": "Prueba12345"}
+                            ).status_code == 401
+
+
+def test_cambio_deshecho_no_revoca(cliente, usuario):
+    docente = usuario("docente")
+    cabecera = _cabecera(docente)
+
+    docente.rol = "admin"
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+
+    assert cliente.get("/api/auth/perfil", headers=cabecera).status_code == 200
+
+
+def test_perfil_desde_cache_e_invalidado_al_modificar(cliente, usuario, contar_consultas):
+    docente = usuario("docente")
+    cabecera = _cabecera(docente)
+    assert cliente.get("/api/auth/perfil", headers=cabecera).get_json()["email"] == "docente@prueba.mx"
+
+    with contar_consultas() as consultas:
+        assert cliente.get("/api/auth/perfil", headers=cabecera).status_code == 200
+    assert consultas.total == 0
+
+    # Otro email no revoca el token, pero el perfil no debe quedar viejo
+    docente.email = "nuevo@prueba.mx"
+    db.session.commit()
+    respuesta = cliente.get("/api/auth/perfil", headers=cabecera)
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()["email"] == "nuevo@prueba.mx"
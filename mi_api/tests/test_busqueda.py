@@ -0,0 +1,117 @@
+# tests/test_busqueda.py
+import pytest
+from app.services.busqueda import IndicePrefijos
+
+ALUMNOS = [
+    ("A24001", "José", "Pérez Núñez"),
+    ("A24002", "Josefina", "Álvarez"),
+    ("A24003", "Ana María", "Peña"),
+    ("B24001", "Pedro", "Perales"),
+    ("B24002", "Ángel", "Ibáñez"),
+]
+
+
+@pytest.fixture(params=["memoria", "sql"])
+def modo(request, app):
+    app.config["BUSQUEDA_INDICE"] = request.param
+    return request.param
+
+
+def _crear(cliente, matricula, nombre, apellido):
+    respuesta = cliente.post("/api/estudiantes/", json={
+        "matricula": matricula, "nombre": nombre, "apellido": apellido,
+        "email": f"{matricula.lower()}@prueba.mx", "carrera": "ITIC"})
+    assert respuesta.status_code == 201
+    return respuesta.get_json()["estudiante"]["id"]
+
+
+def _buscar(cliente, q, **args):
+    respuesta = cliente.get("/api/estudiantes/buscar", query_string={"q": q, **args})
+    assert respuesta.status_code == 200
+    return [e["matricula"] for e in respuesta.get_json()["estudiantes"]]
+
+
+@pytest.fixture
+def alumnos(cliente):
+    return [_crear(cliente, *a) for a in ALUMNOS]
+
+
+@pytest.mark.parametrize("q, esperado", [
+    ("jose", ["A24002", "A24001"]),
+    ("JOSÉ pér", ["A24001"]),
+    ("nunez", ["A24001"]),
+    ("pena", ["A24003"]),
+    ("maria", ["A24003"]),
+    ("angel", ["B24002"]),
+    ("pe", ["A24003", "B24001", "A24001"]),
+    ("a24", ["A24002", "A24003", "A24001"]),
+    ("a24003", ["A24003"]),
+    ("zz", []),
+])
+def test_prefijos_sin_acentos_ni_mayusculas(cliente, modo, alumnos, q, esperado):
+    assert _buscar(cliente, q) == esperado
+
+
+def test_relevancia_y_limite(cliente, modo, alumnos):
+    # Matrícula exacta, luego prefijo de matrícula, de apellido y de nombre
+    _crear(cliente, "PER001", "Luis", "Gómez")
+    _crear(cliente, "C24001", "Perla", "Zúñiga")
+    assert _buscar(cliente, "per") == ["PER001", "B24001", "A24001", "C24001"]
+    assert _buscar(cliente, "per", limite=2) == ["PER001", "B24001"]
+
+
+def test_busqueda_corta_es_400(cliente, modo):
+    assert cliente.get("/api/estudiantes/buscar?q=a").status_code == 400
+    assert cliente.get("/api/estudiantes/buscar?q=%20%20").status_code == 400
+
+
+def test_el_indice_sigue_a_las_escrituras(app, cliente, modo, alumnos):
+    jose, josefina = alumnos[:2]
+    # Dentro del mismo nivel de relevancia se ordena por apellido
+    assert _buscar(cliente, "jose") == ["A24002", "A24001"]
+
+    _crear(cliente, "A24009", "Joseph", "Abad")
+    assert _buscar(cliente, "jose") == ["A24009", "A24002", "A24001"]
+
+    cliente.put(f"/api/estudiantes/{jose}", json={"nombre": "Raúl"})
+    assert _buscar(cliente, "jose") == ["A24009", "A24002"]
+    assert _buscar(cliente, "raul") == ["A24001"]
+
+    cliente.delete(f"/api/estudiantes/{josefina}")
+    assert _buscar(cliente, "jose") == ["A24009"]
+
+    cliente.post("/api/estudiantes/importar?modo=upsert", json=[
+        {"matricula": "A24010", "nombre": "Josué", "apellido": "Zamora", "email": "a24010@prueba.mx",
+         "carrera": "ITIC"},
+        {"matricula": "A24009", "nombre": "Mateo", "apellido": "Abad", "email": "a24009@prueba.mx",
+         "carrera": "ITIC"},
+    ])
+    assert _buscar(cliente, "jos") == ["A24010"]
+    assert _buscar(cliente, "mateo") == ["A24009"]
+    if modo == "memoria":
+        assert len(app.extensions["indice_busqueda"]) == len(ALUMNOS) + 1
+
+
+def test_indice_en_memoria_igual_que_sql(app, cliente, sembrar):
+    sembrar([0] * 150)
+    consultas = ["nombre1", "nombre12 prueba", "prueba", "t00001", "t0000150", "pru nom"]
+    resultados = {}
+    for modo in ("memoria", "sql"):
+        app.config["BUSQUEDA_INDICE"] = modo
+        resultados[modo] = [_buscar(cliente, q, limite=30) for q in consultas]
+    assert resultados["memoria"] == resultados["sql"]
+
+
+def test_indice_quita_y_reordena_palabras():
+    class Fila:
+        def __init__(self, id, matricula, nombre, apellido, activo=True):
+            self.id, self.matricula, self.nombre, self.apellido, self.activo = id, matricula, nombre, apellido, activo
+
+    indice = IndicePrefijos()
+    indice.actualizar([Fila(1, "A1", "Ana", "Ruiz"), Fila(2, "A2", "Andrés", "Ruiz")])
+    assert indice.buscar(["an"], 10) == [1, 2]
+
+    indice.actualizar([Fila(1, "A1", "Eva", "Ruiz"), Fila(2, "A2", "Andrés", "Ruiz", activo=False)])
+    assert indice.buscar(["an"], 10) == []
+    assert indice.buscar(["ruiz"], 10) == [1]
+    assert len(indice) == 1
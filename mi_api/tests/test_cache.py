@@ -0,0 +1,33 @@
+# tests/test_cache.py
+from app.cache import CacheCompartido, ClienteMemoria
+
+
+def test_cache_compartido_clear_solo_borra_su_prefijo():
+    cliente = ClienteMemoria()
+    respuestas = CacheCompartido(cliente, "apiescolar:")
+    otro = CacheCompartido(cliente, "otra_app:")
+    for i in range(1200):
+        respuestas.set(f"respuesta:{i}", i)
+    otro.set("respuesta:1", "se queda")
+
+    respuestas.clear()
+
+    assert respuestas.get("respuesta:1") is None
+    assert list(cliente.scan_iter(match="apiescolar:*")) == []
+    assert otro.get("respuesta:1") == "se queda"
+
+
+def test_cache_compartido_ttl_menor_a_un_segundo():
+    enviados = []
+
+    class Cliente(ClienteMemoria):
+        def set(self, nombre, valor, ex=None, px=None, nx=False):
+            enviados.append((ex, px))
+            return super().set(nombre, valor, ex=ex, px=px, nx=nx)
+
+    backend = CacheCompartido(Cliente())
+    backend.set("marca", True, 0.5)
+    backend.add("otra", True, 0.0004)
+
+    assert enviados == [(None, 500), (None, 1)]
+    assert backend.get("marca") is True
@@ -0,0 +1,103 @@
+# tests/test_calificaciones_lote.py
+import io
+import json
+import pytest
+from app import db
+from app.models import Calificacion, ResumenAcademico
+
+
+def _registrar(cliente, consulta="", **kwargs):
+    respuesta = cliente.post(f"/api/calificaciones/lote{consulta}", **kwargs)
+    return respuesta.status_code, respuesta.get_json()
+
+
+def _total():
+    return db.session.scalar(db.select(db.func.count(Calificacion.id)))
+
+
+def test_json_con_falla_parcial(cliente, sembrar):
+    id, = sembrar([0])
+
+    estado, reporte = _registrar(cliente, json=[
+        {"estudiante_id": id, "materia_id": 1, "calificacion": 90, "periodo": "2024-2"},
+        {"estudiante_id": id + 1, "materia_id": 1, "calificacion": 80},
+        {"estudiante_id": id, "materia_id": 99, "calificacion": 80},
+        {"estudiante_id": id, "materia_id": 2, "calificacion": 101},
+        {"estudiante_id": id, "materia_id": 2, "calificacion": "diez"},
+        {"estudiante_id": "uno", "materia_id": 2, "calificacion": 70},
+        {"materia_id": 2, "calificacion": 70},
+        [id, 2, 70],
+        {"estudiante_id": str(id), "materia_id": "3", "calificacion": "70.5"},
+    ])
+
+    assert estado == 200
+    assert (reporte["insertadas"], reporte["total_errores"]) == (2, 7)
+    assert reporte["errores"] == [
+        {"fila": 2, "error": f"El estudiante {id + 1} no existe"},
+        {"fila": 3, "error": "La materia 99 no existe"},
+        {"fila": 4, "error": "La calificación debe estar entre 0 y 100"},
+        {"fila": 5, "error": "La calificación debe ser numérica"},
+        {"fila": 6, "error": "estudiante_id y materia_id deben ser enteros"},
+        {"fila": 7, "error": "El campo 'estudiante_id' es requerido"},
+        {"fila": 8, "error": "Cada fila debe ser un objeto"},
+    ]
+    filas = db.session.execute(db.select(Calificacion.materia_id, Calificacion.calificacion, Calificacion.periodo)
+                               .order_by(Calificacion.id)).all()
+    assert [(m, float(c), p) for m, c, p in filas] == [(1, 90.0, "2024-2"), (3, 70.5, "2024-1")]
+
+    # El resumen académico queda al día con lo insertado
+    total = db.session.scalars(db.select(ResumenAcademico).filter_by(estudiante_id=id,
+                                                                     periodo=ResumenAcademico.TOTAL)).one()
+    assert (total.total, float(total.suma)) == (2, 160.5)
+
+
+def test_csv_y_ndjson(cliente, sembrar):
+    id, = sembrar([0])
+    csv = f"estudiante_id,materia_id,calificacion,periodo\n{id},1,75,2024-1\n{id},2,,2024-1\n{id},3,88,\n"
+
+    estado, reporte = _registrar(cliente, data=csv, content_type="text/csv")
+    assert (estado, reporte["insertadas"]) == (200, 2)
+    assert reporte["errores"] == [{"fila": 2, "error": "La calificación debe ser numérica"}]
+
+    ndjson = "\n".join(json.dumps({"estudiante_id": id, "materia_id": m, "calificacion": 60}) for m in (4, 5))
+    estado, reporte = _registrar(cliente, data=ndjson, content_type="application/x-ndjson")
+    assert (estado, reporte["insertadas"], reporte["total_errores"]) == (200, 2, 0)
+
+    archivo = {"archivo": (io.BytesIO(csv.encode()), "notas.csv")}
+    estado, reporte = _registrar(cliente, data=archivo, content_type="multipart/form-data")
+    assert (estado, reporte["insertadas"]) == (200, 2)
+    assert _total() == 6
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"json": {"estudiante_id": 1}},
+    {"data": "{roto", "content_type": "application/x-ndjson"},
+    {"data": {"archivo": (io.BytesIO(b"{roto"), "notas.json")}, "content_type": "multipart/form-data"},
+])
+def test_formato_invalido_es_400(cliente, sembrar, kwargs):
+    sembrar([0])
+    estado, cuerpo = _registrar(cliente, **kwargs)
+    assert estado == 400 and "error" in cuerpo
+    assert _total() == 0
+
+
+def test_los_bloques_anteriores_a_un_error_de_formato_se_conservan(cliente, sembrar):
+    id, = sembrar([0])
+    lineas = [json.dumps({"estudiante_id": id, "materia_id": 1, "calificacion": 70})] * 3 + ["{roto"]
+
+    estado, _ = _registrar(cliente, "?lote=2", data="\n".join(lineas), content_type="application/x-ndjson")
+
+    assert estado == 400
+    assert _total() == 2
+
+
+def test_consultas_por_bloque_no_crecen_con_las_filas(cliente, sembrar, contar_consultas):
+    ids = sembrar([0] * 10)
+    filas = [{"estudiante_id": ids[n % 10], "materia_id": n % 5 + 1, "calificacion": 70} for n in range(400)]
+
+    with contar_consultas() as pocas:
+        _registrar(cliente, json=filas[:10])
+    with contar_consultas() as muchas:
+        _registrar(cliente, json=filas)
+    assert muchas.total == pocas.total
+    assert _total() == 410
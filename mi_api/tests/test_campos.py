@@ -0,0 +1,83 @@
+# tests/test_campos.py
+import pytest
+from sqlalchemy import event
+from app import db
+
+
+@pytest.fixture
+def sentencias(app):
+    """SQL emitido mientras corre la prueba."""
+    capturadas = []
+    escuchar = lambda conexion, cursor, sentencia, *args: capturadas.append(sentencia)
+    event.listen(db.engine, "before_cursor_execute", escuchar)
+    yield capturadas
+    event.remove(db.engine, "before_cursor_execute", escuchar)
+
+
+def _recortar(datos, campos):
+    return {c: datos[c] for c in campos}
+
+
+@pytest.mark.parametrize("ruta, lista", [
+    ("/api/estudiantes/?por_pagina=5", "estudiantes"),
+    ("/api/estudiantes/?limite=5", "estudiantes"),
+    ("/api/estudiantes/buscar?q=nombre", "estudiantes"),
+    ("/api/estudiantes/{id}", None),
+])
+def test_proyeccion_de_estudiantes(cliente, sembrar, ruta, lista):
+    id = sembrar([0] * 3)[0]
+    ruta = ruta.format(id=id)
+    campos = ["nombre_completo", "id", "semestre"]
+    separador = "&" if "?" in ruta else "?"
+
+    completo = cliente.get(ruta).get_json()
+    parcial = cliente.get(f"{ruta}{separador}campos={','.join(campos)}").get_json()
+
+    if lista is None:
+        assert parcial == _recortar(completo, campos)
+    else:
+        assert parcial[lista] == [_recortar(e, campos) for e in completo[lista]]
+        assert all(e.keys() == set(campos) for e in parcial[lista])
+
+
+def test_proyeccion_de_materias_y_kardex(cliente, sembrar):
+    id, = sembrar([4])
+
+    materias = cliente.get("/api/materias/").get_json()
+    assert cliente.get("/api/materias/?campos=clave").get_json() == [{"clave": m["clave"]} for m in materias]
+
+    kardex = cliente.get(f"/api/estudiantes/{id}/kardex").get_json()
+    parcial = cliente.get(f"/api/estudiantes/{id}/kardex?campos=materia,aprobado").get_json()
+    assert parcial["calificaciones"] == [_recortar(c, ["materia", "aprobado"]) for c in kardex["calificaciones"]]
+    assert parcial["estadisticas"] == kardex["estadisticas"]
+
+
+def test_solo_se_seleccionan_las_columnas_pedidas(cliente, sembrar, sentencias):
+    id, = sembrar([4])
+
+    cliente.get("/api/estudiantes/?campos=matricula")
+    cliente.get(f"/api/estudiantes/{id}?campos=matricula")
+    consultas = [s for s in sentencias if "FROM estudiantes" in s and "count" not in s.lower()]
+    assert len(consultas) == 2
+    assert all("estudiantes.matricula" in s and "estudiantes.email" not in s for s in consultas)
+
+    sentencias.clear()
+    cliente.get(f"/api/estudiantes/{id}/kardex?campos=calificacion,periodo")
+    assert any("FROM calificaciones" in s for s in sentencias)
+    assert not any("JOIN materias" in s for s in sentencias)
+
+
+@pytest.mark.parametrize("ruta", [
+    "/api/estudiantes/?campos=id,clave",
+    "/api/estudiantes/?campos=",
+    "/api/estudiantes/?limite=5&campos=password",
+    "/api/estudiantes/1?campos=x",
+    "/api/estudiantes/1/kardex?campos=nota",
+    "/api/materias/?campos=matricula",
+    "/api/estudiantes/buscar?q=nombre&campos=x",
+])
+def test_campo_desconocido_es_400(cliente, sembrar, ruta):
+    sembrar([1])
+    respuesta = cliente.get(ruta)
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()["disponibles"]
@@ -0,0 +1,28 @@
+# tests/test_consultas_lentas.py
+import sys
+import time
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import consultas_lentas, db
+
+
+def test_sentencia_fallida_no_desalinea_los_tiempos(app, monkeypatch):
+    consultas_lentas.reiniciar()
+    with db.engine.connect() as conexion:
+        with pytest.raises(OperationalError):
+            conexion.execute(text("SELECT * FROM tabla_que_no_existe"))
+        # Sin la fallida de por medio, esta debe medir solo su propia duración
+        reloj = iter([100.0, 100.25])
+
+        class Reloj:
+            perf_counter = staticmethod(lambda: next(reloj))
+            monotonic = staticmethod(time.monotonic)
+
+        monkeypatch.setattr(sys.modules["app.consultas_lentas"], "time", Reloj)
+        conexion.execute(text("SELECT 42"))
+        monkeypatch.undo()
+
+    consulta = next(c for c in consultas_lentas.resumen(limite=100)["consultas"] if c["sql"] == "SELECT ?")
+    assert consulta["llamadas"] == 1
+    assert consulta["max_ms"] == 250.0
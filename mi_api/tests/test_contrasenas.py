@@ -0,0 +1,111 @@
+# tests/test_contrasenas.py
+import sys
+import threading
+import pytest
+from app import create_app, db
+from app.migraciones import actualizar
+from app.models import Usuario
+from tests.conftest import PruebasConfig
+
+METODO_ANTERIOR = "pbkdf2:sha256:1000"
+METODO_NUEVO = "pbkdf2:sha256:2000"
+
+
+def _crear(username="profe"):
+    usuario = Usuario(username=username, email=f"{username}@prueba.mx", rol="docente")
+    usuario.set_password("Prueba12345")
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+
+def _login(cliente, password="Prueba12345", username="profe"):
+    return cliente.post("/api/auth/login", json={"username": username, "password": password})
+
+
+def _hash(usuario_id):
+    db.session.expire_all()
+    return db.session.get(Usuario, usuario_id).password_hash
+
+
+def test_login_rehace_el_hash_al_cambiar_el_metodo(app, cliente):
+    app.config["PASSWORD_METODO"] = METODO_ANTERIOR
+    usuario = _crear()
+    original = usuario.password_hash
+    assert original.startswith(METODO_ANTERIOR + "$")
+    assert not usuario.necesita_rehash()
+
+    app.config["PASSWORD_METODO"] = METODO_NUEVO
+    assert usuario.necesita_rehash()
+    # Con la contraseña equivocada no se toca el hash
+    assert _login(cliente, password="otra").status_code == 401
+    assert _hash(usuario.id) == original
+
+    respuesta = _login(cliente)
+    assert respuesta.status_code == 200
+    nuevo = _hash(usuario.id)
+    assert nuevo.startswith(METODO_NUEVO + "$")
+
+    # Ya migrado: el siguiente login verifica con el hash nuevo y no lo reescribe
+    assert _login(cliente).status_code == 200
+    assert _hash(usuario.id) == nuevo
+    # Cambiar el hash no es un cambio de rol: el token emitido sigue valiendo
+    cabecera = {"Authorization": f"Bearer {respuesta.get_json()['token']}"}
+    assert cliente.get("/api/auth/perfil", headers=cabecera).status_code == 200
+
+
+def test_un_hash_scrypt_se_migra_a_pbkdf2(app, cliente):
+    app.config["PASSWORD_METODO"] = "scrypt:16384:8:1"
+    usuario = _crear()
+    assert usuario.password_hash.startswith("scrypt:16384:8:1$")
+
+    app.config["PASSWORD_METODO"] = METODO_NUEVO
+    assert _login(cliente).status_code == 200
+    assert _hash(usuario.id).startswith(METODO_NUEVO + "$")
+
+
+class PoolConfig(PruebasConfig):
+    PASSWORD_HILOS = 1
+    PASSWORD_COLA_MAX = 0
+    PASSWORD_ESPERA = 0.05
+
+
+@pytest.fixture
+def app_con_pool():
+    app = create_app(PoolConfig)
+    with app.app_context():
+        actualizar()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_pool_saturado_responde_503(app_con_pool, monkeypatch):
+    app = app_con_pool
+    _crear()
+    modulo = sys.modules["app.contrasenas"]
+    verificar = modulo.check_password_hash
+    dentro, soltar = threading.Event(), threading.Event()
+
+    def lenta(*args):
+        dentro.set()
+        soltar.wait(5)
+        return verificar(*args)
+
+    monkeypatch.setattr(modulo, "check_password_hash", lenta)
+    resultados = []
+    hilo = threading.Thread(target=lambda: resultados.append(_login(app.test_client()).status_code))
+    hilo.start()
+    try:
+        assert dentro.wait(5)
+        respuesta = _login(app.test_client())
+        assert respuesta.status_code == 503
+        assert respuesta.headers["Retry-After"] == "1"
+    finally:
+        soltar.set()
+        hilo.join(5)
+
+    assert resultados == [200]
+    estado = app.extensions["contrasenas"].estado()
+    assert estado["rechazadas"] == 1
+    assert (estado["en_curso"], estado["en_cola"]) == (0, 0)
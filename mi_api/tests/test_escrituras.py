@@ -0,0 +1,71 @@
+# tests/test_escrituras.py
+import atexit
+import threading
+import time
+import pytest
+from app.escrituras import APLICADA, ColaEscrituras, ColaLlena
+
+
+@pytest.fixture
+def cola(app, monkeypatch):
+    registrados = []
+    monkeypatch.setattr(atexit, "register", registrados.append)
+    app.config.update(COLA_ESCRITURA_HABILITADA=True, COLA_ESCRITURA_VENTANA_MS=1)
+    cola = ColaEscrituras()
+    cola.registrar_aplicador(lambda lote: [{"n": e} for e in lote])
+    cola.init_app(app)
+    cola.init_app(app)
+    yield cola, registrados
+    cola.detener()
+
+
+def test_detener_cierra_la_cola(cola):
+    cola, registrados = cola
+    id = cola.encolar(1)
+    cola.detener()
+    assert cola.estado(id)["estado"] == APLICADA
+
+    hilos = threading.active_count()
+    with pytest.raises(ColaLlena):
+        cola.encolar(2)
+    assert threading.active_count() == hilos
+    assert registrados == [cola.detener]
+
+
+def test_detener_no_pierde_lo_encolado_en_carrera(cola):
+    cola, _ = cola
+    cola.encolar(0)
+    poner = cola._cola.put
+    detencion = []
+
+    def poner_y_detener(elemento, **kwargs):
+        # detener() llega justo entre revisar el cierre y encolar
+        if not detencion:
+            detencion.append(threading.Thread(target=cola.detener))
+            detencion[0].start()
+            detencion[0].join(0.1)
+        return poner(elemento, **kwargs)
+
+    cola._cola.put = poner_y_detener
+    id = cola.encolar(1)
+    detencion[0].join(5)
+    assert cola.estado(id)["estado"] == APLICADA
+
+
+def test_detener_con_la_cola_llena_no_se_bloquea(app, monkeypatch):
+    monkeypatch.setattr(atexit, "register", lambda funcion: None)
+    app.config.update(COLA_ESCRITURA_MAX=1, COLA_ESCRITURA_ESPERA=0.01)
+    soltar = threading.Event()
+    cola = ColaEscrituras(app)
+    cola.registrar_aplicador(lambda lote: [soltar.wait(5) for _ in lote])
+    cola.encolar(1)
+    while cola.pendientes():
+        pass
+    cola.encolar(2)
+
+    inicio = time.monotonic()
+    cola.detener(timeout=0.2)
+    assert time.monotonic() - inicio < 1
+    with pytest.raises(ColaLlena):
+        cola.encolar(3)
+    soltar.set()
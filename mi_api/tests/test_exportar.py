@@ -0,0 +1,57 @@
+# tests/test_exportar.py
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app import autorizacion, db
+from app.models import Estudiante, Usuario
+
+
+def _token(rol):
+    usuario = Usuario(username=rol, email=f"{rol}@prueba.mx", rol=rol)
+    usuario.set_password("Prueba12345")
+    db.session.add(usuario)
+    db.session.commit()
+    return {"Authorization": f"Bearer {autorizacion.crear_token(usuario)}"}
+
+
+@pytest.mark.parametrize("ruta", ["/api/exportar/estudiantes", "/api/exportar/calificaciones"])
+def test_exportar_requiere_admin(app, cliente, sembrar, ruta):
+    app.config["AUTH_REQUERIDA"] = True
+    sembrar([2])
+
+    assert cliente.get(ruta).status_code == 401
+    assert cliente.get(ruta, headers=_token("docente")).status_code == 403
+    respuesta = cliente.get(ruta, headers=_token("admin"))
+    assert respuesta.status_code == 200
+    assert respuesta.get_data(as_text=True).strip()
+
+
+def _ids_exportados(cliente, consulta=""):
+    respuesta = cliente.get(f"/api/exportar/estudiantes?{consulta}")
+    assert respuesta.status_code == 200
+    return [json.loads(linea)["id"] for linea in respuesta.get_data(as_text=True).splitlines()]
+
+
+def test_desde_incluye_ediciones_y_bajas(app, cliente, sembrar):
+    editado, baja, importado, intacto = sembrar([0] * 4)
+    hace_un_mes = datetime.utcnow() - timedelta(days=30)
+    db.session.execute(update(Estudiante).values(fecha_registro=hace_un_mes, actualizado_en=hace_un_mes))
+    db.session.commit()
+    corte = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    assert _ids_exportados(cliente, f"desde={corte}") == []
+
+    cliente.put(f"/api/estudiantes/{editado}", json={"semestre": 3})
+    cliente.delete(f"/api/estudiantes/{baja}")
+    fila = db.session.get(Estudiante, importado)
+    cliente.post("/api/estudiantes/importar?modo=upsert", json=[
+        {"matricula": fila.matricula, "nombre": "Nuevo", "apellido": fila.apellido, "email": fila.email,
+         "carrera": fila.carrera}])
+
+    assert _ids_exportados(cliente, f"desde={corte}") == [editado, baja, importado]
+    assert _ids_exportados(cliente) == [editado, baja, importado, intacto]
+    assert _ids_exportados(cliente, f"desde_id={baja}") == [importado, intacto]
+
+
+def test_desde_invalido_es_400(cliente):
+    assert cliente.get("/api/exportar/estudiantes?desde=ayer").status_code == 400
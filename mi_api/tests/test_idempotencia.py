@@ -0,0 +1,114 @@
+# tests/test_idempotencia.py
+import threading
+import pytest
+from sqlalchemy import event
+from app import db, idempotencia
+from app.models import Estudiante
+
+ALUMNA = {"matricula": "I0000001", "nombre": "Ana", "apellido": "Ruiz", "email": "ana@prueba.mx",
+          "carrera": "ITIC"}
+
+
+@pytest.fixture
+def insercion_lenta(app):
+    """Retrasa cada INSERT para que las peticiones duplicadas se encimen; 'soltar' lo libera antes."""
+    soltar = threading.Event()
+
+    def esperar(conexion, cursor, sentencia, *args):
+        if sentencia.startswith("INSERT INTO estudiantes"):
+            soltar.wait(0.3)
+
+    event.listen(db.engine, "before_cursor_execute", esperar)
+    yield soltar
+    soltar.set()
+    event.remove(db.engine, "before_cursor_execute", esperar)
+
+
+def _en_paralelo(app, peticiones):
+    """Lanza las peticiones (llave, cuerpo) a la vez desde hilos distintos; devuelve sus respuestas en orden."""
+    barrera = threading.Barrier(len(peticiones))
+    respuestas = [None] * len(peticiones)
+
+    def pedir(i, llave, cuerpo):
+        cliente = app.test_client()
+        barrera.wait()
+        respuestas[i] = cliente.post("/api/estudiantes/", json=cuerpo, headers={"Idempotency-Key": llave})
+
+    hilos = [threading.Thread(target=pedir, args=(i, *p)) for i, p in enumerate(peticiones)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join(10)
+    return respuestas
+
+
+def test_duplicados_concurrentes_se_ejecutan_una_vez(app, insercion_lenta):
+    respuestas = _en_paralelo(app, [("clave-1", ALUMNA)] * 8)
+
+    assert [r.status_code for r in respuestas] == [201] * 8
+    assert len({r.get_data() for r in respuestas}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in respuestas) == 7
+    assert db.session.scalar(db.select(db.func.count(Estudiante.id))) == 1
+
+
+def test_misma_clave_con_otro_cuerpo_es_422(app, cliente):
+    primera = cliente.post("/api/estudiantes/", json=ALUMNA, headers={"Idempotency-Key": "clave-1"})
+    repetida = cliente.post("/api/estudiantes/", json=ALUMNA, headers={"Idempotency-Key": "clave-1"})
+    otra = cliente.post("/api/estudiantes/", json=dict(ALUMNA, nombre="Eva"), headers={"Idempotency-Key": "clave-1"})
+
+    assert primera.status_code == repetida.status_code == 201
+    assert repetida.headers["Idempotent-Replayed"] == "true"
+    assert repetida.get_data() == primera.get_data()
+    assert otra.status_code == 422
+    assert db.session.scalar(db.select(db.func.count(Estudiante.id))) == 1
+
+
+@pytest.fixture
+def original_en_curso(app):
+    """POST de ALUMNA con 'clave-1' que se queda en su INSERT hasta llamar a la función devuelta."""
+    dentro, soltar = threading.Event(), threading.Event()
+
+    def esperar(conexion, cursor, sentencia, parametros, *args):
+        if sentencia.startswith("INSERT INTO estudiantes") and ALUMNA["matricula"] in parametros:
+            dentro.set()
+            soltar.wait(5)
+
+    event.listen(db.engine, "before_cursor_execute", esperar)
+    respuesta = []
+    hilo = threading.Thread(target=lambda: respuesta.append(app.test_client().post(
+        "/api/estudiantes/", json=ALUMNA, headers={"Idempotency-Key": "clave-1"})))
+    hilo.start()
+    dentro.wait(5)
+
+    def terminar():
+        soltar.set()
+        hilo.join(5)
+        return respuesta[0]
+
+    yield terminar
+    terminar()
+    event.remove(db.engine, "before_cursor_execute", esperar)
+
+
+def test_otro_cuerpo_mientras_la_original_sigue_en_curso_es_422(app, original_en_curso):
+    respuestas = _en_paralelo(app, [("clave-1", dict(ALUMNA, nombre="Eva"))] * 3)
+
+    assert [r.status_code for r in respuestas] == [422] * 3
+    assert original_en_curso().status_code == 201
+    assert db.session.scalar(db.select(db.func.count(Estudiante.id))) == 1
+
+
+def test_una_clave_en_curso_no_se_pierde_si_el_lru_la_desaloja(app, original_en_curso):
+    app.config["IDEMPOTENCIA_ESPERA"] = 0.1
+    idempotencia.backend.max_entradas = 1
+
+    # Otra clave llena el LRU y desaloja la reserva de la primera
+    otra = dict(ALUMNA, matricula="I0000002", email="eva@prueba.mx")
+    cliente = app.test_client()
+    assert cliente.post("/api/estudiantes/", json=otra, headers={"Idempotency-Key": "clave-2"}).status_code == 201
+
+    duplicado = cliente.post("/api/estudiantes/", json=ALUMNA, headers={"Idempotency-Key": "clave-1"})
+
+    assert duplicado.status_code == 409
+    assert original_en_curso().status_code == 201
+    assert db.session.scalar(db.select(db.func.count(Estudiante.id))) == 2
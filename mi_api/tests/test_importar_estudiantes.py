@@ -0,0 +1,121 @@
+# tests/test_importar_estudiantes.py
+import io
+import json
+import pytest
+from app import db
+from app.models import Estudiante
+
+
+def _fila(n, **cambios):
+    return {"matricula": f"M{n:06d}", "nombre": f"Nombre{n}", "apellido": "Prueba", "email": f"m{n}@prueba.mx",
+            "carrera": "ITIC", "semestre": 2, **cambios}
+
+
+def _importar(cliente, cuerpo=None, consulta="", **kwargs):
+    respuesta = cliente.post(f"/api/estudiantes/importar{consulta}", json=cuerpo, **kwargs)
+    return respuesta.status_code, respuesta.get_json()
+
+
+def _csv(filas):
+    """CSV con BOM, como lo guarda Excel."""
+    columnas = list(filas[0])
+    lineas = [",".join(columnas)] + [",".join(str(f.get(c, "")) for c in columnas) for f in filas]
+    return "\ufeff" + "\n".join(lineas) + "\n"
+
+
+def test_json_con_errores_por_fila(cliente, sembrar):
+    existente, = sembrar([0])
+    email_ocupado = db.session.get(Estudiante, existente).email
+
+    estado, reporte = _importar(cliente, [
+        _fila(1),
+        _fila(2, nombre=""),
+        _fila(1, email="otro@prueba.mx"),
+        _fila(3, email="m1@prueba.mx"),
+        _fila(4, email=email_ocupado),
+        _fila(5, semestre="quinto"),
+        "no es un objeto",
+        _fila(6),
+    ])
+
+    assert estado == 200
+    assert (reporte["insertadas"], reporte["actualizadas"], reporte["total_errores"]) == (2, 0, 6)
+    assert reporte["errores"] == [
+        {"fila": 2, "error": "El campo 'nombre' es requerido"},
+        {"fila": 3, "error": "La matrícula está repetida en el lote"},
+        {"fila": 4, "error": "El email está repetido en el lote"},
+        {"fila": 5, "error": "El email ya está registrado"},
+        {"fila": 6, "error": "El semestre debe ser entero"},
+        {"fila": 7, "error": "Cada fila debe ser un objeto"},
+    ]
+    importados = db.session.scalars(db.select(Estudiante).where(Estudiante.matricula.like("M%"))
+                                    .order_by(Estudiante.matricula)).all()
+    assert [(e.matricula, e.semestre, e.nombre_normalizado) for e in importados] == [
+        ("M000001", 2, "nombre1"), ("M000006", 2, "nombre6")]
+
+
+def test_csv_y_ndjson_en_el_cuerpo(cliente):
+    estado, reporte = _importar(cliente, data=_csv([_fila(1), _fila(2, semestre="")]), content_type="text/csv")
+    assert (estado, reporte["insertadas"], reporte["total_errores"]) == (200, 2, 0)
+
+    ndjson = "\n".join(json.dumps(f) for f in [_fila(3), _fila(4, carrera="")]) + "\n\n"
+    estado, reporte = _importar(cliente, data=ndjson, content_type="application/x-ndjson")
+    assert (estado, reporte["insertadas"]) == (200, 1)
+    assert reporte["errores"] == [{"fila": 2, "error": "El campo 'carrera' es requerido"}]
+
+    assert db.session.get(Estudiante, 2).semestre == 1
+    assert db.session.scalar(db.select(db.func.count(Estudiante.id))) == 3
+
+
+@pytest.mark.parametrize("nombre, contenido", [
+    ("alumnos.csv", _csv([_fila(1), _fila(2)])),
+    ("alumnos.ndjson", "\n".join(json.dumps(f) for f in [_fila(1), _fila(2)])),
+    ("alumnos.json", json.dumps([_fila(1), _fila(2)])),
+])
+def test_archivo_multipart(cliente, nombre, contenido):
+    estado, reporte = _importar(cliente, data={"archivo": (io.BytesIO(contenido.encode()), nombre)},
+                                content_type="multipart/form-data")
+    assert (estado, reporte["insertadas"], reporte["total_errores"]) == (200, 2, 0)
+
+
+def test_upsert_por_matricula(cliente):
+    _importar(cliente, [_fila(1), _fila(2)])
+
+    estado, reporte = _importar(cliente, [_fila(1, nombre="José", semestre=5)])
+    assert reporte["errores"] == [{"fila": 1, "error": "La matrícula ya está registrada"}]
+
+    estado, reporte = _importar(cliente, [
+        _fila(1, nombre="José", semestre=5),
+        _fila(2, email="m1@prueba.mx"),
+        _fila(3),
+    ], consulta="?modo=upsert")
+
+    assert estado == 200
+    assert (reporte["insertadas"], reporte["actualizadas"]) == (1, 1)
+    assert reporte["errores"] == [{"fila": 2, "error": "El email está repetido en el lote"}]
+    jose = db.session.scalars(db.select(Estudiante).filter_by(matricula="M000001")).one()
+    assert (jose.nombre, jose.nombre_normalizado, jose.semestre) == ("José", "jose", 5)
+
+
+@pytest.mark.parametrize("consulta, kwargs", [
+    ("?modo=reemplazar", {"json": [_fila(1)]}),
+    ("", {"json": {"matricula": "M1"}}),
+    ("", {"data": '{"matricula": "M1"}\n{roto', "content_type": "application/x-ndjson"}),
+])
+def test_entrada_invalida_es_400(cliente, consulta, kwargs):
+    respuesta = cliente.post(f"/api/estudiantes/importar{consulta}", **kwargs)
+    assert respuesta.status_code == 400
+    assert "error" in respuesta.get_json()
+    assert db.session.scalar(db.select(db.func.count(Estudiante.id))) == 0
+
+
+def test_consultas_por_bloque_no_crecen_con_las_filas(cliente, contar_consultas):
+    with contar_consultas() as pocas:
+        _importar(cliente, [_fila(n) for n in range(5)])
+    with contar_consultas() as muchas:
+        _importar(cliente, [_fila(n) for n in range(5, 205)])
+    assert muchas.total == pocas.total
+
+    with contar_consultas() as dos_bloques:
+        _importar(cliente, [_fila(n) for n in range(205, 405)], consulta="?lote=100")
+    assert dos_bloques.total > muchas.total
@@ -0,0 +1,69 @@
+# tests/test_kardex.py
+# El kardex debe costar un número fijo de consultas sin importar cuántas
+# calificaciones tenga el estudiante (ni cuántos estudiantes lleve un bloque).
+import pytest
+
+
+def test_kardex_consultas_constantes(cliente, contar_consultas, sembrar):
+    uno, cuarenta = sembrar([1, 40])
+
+    conteos = []
+    for id in (uno, cuarenta):
+        with contar_consultas() as contador:
+            respuesta = cliente.get(f"/api/estudiantes/{id}/kardex")
+        assert respuesta.status_code == 200
+        conteos.append(contador.total)
+
+    assert len(respuesta.get_json()["calificaciones"]) == 40
+    assert conteos[0] == conteos[1] > 0
+
+
+@pytest.mark.parametrize("tamano_lote", [1, 2, 200])
+def test_kardex_lote_consultas_constantes(app, cliente, contar_consultas, sembrar, tamano_lote):
+    app.config["KARDEX_LOTE_TAMANO"] = tamano_lote
+    pocas = sembrar([1, 1, 1, 1])
+    muchas = sembrar([40, 40, 40, 40])
+
+    conteos = []
+    for ids in (pocas, muchas):
+        with contar_consultas() as contador:
+            respuesta = cliente.get("/api/kardex?ids=" + ",".join(map(str, ids)))
+            kardex = respuesta.get_json()
+        assert respuesta.status_code == 200
+        assert [k["estudiante"]["id"] for k in kardex] == ids
+        conteos.append(contador.total)
+
+    assert conteos[0] == conteos[1] > 0
+
+
+def test_kardex_lote_consultas_por_bloque(app, cliente, contar_consultas, sembrar):
+    """En un solo bloque, el costo no crece con el número de estudiantes."""
+    app.config["KARDEX_LOTE_TAMANO"] = 200
+    conteos = []
+    for cantidad in (2, 20):
+        ids = sembrar([10] * cantidad)
+        with contar_consultas() as contador:
+            cliente.get("/api/kardex?ids=" + ",".join(map(str, ids))).get_json()
+        conteos.append(contador.total)
+
+    assert conteos[0] == conteos[1] > 0
+
+
+def test_kardex_cacheado_renueva_el_ranking_de_la_cohorte(app, cliente, sembrar):
+    app.config["CACHE_HABILITADO"] = True
+    primero, segundo = sembrar([4, 4])
+    kardex = cliente.get(f"/api/estudiantes/{primero}/kardex")
+    assert cliente.get(f"/api/estudiantes/{primero}/kardex",
+                       headers={"If-None-Match": kardex.headers["ETag"]}).status_code == 304
+
+    # Una calificación de otro estudiante de la cohorte cambia la posición del primero
+    antes = kardex.get_json()["ranking"]
+    for _ in range(4):
+        respuesta = cliente.post("/api/calificaciones/", json={
+            "estudiante_id": segundo, "materia_id": 1, "calificacion": 100 if antes["posicion"] == 1 else 0})
+        assert respuesta.status_code == 201
+
+    despues = cliente.get(f"/api/estudiantes/{primero}/kardex",
+                          headers={"If-None-Match": kardex.headers["ETag"]})
+    assert despues.status_code == 200
+    assert despues.get_json()["ranking"]["posicion"] != antes["posicion"]
@@ -0,0 +1,62 @@
+# tests/test_metricas.py
+import re
+import pytest
+from app.metricas import CABECERA_CONSULTAS
+
+
+def _consultas_registradas(cliente, endpoint):
+    texto = cliente.get("/metrics").get_data(as_text=True)
+    patron = rf'db_queries_per_request_(sum|count){{endpoint="{re.escape(endpoint)}",method="GET"}} (\S+)'
+    return {m.group(1): float(m.group(2)) for m in re.finditer(patron, texto)}
+
+
+def test_respuesta_normal_lleva_el_conteo(cliente, sembrar):
+    id, = sembrar([3])
+    respuesta = cliente.get(f"/api/estudiantes/{id}/kardex")
+    assert int(respuesta.headers[CABECERA_CONSULTAS]) > 0
+
+
+def test_streaming_se_registra_al_cerrar_sin_cabecera(cliente, sembrar):
+    ids = sembrar([3, 3])
+    respuesta = cliente.get("/api/kardex?ids=" + ",".join(map(str, ids)))
+    assert CABECERA_CONSULTAS not in respuesta.headers
+
+    respuesta.get_data()
+    respuesta.close()
+
+    registradas = _consultas_registradas(cliente, "calificaciones.obtener_kardex_lote")
+    assert registradas["count"] == 1
+    assert registradas["sum"] > 0
+
+
+def test_errores_http_llevan_el_conteo(cliente):
+    respuesta = cliente.get("/api/estudiantes/999999")
+    assert respuesta.status_code == 404
+    assert CABECERA_CONSULTAS in respuesta.headers
+
+
+def _estados(cliente, endpoint):
+    texto = cliente.get("/metrics").get_data(as_text=True)
+    patron = rf'http_requests_total{{endpoint="{re.escape(endpoint)}",method="GET",status="(\d+)"}} (\S+)'
+    return {m.group(1): float(m.group(2)) for m in re.finditer(patron, texto)}
+
+
+@pytest.mark.parametrize("propagar", [False, True])
+def test_excepcion_no_manejada_se_registra_como_500(app, cliente, propagar):
+    def fallar():
+        raise RuntimeError("falla")
+    # Las métricas son del proceso: un endpoint distinto por caso
+    endpoint = f"fallar_{propagar}".lower()
+    app.add_url_rule("/fallar", endpoint, fallar)
+    app.config["PROPAGATE_EXCEPTIONS"] = propagar
+    assert cliente.get("/api/estudiantes/").status_code == 200
+
+    if propagar:
+        # Con la excepción propagada no corre after_request
+        with pytest.raises(RuntimeError):
+            cliente.get("/fallar")
+    else:
+        assert cliente.get("/fallar").status_code == 500
+
+    assert _estados(cliente, endpoint) == {"500": 1}
+    assert _consultas_registradas(cliente, endpoint)["count"] == 1
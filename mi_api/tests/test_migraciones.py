@@ -0,0 +1,128 @@
+# tests/test_migraciones.py
+from sqlalchemy import inspect, select, text
+from app import db
+from app.migraciones import MIGRACIONES, actualizar, version_actual, version_esquema
+from app.models import Estudiante
+from app.services.archivo import archivar_inactivos
+
+# Tabla de estudiantes tal como la creaba la versión 1 (antes de la búsqueda y del archivado)
+ESTUDIANTES_V1 = """
+CREATE TABLE estudiantes (
+    id INTEGER NOT NULL PRIMARY KEY,
+    matricula VARCHAR(10) NOT NULL UNIQUE,
+    nombre VARCHAR(100) NOT NULL,
+    apellido VARCHAR(100) NOT NULL,
+    email VARCHAR(120) NOT NULL UNIQUE,
+    carrera VARCHAR(100) NOT NULL,
+    semestre INTEGER NOT NULL,
+    fecha_registro DATETIME,
+    activo BOOLEAN
+)
+"""
+
+
+def _esquema():
+    inspector = inspect(db.engine)
+    return {t: ({c["name"] for c in inspector.get_columns(t)}, {i["name"] for i in inspector.get_indexes(t)})
+            for t in inspector.get_table_names()}
+
+
+def _versiones():
+    with db.engine.connect() as conexion:
+        return conexion.scalars(select(version_esquema.c.version).order_by(version_esquema.c.version)).all()
+
+
+def test_actualizar_es_idempotente(app):
+    ultima = MIGRACIONES[-1][0]
+    esquema = _esquema()
+
+    assert actualizar() == []
+    assert actualizar() == []
+    assert _esquema() == esquema
+    assert _versiones() == [v for v, _, _ in MIGRACIONES]
+    with db.engine.connect() as conexion:
+        assert version_actual(conexion) == ultima
+
+
+def test_actualiza_un_esquema_version_1(app):
+    # Se parte de una base en versión 1: tablas sin las columnas ni los índices posteriores
+    db.drop_all()
+    version_esquema.drop(db.engine)
+    with db.engine.begin() as conexion:
+        conexion.execute(text(ESTUDIANTES_V1))
+        db.metadata.create_all(conexion, tables=[t for t in db.metadata.sorted_tables
+                                                  if t.name not in ("estudiantes", "estudiantes_archivados",
+                                                                    "calificaciones_archivadas")])
+        for indice in ("ix_calificaciones_estudiante_periodo", "ix_calificaciones_materia_periodo"):
+            conexion.execute(text(f"DROP INDEX {indice}"))
+        conexion.execute(text(
+            "INSERT INTO estudiantes (matricula, nombre, apellido, email, carrera, semestre, activo) "
+            "VALUES ('A001', 'José', 'Pérez', 'jose@prueba.mx', 'ITIC', 1, 1)"))
+        # Inactivo desde antes de que existiera fecha_baja, registrado hace dos años
+        conexion.execute(text(
+            "INSERT INTO estudiantes (matricula, nombre, apellido, email, carrera, semestre, fecha_registro, activo) "
+            "VALUES ('A002', 'Ana', 'Ruiz', 'ana@prueba.mx', 'ITIC', 1, '2000-01-01 00:00:00', 0)"))
+    with db.engine.begin() as conexion:
+        version_esquema.create(conexion)
+        conexion.execute(version_esquema.insert().values(
+            version=1, descripcion=MIGRACIONES[0][1], aplicada_en=db.func.now()))
+
+    assert actualizar() == [v for v, _, _ in MIGRACIONES if v > 1]
+
+    esquema = _esquema()
+    columnas, indices = esquema["estudiantes"]
+    assert {"nombre_normalizado", "apellido_normalizado", "matricula_normalizada", "fecha_baja",
+            "actualizado_en"} <= columnas
+    assert {"ix_estudiantes_activos_carrera_id", "ix_estudiantes_inactivos_fecha_baja",
+            "ix_estudiantes_actualizado_en"} <= indices
+    # Reemplazado por los índices parciales de la migración 6
+    assert "ix_estudiantes_activo_carrera_id" not in indices
+    assert {"ix_calificaciones_estudiante_periodo", "ix_calificaciones_materia_periodo"} <= esquema["calificaciones"][1]
+    assert {"estudiantes_archivados", "calificaciones_archivadas"} <= esquema.keys()
+
+    estudiante, inactivo = db.session.scalars(db.select(Estudiante).order_by(Estudiante.id)).all()
+    assert (estudiante.nombre_normalizado, estudiante.apellido_normalizado) == ("jose", "perez")
+    assert estudiante.fecha_baja is None
+    assert estudiante.actualizado_en is not None
+    # La baja de los inactivos existentes cuenta desde la migración, no desde el registro
+    assert inactivo.fecha_baja > inactivo.fecha_registro
+    assert archivar_inactivos(dias=365)["estudiantes"] == 0
+
+    # Una segunda pasada no cambia nada
+    assert actualizar() == []
+    assert _esquema() == esquema
+
+
+def test_busqueda_normalizar_agrega_y_rellena_columnas(app):
+    # Una base creada antes de la búsqueda, sin pasar por las migraciones
+    db.drop_all()
+    version_esquema.drop(db.engine)
+    with db.engine.begin() as conexion:
+        conexion.execute(text(ESTUDIANTES_V1))
+        conexion.execute(text(
+            "INSERT INTO estudiantes (matricula, nombre, apellido, email, carrera, semestre, activo) "
+            "VALUES ('A001', 'Ángela', 'Núñez', 'angela@prueba.mx', 'ITIC', 1, 1)"))
+
+    resultado = app.test_cli_runner().invoke(args=["busqueda", "normalizar"])
+
+    assert resultado.exit_code == 0, resultado.output
+    assert "nombre_normalizado" in resultado.output
+    with db.engine.connect() as conexion:
+        fila = conexion.execute(text(
+            "SELECT nombre_normalizado, apellido_normalizado, matricula_normalizada FROM estudiantes")).one()
+    assert tuple(fila) == ("angela", "nunez", "a001")
+
+
+def test_indices_parciales_reemplazan_al_compuesto(app):
+    # Una base en versión 5, con el índice (activo, carrera, id) de la migración 3
+    with db.engine.begin() as conexion:
+        for indice in ("ix_estudiantes_activos_carrera_id", "ix_estudiantes_inactivos_fecha_baja"):
+            conexion.execute(text(f"DROP INDEX {indice}"))
+        conexion.execute(text("CREATE INDEX ix_estudiantes_activo_carrera_id ON estudiantes (activo, carrera, id)"))
+        conexion.execute(version_esquema.delete().where(version_esquema.c.version == 6))
+
+    assert actualizar() == [6]
+
+    indices = _esquema()["estudiantes"][1]
+    assert {"ix_estudiantes_activos_carrera_id", "ix_estudiantes_inactivos_fecha_baja"} <= indices
+    assert "ix_estudiantes_activo_carrera_id" not in indices
@@ -0,0 +1,44 @@
+# tests/test_paginacion.py
+import base64
+import json
+import pytest
+from app.services.paginacion import codificar_cursor
+
+
+def _cursor(datos):
+    return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode()
+
+
+def test_recorre_todas_las_paginas(cliente, sembrar):
+    ids = sembrar([0] * 5)
+    vistos, cursor = [], ""
+    while cursor is not None:
+        cuerpo = cliente.get(f"/api/estudiantes/?limite=2&cursor={cursor}").get_json()
+        vistos += [e["id"] for e in cuerpo["estudiantes"]]
+        cursor = cuerpo["siguiente"]
+    assert vistos == ids
+
+
+@pytest.mark.parametrize("orden, datos", [
+    ("id", {"o": "id", "k": 5}),
+    ("id", {"o": "id", "k": ["abc"]}),
+    ("id", {"o": "id", "k": [True]}),
+    ("id", {"o": "id", "k": [1, 2]}),
+    ("id", {"o": "id", "k": None}),
+    ("carrera", {"o": "carrera", "k": [1, 1]}),
+    ("carrera", {"o": "carrera", "k": ["ITIC"]}),
+    ("carrera", {"o": "id", "k": [1]}),
+    ("id", "no es un objeto"),
+])
+def test_cursor_alterado_es_400(cliente, sembrar, orden, datos):
+    sembrar([0] * 3)
+    respuesta = cliente.get(f"/api/estudiantes/?orden={orden}&cursor={_cursor(datos)}")
+    assert respuesta.status_code == 400
+    assert "error" in respuesta.get_json()
+
+
+def test_cursor_por_carrera_valido(cliente, sembrar):
+    ids = sembrar([0] * 3)
+    cursor = codificar_cursor("carrera", ["ITIC", ids[0]])
+    cuerpo = cliente.get(f"/api/estudiantes/?orden=carrera&cursor={cursor}").get_json()
+    assert [e["id"] for e in cuerpo["estudiantes"]] == ids[1:]
@@ -0,0 +1,90 @@
+# tests/test_planes.py
+# Los filtros frecuentes deben resolverse con los índices de las migraciones 3
+# y 6 (o con los únicos de matrícula/email), nunca recorriendo la tabla completa.
+import pytest
+from sqlalchemy import and_, func, or_, text
+from app import db
+from app.models import Calificacion, Estudiante
+from app.services.kardex import consulta_calificaciones, consulta_estadisticas
+from app.services.serializacion import estudiantes_como_filas
+
+ACTIVO = Estudiante.activo.is_(True)
+# Recorrer un índice parcial completo solo lee las filas de su predicado
+PARCIALES = ("ix_estudiantes_activos_carrera_id", "ix_estudiantes_inactivos_fecha_baja")
+
+# Nombre -> (consulta, índice que debe aparecer en el plan; None: cualquiera)
+CONSULTAS = {
+    "estudiantes_por_carrera": (
+        lambda: estudiantes_como_filas(ACTIVO, Estudiante.carrera == "ITIC").order_by(Estudiante.id).limit(100),
+        "ix_estudiantes_activos_carrera_id"),
+    "estudiantes_cursor_carrera": (
+        lambda: estudiantes_como_filas(ACTIVO).where(or_(
+            Estudiante.carrera > "ISC", and_(Estudiante.carrera == "ISC", Estudiante.id > 5)))
+        .order_by(Estudiante.carrera, Estudiante.id).limit(100),
+        "ix_estudiantes_activos_carrera_id"),
+    "conteo_por_carrera": (
+        lambda: db.select(func.count()).select_from(
+            estudiantes_como_filas(ACTIVO, Estudiante.carrera == "ITIC").subquery()),
+        "ix_estudiantes_activos_carrera_id"),
+    "inactivos": (
+        lambda: db.select(Estudiante.id).where(Estudiante.activo.is_(False)),
+        "ix_estudiantes_inactivos_fecha_baja"),
+    "candidatos_archivo": (
+        lambda: db.select(Estudiante.id).where(
+            Estudiante.activo.is_(False), Estudiante.fecha_baja < "2024-01-01", Estudiante.id > 0),
+        "ix_estudiantes_inactivos_fecha_baja"),
+    "kardex": (
+        lambda: consulta_calificaciones().where(Calificacion.estudiante_id == 3),
+        "ix_calificaciones_estudiante_periodo"),
+    "estadisticas_periodo": (
+        lambda: consulta_estadisticas().where(Calificacion.estudiante_id == 3, Calificacion.periodo == "2024-1"),
+        "ix_calificaciones_estudiante_periodo"),
+    "calificaciones_materia_periodo": (
+        lambda: db.select(Calificacion.id, Calificacion.calificacion).where(
+            Calificacion.materia_id == 2, Calificacion.periodo == "2024-1"),
+        "ix_calificaciones_materia_periodo"),
+    "estudiante_por_matricula": (
+        lambda: db.select(Estudiante.id).where(Estudiante.matricula == "T0000003"), None),
+    "estudiante_por_email": (
+        lambda: db.select(Estudiante.id).where(Estudiante.email == "est3@prueba.mx"), None),
+}
+
+
+def plan(consulta):
+    sql = str(consulta.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    return [f[-1] for f in db.session.execute(text("EXPLAIN QUERY PLAN " + sql))]
+
+
+@pytest.fixture
+def sembrada(sembrar):
+    sembrar([10] * 30)
+    for carrera in ("ISC", "IGE", "LAE"):
+        sembrar([0] * 30, carrera=carrera)
+    sembrar([5] * 10, carrera="ISC", activo=False)
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+@pytest.mark.parametrize("nombre", CONSULTAS)
+def test_filtros_frecuentes_usan_indices(sembrada, nombre):
+    construir, indice = CONSULTAS[nombre]
+    lineas = plan(construir())
+
+    recorridos = [l for l in lineas if (l.startswith("SCAN estudiantes") or l.startswith("SCAN calificaciones"))
+                  and not any(p in l for p in PARCIALES)]
+    assert not recorridos, lineas
+    usa = [l for l in lineas if "USING" in l and "INDEX" in l]
+    assert usa, lineas
+    if indice is not None:
+        assert any(indice in l for l in usa), lineas
+
+
+def test_indices_parciales_solo_con_su_predicado(sembrada):
+    # Sin filtrar por activo, incluir el índice de activos perdería a los inactivos
+    lineas = plan(db.select(Estudiante.id).where(Estudiante.carrera == "ITIC"))
+    assert not any("ix_estudiantes_activos_carrera_id" in l for l in lineas), lineas
+
+    conteo = db.session.execute(text(
+        "SELECT COUNT(*) FROM estudiantes INDEXED BY ix_estudiantes_activos_carrera_id "
+        "WHERE activo IS 1 AND carrera = 'ITIC'")).scalar()
+    assert conteo == 30
@@ -0,0 +1,72 @@
+# tests/test_proveedor_json.py
+import json
+from datetime import date, datetime
+from decimal import Decimal
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+pytest.importorskip("orjson")
+
+from app.proveedor_json import ProveedorOrjson  # noqa: E402
+
+RUTAS = [
+    "/api/estudiantes/",
+    "/api/estudiantes/?carrera=ITIC&pagina=2&por_pagina=2",
+    "/api/estudiantes/?limite=2&cursor=",
+    "/api/estudiantes/?campos=id,nombre_completo",
+    "/api/estudiantes/{id}",
+    "/api/estudiantes/{id}/kardex",
+    "/api/estudiantes/{id}/kardex?campos=materia,calificacion",
+    "/api/kardex?ids={ids}",
+    "/api/estudiantes/en-riesgo?umbral=90",
+    "/api/estudiantes/buscar?q=nomb",
+    "/api/materias/",
+    "/api/analitica/calificaciones?agrupar=materia,periodo,carrera",
+    "/api/analitica/ranking?carrera=ITIC&semestre=1",
+    "/api/exportar/estudiantes",
+    "/api/estudiantes/999999",
+]
+
+
+def _pedir(app, cliente, proveedor, ruta):
+    app.json = proveedor(app)
+    respuesta = cliente.get(ruta)
+    return respuesta.status_code, respuesta.mimetype, respuesta.get_data(as_text=True)
+
+
+def _decodificar(mimetype, texto):
+    if mimetype == "application/json":
+        return json.loads(texto)
+    if mimetype == "application/x-ndjson":
+        return [json.loads(linea) for linea in texto.splitlines()]
+    return texto
+
+
+@pytest.mark.parametrize("ruta", RUTAS)
+def test_misma_respuesta_que_el_proveedor_de_flask(app, cliente, sembrar, ruta):
+    ids = sembrar([6, 3, 1, 0])
+    ruta = ruta.format(id=ids[0], ids=",".join(map(str, ids)))
+
+    estado, tipo, estandar = _pedir(app, cliente, DefaultJSONProvider, ruta)
+    estado_orjson, tipo_orjson, rapido = _pedir(app, cliente, ProveedorOrjson, ruta)
+
+    assert (estado_orjson, tipo_orjson) == (estado, tipo)
+    assert _decodificar(tipo, rapido) == _decodificar(tipo, estandar)
+
+
+@pytest.mark.parametrize("valor", [
+    {"b": 1, "a": [1.5, None, True]},
+    {"fecha": datetime(2024, 5, 17, 8, 30, 15), "dia": date(2024, 5, 17)},
+    {"monto": Decimal("9.50"), "nombre": "José Núñez"}, {2: "b", 1: "a"},
+])
+def test_dumps_igual_que_flask(app, valor):
+    esperado = DefaultJSONProvider(app).dumps(valor)
+    assert json.loads(ProveedorOrjson(app).dumps(valor)) == json.loads(esperado)
+
+
+def test_respeta_la_sangria_en_modo_debug(app):
+    app.debug = True
+    valor = {"estudiantes": [{"id": 1, "nombre": "Ana"}], "total": 1}
+    with app.test_request_context():
+        esperado = DefaultJSONProvider(app).response(valor).get_data()
+        assert ProveedorOrjson(app).response(valor).get_data() == esperado
@@ -0,0 +1,51 @@
+# tests/test_ranking.py
+# El respaldo en Python (SQLite sin funciones de ventana) debe dar lo mismo
+# que RANK/PERCENT_RANK, empates incluidos.
+import sys
+from collections import namedtuple
+import pytest
+from app import db
+from app.models import ResumenAcademico
+from app.services.ranking import _base, _con_ventanas, _ranking_en_python, calcular_ranking, soporta_ventanas
+
+Fila = namedtuple("Fila", "id carrera semestre promedio")
+
+
+def _resumen(filas):
+    return sorted((f["id"], f["posicion"], round(float(f["percentil"]), 6), f["tamano_cohorte"]) for f in filas)
+
+
+def test_empates_como_rank_y_percent_rank():
+    filas = [Fila(1, "ITIC", 1, 90.0), Fila(2, "ITIC", 1, 80.0), Fila(3, "ITIC", 1, 90.0),
+             Fila(4, "ITIC", 1, 70.0), Fila(5, "ITIC", 1, 80.0), Fila(6, "ISC", 1, 75.0)]
+
+    assert _resumen(_ranking_en_python(filas)) == [
+        (1, 1, 0.75, 5), (2, 3, 0.25, 5), (3, 1, 0.75, 5), (4, 5, 0.0, 5), (5, 3, 0.25, 5),
+        (6, 1, 0.0, 1),
+    ]
+
+
+@pytest.fixture
+def cohortes(sembrar):
+    # Promedios 50 + (n - 1) / 2: hay empates dentro de cada cohorte
+    sembrar([1, 1, 3, 5, 5, 5, 2, 4])
+    sembrar([3, 3, 7], semestre=2)
+    sembrar([2], carrera="ISC")
+
+
+@pytest.mark.skipif(not soporta_ventanas("sqlite"), reason="SQLite sin funciones de ventana")
+def test_respaldo_igual_a_las_ventanas(cohortes):
+    total = ResumenAcademico.TOTAL
+    con_ventanas = [f._asdict() for f in db.session.execute(db.select(_con_ventanas([], total)))]
+    sin_ventanas = _ranking_en_python(db.session.execute(_base([], total)).all())
+
+    assert len(con_ventanas) == 12
+    assert _resumen(sin_ventanas) == _resumen(con_ventanas)
+
+
+@pytest.mark.skipif(not soporta_ventanas("sqlite"), reason="SQLite sin funciones de ventana")
+def test_calcular_ranking_con_y_sin_ventanas(cohortes, monkeypatch):
+    con_ventanas = calcular_ranking(por_pagina=5, pagina=2)
+
+    monkeypatch.setattr(sys.modules["app.services.ranking"], "soporta_ventanas", lambda: False)
+    assert calcular_ranking(por_pagina=5, pagina=2) == con_ventanas
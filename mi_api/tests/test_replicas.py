@@ -0,0 +1,60 @@
+# tests/test_replicas.py
+import pytest
+from sqlalchemy import create_engine, insert
+from app import create_app, db
+from app.models import Materia
+from tests.conftest import PruebasConfig
+
+
+@pytest.fixture
+def con_replica(tmp_path):
+    """App con una réplica que no recibe las escrituras (un atraso permanente)."""
+    class ReplicaConfig(PruebasConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primaria.db'}"
+        DB_REPLICAS = [f"sqlite:///{tmp_path / 'replica.db'}"]
+        DB_REPLICA_PEGAR_SEGUNDOS = 0.5
+        CACHE_HABILITADO = True
+        CACHE_BACKEND = "local"
+
+    app = create_app(ReplicaConfig)
+    replica = create_engine(ReplicaConfig.DB_REPLICAS[0])
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(replica)
+    # Sin un contexto de app abierto: cada petición tiene su propio 'g' y su sesión
+    yield app, replica
+    replica.dispose()
+
+
+def _claves(cliente, **kwargs):
+    return [m["clave"] for m in cliente.get("/api/materias/", **kwargs).get_json()]
+
+
+def test_lectura_de_replica_atrasada_no_queda_en_cache(con_replica):
+    app, replica = con_replica
+    escritor, lector = app.test_client(), app.test_client()
+    otro = {"Authorization": "Bearer otro-usuario"}
+
+    respuesta = escritor.post("/api/materias/", json={"clave": "M1", "nombre": "Nueva", "creditos": 4})
+    assert respuesta.status_code == 201
+    # Otro usuario lee de la réplica atrasada
+    assert _claves(lector, headers=otro) == []
+
+    # Cuando la réplica se pone al día, la respuesta vieja no se sirve desde la caché
+    with replica.begin() as conexion:
+        conexion.execute(insert(Materia), [{"clave": "M1", "nombre": "Nueva", "creditos": 4}])
+    assert _claves(lector, headers=otro) == ["M1"]
+    # El que escribió lee de la primaria
+    assert _claves(escritor) == ["M1"]
+
+
+def test_marcas_de_replica_fuera_de_la_cache_de_respuestas(con_replica):
+    app, _ = con_replica
+    cliente = app.test_client()
+    cliente.post("/api/materias/", json={"clave": "M2", "nombre": "Otra", "creditos": 4})
+
+    marcas = app.extensions["replicas"].marcas
+    respuestas = app.extensions["cache_respuestas"].backend
+    assert marcas is not respuestas
+    assert marcas.get("escritura") is True
+    assert not any("primaria:" in n or "escritura" in n for n in respuestas.cliente.scan_iter())
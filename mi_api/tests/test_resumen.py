@@ -0,0 +1,80 @@
+# tests/test_resumen.py
+import pytest
+from app import db
+from app.models import ResumenAcademico
+from app.services.resumen import reconstruir
+
+
+@pytest.fixture
+def registrar(cliente):
+    def registrar(estudiante_id, *calificaciones, periodo="2024-1"):
+        for n, valor in enumerate(calificaciones):
+            respuesta = cliente.post("/api/calificaciones/", json={
+                "estudiante_id": estudiante_id, "materia_id": n % 5 + 1, "calificacion": valor,
+                "periodo": periodo})
+            assert respuesta.status_code == 201
+    return registrar
+
+
+def _en_riesgo(cliente, consulta=""):
+    respuesta = cliente.get(f"/api/estudiantes/en-riesgo?{consulta}")
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.get_json()
+    return [(e["estudiante"]["id"], e["estadisticas"]["promedio_general"]) for e in cuerpo["estudiantes"]]
+
+
+@pytest.fixture
+def cohorte(sembrar, registrar):
+    bajo, alto, limite, sin_notas = sembrar([0] * 4, semestre=1)
+    otra_carrera, = sembrar([0], carrera="IGE", semestre=2)
+    inactivo, = sembrar([0], activo=False)
+    registrar(bajo, 50, 60)
+    registrar(alto, 80, 90)
+    registrar(limite, 69, 71)
+    registrar(otra_carrera, 40, 70)
+    registrar(otra_carrera, 95, periodo="2024-2")
+    registrar(inactivo, 30)
+    return {"bajo": bajo, "alto": alto, "limite": limite, "otra_carrera": otra_carrera}
+
+
+def test_en_riesgo_por_umbral(cliente, cohorte):
+    # El umbral es estricto: quien promedia exactamente 70 no está en riesgo
+    assert _en_riesgo(cliente) == [(cohorte["bajo"], 55.0), (cohorte["otra_carrera"], 68.33)]
+    assert _en_riesgo(cliente, "umbral=70.5") == [
+        (cohorte["bajo"], 55.0), (cohorte["otra_carrera"], 68.33), (cohorte["limite"], 70.0)]
+    assert _en_riesgo(cliente, "umbral=50") == []
+    assert _en_riesgo(cliente, "umbral=100&limite=1") == [(cohorte["bajo"], 55.0)]
+
+
+def test_en_riesgo_por_carrera_semestre_y_periodo(cliente, cohorte):
+    assert _en_riesgo(cliente, "carrera=ITIC") == [(cohorte["bajo"], 55.0)]
+    assert _en_riesgo(cliente, "semestre=2") == [(cohorte["otra_carrera"], 68.33)]
+    # Empates de promedio por id
+    assert _en_riesgo(cliente, "periodo=2024-1") == [(cohorte["bajo"], 55.0), (cohorte["otra_carrera"], 55.0)]
+    assert _en_riesgo(cliente, "periodo=2024-2") == []
+
+
+def test_el_resumen_incremental_coincide_con_reconstruir(cliente, cohorte, sembrar):
+    id, = sembrar([0])
+    cliente.post("/api/calificaciones/lote", json=[
+        {"estudiante_id": id, "materia_id": 1, "calificacion": c, "periodo": p}
+        for c, p in [(59.5, "2024-1"), (100, "2024-1"), (0, "2024-2")]])
+
+    def filas():
+        return sorted((r.estudiante_id, r.periodo, r.total, float(r.suma), float(r.maxima), float(r.minima),
+                       r.aprobadas) for r in db.session.scalars(db.select(ResumenAcademico)))
+
+    incremental = filas()
+    assert (id, ResumenAcademico.TOTAL, 3, 159.5, 100.0, 0.0, 1) in incremental
+    reconstruir()
+    assert filas() == incremental
+
+
+def test_kardex_lee_las_estadisticas_del_resumen(cliente, cohorte):
+    esperado = cliente.get(f"/api/estudiantes/{cohorte['otra_carrera']}/kardex").get_json()["estadisticas"]
+    assert (esperado["total_materias"], esperado["promedio_general"]) == (3, 68.33)
+
+    # Sin fila de resumen se calcula sobre las calificaciones, con el mismo resultado
+    db.session.execute(db.delete(ResumenAcademico))
+    db.session.commit()
+    assert cliente.get(f"/api/estudiantes/{cohorte['otra_carrera']}/kardex").get_json()["estadisticas"] == esperado